@@ -4,7 +4,7 @@
  * Tests for the Python bridge functionality.
  */
 
-const { executePythonFunction } = require('../utils/pythonBridge');
+const { executePythonFunction, executePythonScript } = require('../utils/pythonBridge');
 const { spawn } = require('child_process');
 
 // Mock the child_process spawn function
@@ -77,7 +77,8 @@ describe('Python Bridge', () => {
       expect(spawn).toHaveBeenCalledWith('python3', [
         expect.stringContaining('enhancer_wrapper.py'),
         '--function', 'testFunction',
-        '--data', '{"test":"data"}'
+        '--data', '{"test":"data"}',
+        '--deadline-ms', '59000'
       ]);
       
       // Verify the result
@@ -189,4 +190,58 @@ describe('Python Bridge', () => {
         .rejects.toThrow('Failed to start Python process');
     });
   });
+
+  describe('executePythonScript', () => {
+    const mockScriptProcess = (output) => {
+      const mockProcess = {
+        stdout: { on: jest.fn() },
+        stderr: { on: jest.fn() },
+        on: jest.fn()
+      };
+      mockProcess.stdout.on.mockImplementation((event, callback) => {
+        if (event === 'data') {
+          callback(Buffer.from(output));
+        }
+        return mockProcess.stdout;
+      });
+      mockProcess.stderr.on.mockReturnValue(mockProcess.stderr);
+      mockProcess.on.mockImplementation((event, callback) => {
+        if (event === 'close') {
+          callback(0);
+        }
+        return mockProcess;
+      });
+      spawn.mockReturnValue(mockProcess);
+    };
+
+    it('should pass the remaining budget to the script as deadlineMs', async () => {
+      mockScriptProcess('{"status": "success", "data": {"matches": []}}');
+
+      const result = await executePythonScript('/scripts/job_matching.py', { jobTitle: 'Engineer' }, 30000);
+
+      expect(spawn).toHaveBeenCalledWith(expect.any(String), [
+        '/scripts/job_matching.py',
+        '{"jobTitle":"Engineer","deadlineMs":29000}'
+      ]);
+      expect(result).toEqual({ status: 'success', data: { matches: [] } });
+    });
+
+    it('should keep a tighter deadline given by the caller', async () => {
+      mockScriptProcess('{"status": "success"}');
+
+      await executePythonScript('/scripts/cover_letter_generator.py', { deadlineMs: 5000 }, 30000);
+
+      const args = spawn.mock.calls[0][1];
+      expect(JSON.parse(args[1]).deadlineMs).toBe(5000);
+    });
+
+    it('should resolve with every line of NDJSON output', async () => {
+      mockScriptProcess('{"status": "success"}\n{"type": "summary", "status": "success"}\n');
+
+      const result = await executePythonScript('/scripts/cover_letter_generator.py', { jobs: [] });
+
+      expect(result.results).toHaveLength(2);
+      expect(result.results[1]).toHaveProperty('type', 'summary');
+    });
+  });
 }); 
\ No newline at end of file
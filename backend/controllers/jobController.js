@@ -4,7 +4,7 @@
 
 const path = require('path');
 const Resume = require('../models/Resume');
-const { executePythonScript } = require('../utils/pythonBridge');
+const { executePythonScript, getJobs } = require('../utils/pythonBridge');
 const { flatten_resume_json } = require('../utils/resumeFormatter');
 
 // Path to the Python job matching script
@@ -17,7 +17,7 @@ const JOB_MATCHING_SCRIPT = path.join(__dirname, '../scripts/job_matching.py');
 const findJobMatches = async (req, res) => {
   try {
     console.log('findJobMatches called with body:', JSON.stringify(req.body));
-    const { resumeId, jobTitle, location, limit = 5 } = req.body;
+    const { resumeId, jobTitle, location, limit = 5, filters, fields, snippetLength, references } = req.body;
 
     // Validate required parameters
     if (!jobTitle) {
@@ -28,6 +28,7 @@ const findJobMatches = async (req, res) => {
     }
 
     let resumeText = null;
+    let skills = [];
 
     // If resumeId is provided, fetch and format the resume text
     if (resumeId) {
@@ -69,6 +70,8 @@ const findJobMatches = async (req, res) => {
           };
         }
 
+        skills = classification.skills || [];
+
         // Format resume for job matching
         const resumeData = {
           data: {
@@ -102,9 +105,14 @@ const findJobMatches = async (req, res) => {
     // Prepare parameters for Python script
     const scriptParams = {
       resumeText,
+      skills,
       jobTitle,
       location: location || '',
-      limit: parseInt(limit, 10)
+      limit: parseInt(limit, 10),
+      filters,
+      fields,
+      snippetLength,
+      references
     };
 
     console.log(`Executing job matching script with params: ${JSON.stringify({
@@ -146,6 +154,32 @@ const findJobMatches = async (req, res) => {
   }
 };
 
+/**
+ * Get stored job postings by id, e.g. the descriptions left out of a
+ * find-matches response sent with references
+ * @route POST /api/jobs/lookup
+ */
+const getJobsByIds = async (req, res) => {
+  try {
+    const { jobIds, fields, snippetLength } = req.body;
+
+    const result = await getJobs(jobIds, { fields, snippetLength });
+
+    return res.status(200).json({
+      status: 'success',
+      jobs: result.jobs || []
+    });
+  } catch (error) {
+    console.error('Error in getJobsByIds:', error);
+    return res.status(500).json({
+      status: 'error',
+      message: 'Server error looking up jobs',
+      error: process.env.NODE_ENV === 'development' ? error.message : undefined
+    });
+  }
+};
+
 module.exports = {
-  findJobMatches
+  findJobMatches,
+  getJobsByIds
 }; 
\ No newline at end of file
@@ -150,6 +150,35 @@ const validateJobMatch = (req, res, next) => {
   next();
 };
 
+// Stored job lookup validation
+const validateJobLookup = (req, res, next) => {
+  const { jobIds, fields, snippetLength } = req.body;
+  const errors = [];
+
+  // jobIds is required
+  if (!Array.isArray(jobIds) || jobIds.length === 0 || !jobIds.every((id) => typeof id === 'string')) {
+    errors.push('jobIds must be a non-empty list of job ids');
+  }
+
+  // Validate projection options if provided
+  if (fields !== undefined && (!Array.isArray(fields) || fields.length === 0 || !fields.every((field) => typeof field === 'string'))) {
+    errors.push('Fields must be a non-empty list of field names');
+  }
+  if (snippetLength !== undefined && (isNaN(snippetLength) || parseInt(snippetLength, 10) <= 0)) {
+    errors.push('Snippet length must be a positive number');
+  }
+
+  // Return errors if any
+  if (errors.length > 0) {
+    return res.status(400).json({ 
+      status: 'error',
+      message: errors.join('. ')
+    });
+  }
+  
+  next();
+};
+
 // Enhanced cover letter generation validation
 const validateEnhancedCoverLetter = (req, res, next) => {
   // Handle both parameter naming formats (API standard and frontend format)
@@ -200,5 +229,6 @@ module.exports = {
   validateCoverLetter,
   validateChatMessage,
   validateJobMatch,
+  validateJobLookup,
   validateEnhancedCoverLetter
 }; 
\ No newline at end of file
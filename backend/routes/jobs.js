@@ -1,8 +1,8 @@
 const express = require('express');
 const router = express.Router();
 const authenticate = require('../middleware/auth');
-const { validateJobMatch } = require('../middleware/validation');
-const { findJobMatches } = require('../controllers/jobController');
+const { validateJobMatch, validateJobLookup } = require('../middleware/validation');
+const { findJobMatches, getJobsByIds } = require('../controllers/jobController');
 
 // All job routes require authentication
 router.use(authenticate);
@@ -14,4 +14,11 @@ router.use(authenticate);
  */
 router.post('/find-matches', validateJobMatch, findJobMatches);
 
+/**
+ * @route   POST /api/jobs/lookup
+ * @desc    Get stored job postings by id (descriptions left out by references)
+ * @access  Private
+ */
+router.post('/lookup', validateJobLookup, getJobsByIds);
+
 module.exports = router; 
\ No newline at end of file
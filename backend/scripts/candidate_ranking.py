@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+Candidate Ranking Script - Reverse job matching for recruiters
+Takes a job posting as JSON input via command line and returns the best
+matching stored resumes as JSON output
+"""
+
+import sys
+import json
+import os
+from pathlib import Path
+from datetime import datetime
+
+# Share the resume store and ranking code with the enhancer module
+sys.path.append(str(Path(__file__).resolve().parents[2] / "py_models"))
+
+from resume_store import ResumeVectorStore
+from candidate_ranking import rank_candidates_for_job
+from model_bundle import load_model
+from request_profiler import call_with_profile, profile_requested
+
+RESUME_STORE_DIR = os.environ.get("RESUME_STORE_DIR", "resume_store")
+
+def find_matching_candidates(job_title=None, job_description=None, top_k=10,
+                             rerank_top_n=100, skill_weight=0.3, embedding_model=None):
+    """
+    Find the stored resumes that best fit a job posting
+    """
+    try:
+        # If no embedding model is provided, load it
+        if embedding_model is None:
+            embedding_model = load_model()
+
+        store = ResumeVectorStore(RESUME_STORE_DIR)
+        result = rank_candidates_for_job(
+            job_title,
+            job_description,
+            encode=lambda texts: embedding_model.encode(texts).astype("float32"),
+            store=store,
+            top_k=top_k,
+            rerank_top_n=rerank_top_n,
+            skill_weight=skill_weight
+        )
+        result["metadata"]["generatedAt"] = datetime.now().isoformat()
+
+        return {
+            "status": "success",
+            "data": result
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Error ranking candidates: {str(e)}"
+        }
+
+def main():
+    """
+    Main function to parse command line arguments and execute candidate ranking
+    """
+    try:
+        # Parse input JSON from command line
+        if len(sys.argv) < 2:
+            print(json.dumps({
+                "status": "error",
+                "message": "No input parameters provided"
+            }))
+            return
+
+        params = json.loads(sys.argv[1])
+
+        # Extract parameters
+        job_title = params.get("jobTitle")
+        job_description = params.get("jobDescription", "")
+        top_k = int(params.get("topK", 10))
+        rerank_top_n = int(params.get("rerankTopN", 100))
+        skill_weight = float(params.get("skillWeight", 0.3))
+
+        # Validate required parameters
+        if not job_title and not job_description:
+            print(json.dumps({
+                "status": "error",
+                "message": "jobTitle or jobDescription is required"
+            }))
+            return
+
+        # Execute candidate ranking (under the profiler if "profile" or --profile was given)
+        result = call_with_profile(
+            "candidate_ranking",
+            profile_requested(params, sys.argv[2:]),
+            find_matching_candidates,
+            job_title=job_title,
+            job_description=job_description,
+            top_k=top_k,
+            rerank_top_n=rerank_top_n,
+            skill_weight=skill_weight
+        )
+
+        # Return result as JSON
+        print(json.dumps(result))
+
+    except Exception as e:
+        print(json.dumps({
+            "status": "error",
+            "message": f"Error executing candidate ranking: {str(e)}"
+        }))
+
+if __name__ == "__main__":
+    main()
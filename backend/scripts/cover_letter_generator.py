@@ -2,6 +2,9 @@
 """
 Cover Letter Generator Script - Extracts functionality from enhancer.ipynb
 Takes JSON input via command line and returns generated cover letter as JSON output
+
+With a "jobs" list in the input, generates one letter per job from a single
+resume and streams the results as newline-delimited JSON.
 """
 
 import sys
@@ -10,7 +13,26 @@ import os
 import time
 from datetime import datetime
 import traceback
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
+from pathlib import Path
+
+# Share the request deadline helpers with the enhancer module
+sys.path.append(str(Path(__file__).resolve().parents[2] / "py_models"))
+
+from deadline import Deadline, check_deadline, deadline_scope, request_timeout, LLM_MIN_SECONDS
+from request_profiler import call_with_profile, profile_requested
+
+# Overridable so load tests can point at a local stand-in
+GROQ_BASE_URL = os.environ.get("GROQ_BASE_URL", "https://api.groq.com")
+
+# Letters generated at once in batch mode
+BATCH_CONCURRENCY = int(os.environ.get("COVER_LETTER_CONCURRENCY", 4))
+
+# Resumes shorter than this are sent as-is instead of being summarized first
+SUMMARY_MIN_CHARS = 2000
 
 # Implement a simplified version of query_groq that doesn't rely on the notebook
 def query_groq(prompt, model="groq-14b", max_tokens=2000, temperature=0.7):
@@ -50,9 +72,12 @@ John Doe"""
             "temperature": temperature
         }
         
-        response = requests.post("https://api.groq.com/openai/v1/chat/completions", 
+        # Don't start a call the remaining budget can't cover
+        check_deadline("Groq completion", needed=LLM_MIN_SECONDS)
+        response = requests.post(f"{GROQ_BASE_URL}/openai/v1/chat/completions",
                                 headers=headers, 
-                                json=data)
+                                json=data,
+                                timeout=request_timeout(60))
         
         if response.status_code != 200:
             raise Exception(f"API call failed with status code {response.status_code}: {response.text}")
@@ -98,6 +123,127 @@ def generate_cover_letter(resume_text, job_title, job_description, company_name)
         print(f"Error generating cover letter: {str(e)}", file=sys.stderr)
         raise
 
+def summarize_resume(resume_text):
+    """
+    Condense a resume into the facts a cover letter needs, so a batch sends
+    the summary with every job instead of the full resume.
+    """
+    if len(resume_text) < SUMMARY_MIN_CHARS or not os.environ.get("GROQ_API_KEY"):
+        return resume_text
+
+    prompt = f"""
+    Summarize this resume for writing cover letters. Keep the candidate's name, contact details,
+    current role, years of experience, key skills and technologies, and the most notable
+    achievements with their numbers. Use short plain-text lines, at most 250 words.
+
+    RESUME:
+    {resume_text}
+
+    SUMMARY:
+    """
+    return query_groq(prompt, max_tokens=500, temperature=0.2).strip()
+
+def generate_cover_letters(resume_text, jobs, concurrency=BATCH_CONCURRENCY, emit=None):
+    """
+    Generate a cover letter for each job in a batch.
+
+    The resume is summarized once and shared by every letter. Up to
+    `concurrency` letters are generated at once; emit(result) is called
+    with each letter's result as soon as it completes (in completion
+    order, tagged with the job's index), and a failed letter does not
+    affect the others. Returns the batch summary.
+    """
+    emit = emit or (lambda result: None)
+    start_time = time.time()
+    summary_error = None
+    try:
+        summary = summarize_resume(resume_text)
+    except Exception as e:
+        # Letters can still be written from the full resume; each one
+        # succeeds or fails on its own
+        summary_error = str(e)
+        summary = resume_text
+        print(f"Error summarizing resume, using the full resume: {summary_error}", file=sys.stderr)
+    summary_ms = round((time.time() - start_time) * 1000)
+    if summary_error is None:
+        print(f"Resume summary ready in {summary_ms}ms ({len(resume_text)} -> {len(summary)} chars)", file=sys.stderr)
+
+    emit_lock = threading.Lock()
+
+    def letter(index, job):
+        job_start = time.time()
+        job_title = job.get("jobTitle") or job.get("title")
+        company_name = job.get("companyName") or job.get("company")
+        job_description = job.get("jobDescription") or job.get("description")
+        try:
+            missing = [name for name, value in (("jobTitle", job_title), ("jobDescription", job_description),
+                                                ("companyName", company_name)) if not value]
+            if missing:
+                raise ValueError(f"Missing required parameters: {', '.join(missing)}")
+            cover_letter = generate_cover_letter(summary, job_title, job_description, company_name)
+            result = {
+                "type": "letter",
+                "index": index,
+                "status": "success",
+                "data": {
+                    "coverLetter": cover_letter,
+                    "metadata": {
+                        "jobId": job.get("jobId"),
+                        "jobTitle": job_title,
+                        "companyName": company_name,
+                        "elapsedMs": round((time.time() - job_start) * 1000),
+                        "generatedAt": datetime.now().isoformat()
+                    }
+                }
+            }
+        except Exception as e:
+            print(f"Error generating cover letter {index} ({job_title} at {company_name}): {str(e)}", file=sys.stderr)
+            result = {
+                "type": "letter",
+                "index": index,
+                "status": "error",
+                "message": "Failed to generate cover letter",
+                "error": str(e),
+                "metadata": {
+                    "jobId": job.get("jobId"),
+                    "jobTitle": job_title,
+                    "companyName": company_name,
+                    "elapsedMs": round((time.time() - job_start) * 1000)
+                }
+            }
+        with emit_lock:
+            emit(result)
+        return result
+
+    # Each thread runs in a copy of this context so the request deadline applies there too
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, letter, index, job)
+                   for index, job in enumerate(jobs)]
+        results = [future.result() for future in as_completed(futures)]
+
+    succeeded = sum(1 for result in results if result["status"] == "success")
+    batch = {
+        "type": "summary",
+        "status": "success" if succeeded else "error",
+        "data": {
+            "total": len(jobs),
+            "succeeded": succeeded,
+            "failed": len(jobs) - succeeded,
+            "concurrency": concurrency,
+            "summaryMs": summary_ms,
+            "elapsedMs": round((time.time() - start_time) * 1000),
+            "generatedAt": datetime.now().isoformat()
+        }
+    }
+    if summary_error is not None:
+        batch["data"]["summaryError"] = summary_error
+    return batch
+
+def write_line(payload):
+    """Write one NDJSON line to stdout immediately."""
+    sys.stdout.write(json.dumps(payload) + "\n")
+    sys.stdout.flush()
+
 def generate_cover_letter_wrapper(resume_text, job_title, job_description, company_name):
     """
     Wrapper function for generate_cover_letter that adds error handling and formatting
@@ -149,6 +295,27 @@ def main():
             return
             
         params = json.loads(sys.argv[1])
+
+        # Batch mode: one NDJSON line per letter as it completes, then a summary line
+        if isinstance(params.get("jobs"), list):
+            if not params.get("resumeText"):
+                print(json.dumps({
+                    "status": "error",
+                    "message": "Missing required parameters: resumeText"
+                }))
+                return
+            with deadline_scope(Deadline.from_ms(params.get("deadlineMs"))):
+                summary = call_with_profile(
+                    "cover_letter_batch",
+                    profile_requested(params, sys.argv[2:]),
+                    generate_cover_letters,
+                    params["resumeText"],
+                    params["jobs"],
+                    concurrency=int(params.get("concurrency", BATCH_CONCURRENCY)),
+                    emit=write_line
+                )
+            write_line(summary)
+            return
         
         # Extract parameters
         resume_text = params.get("resumeText")
@@ -174,13 +341,18 @@ def main():
             }))
             return
             
-        # Execute cover letter generation
-        result = generate_cover_letter_wrapper(
-            resume_text=resume_text,
-            job_title=job_title,
-            job_description=job_description,
-            company_name=company_name
-        )
+        # Execute cover letter generation within the caller's deadline, if one was given,
+        # and under the profiler if "profile" or --profile was given
+        with deadline_scope(Deadline.from_ms(params.get("deadlineMs"))):
+            result = call_with_profile(
+                "cover_letter",
+                profile_requested(params, sys.argv[2:]),
+                generate_cover_letter_wrapper,
+                resume_text=resume_text,
+                job_title=job_title,
+                job_description=job_description,
+                company_name=company_name
+            )
         
         # Return result as JSON
         print(json.dumps(result))
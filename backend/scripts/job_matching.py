@@ -6,21 +6,44 @@ Takes JSON input via command line and returns matching jobs as JSON output
 
 import sys
 import json
+import math
 import time
 import os
 import argparse
-from sentence_transformers import SentenceTransformer
 import numpy as np
-import faiss
 import requests
+from pathlib import Path
 from datetime import datetime
 
+# Share the hybrid retriever, job corpus and dedup index with the enhancer module
+sys.path.append(str(Path(__file__).resolve().parents[2] / "py_models"))
+
+from hybrid_retriever import InvertedIndex, extract_terms, hybrid_search, query_terms
+from job_corpus import JobCorpus, corpus_record, job_from_record, job_id
+from job_dedup import SignatureIndex, dedupe_jobs
+from job_facets import FacetIndex, posted_at
+from query_log import QueryLog
+from model_bundle import load_model
+from request_profiler import call_with_profile, profile_requested
+from payloads import dumps, project_jobs, projection_from
+from deadline import (Deadline, DeadlineExceeded, check_deadline, deadline_scope, has_budget,
+                      request_timeout, ENCODE_MIN_SECONDS, SERPAPI_PAGE_SECONDS)
+
 # Path to the virtual environment if needed
 # import sys
 # sys.path.append('/path/to/your/venv/lib/python3.x/site-packages')
 
 # Configure SerpAPI key (from environment or use a default from notebook)
 SERPAPI_KEY = os.environ.get('SERPAPI_KEY', '83c1ef3c99b32b05ab29da61937948e1cce626b355feb3c4c6ead197a08a7aac')
+# Overridable so load tests can point at a local stand-in
+SERPAPI_URL = os.environ.get('SERPAPI_URL', 'https://serpapi.com/search')
+
+# Queries refreshed in the background more recently than this are served
+# from the job corpus instead of SerpAPI
+JOB_REFRESH_MAX_AGE = float(os.environ.get('JOB_REFRESH_MAX_AGE', 6 * 3600))
+
+# Google Jobs returns 10 postings per SerpAPI page
+SERPAPI_PAGE_SIZE = 10
 
 def get_multiple_jobs_with_pagination(job_title, location, limit=5):
     """
@@ -46,8 +69,16 @@ def get_multiple_jobs_with_pagination(job_title, location, limit=5):
             else:
                 params.pop("next_page_token", None)
                 
+            # The first page is required; later pages are skipped when the
+            # budget can't cover them
+            if not all_jobs:
+                check_deadline("SerpAPI search", needed=SERPAPI_PAGE_SECONDS)
+            elif not has_budget(SERPAPI_PAGE_SECONDS):
+                break
+
             # Make the API request
-            response = requests.get("https://serpapi.com/search", params=params)
+            response = requests.get(SERPAPI_URL, params=params,
+                                    timeout=request_timeout(30))
             if response.status_code != 200:
                 raise Exception(f"SerpAPI request failed with status {response.status_code}: {response.text}")
                 
@@ -67,7 +98,9 @@ def get_multiple_jobs_with_pagination(job_title, location, limit=5):
             if not next_page_token:
                 break
                 
-            # Avoid rate limiting
+            # Avoid rate limiting, unless the pause would eat the rest of the budget
+            if not has_budget(1 + SERPAPI_PAGE_SECONDS):
+                break
             time.sleep(1)
         
         # Limit to requested number of jobs
@@ -92,85 +125,223 @@ def get_multiple_jobs_with_pagination(job_title, location, limit=5):
                 "description": job.get('description', ''),
                 "applicationLink": application_link,
                 "postedTime": job.get('detected_extensions', {}).get('posted_at', ''),
-                "jobType": job.get('detected_extensions', {}).get('job_type', '')
+                # SerpAPI reports the job type as schedule_type
+                "jobType": (job.get('detected_extensions', {}).get('schedule_type', '')
+                            or job.get('detected_extensions', {}).get('job_type', ''))
             })
             
         return result
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         print(f"Error fetching jobs: {str(e)}", file=sys.stderr)
         return []
 
-def find_matching_jobs(resume_text=None, job_title=None, location=None, limit=5, embedding_model=None):
+def open_job_store():
+    corpus = JobCorpus()
+    return corpus, QueryLog(os.path.join(corpus.root, "queries.json"))
+
+def warm_jobs(corpus, query_log, job_title, location, limit):
+    """Postings of a recent background refresh of this query, or None."""
+    entry = query_log.get(job_title, location)
+    if not entry or not entry.get("jobIds") or time.time() - entry.get("refreshedAt", 0) > JOB_REFRESH_MAX_AGE:
+        return None
+    records = [corpus.get(job_id_value) for job_id_value in entry["jobIds"][:limit]]
+    pairs = [(job_from_record(record), record["jobId"]) for record in records if record is not None]
+    if not pairs:
+        return None
+    jobs, job_ids = zip(*pairs)
+    return list(jobs), list(job_ids), entry["refreshedAt"]
+
+def fetch_and_index(job_title, location, limit, embedding_model, corpus, query_log):
+    """
+    Fetch a query from SerpAPI, drop duplicates and pre-embed the new
+    postings into the job corpus. Used by the background refresher.
+    """
+    jobs = get_multiple_jobs_with_pagination(job_title, location, limit=limit)
+    signatures = SignatureIndex(os.path.join(corpus.root, "signatures.json"))
+    jobs, job_ids, dedup = dedupe_jobs(jobs, signatures, job_id)
+
+    new = [i for i, vector in enumerate(corpus.embeddings_for(job_ids)) if vector is None]
+    if new:
+        check_deadline("encode", needed=ENCODE_MIN_SECONDS)
+        encoded = embedding_model.encode([jobs[i]["description"] for i in new]).astype("float32")
+        corpus.add_jobs([corpus_record(jobs[i], job_ids[i]) for i in new], encoded)
+    if jobs:
+        query_log.mark_refreshed(job_title, location, job_ids)
+    return {"jobTitle": job_title, "location": location, "jobs": len(jobs), "embedded": len(new),
+            "duplicates": dedup["duplicates"]}
+
+def refresh_popular_jobs(params=None, embedding_model=None):
+    """
+    Refresh the most requested queries into the job corpus, spending at most
+    `budget` SerpAPI requests. Queries refreshed within `minAge` seconds are
+    skipped.
+    """
+    params = params or {}
+    top_n = int(params.get("topN", os.environ.get("JOB_REFRESH_TOP_N", 20)))
+    budget = int(params.get("budget", os.environ.get("JOB_REFRESH_BUDGET", 20)))
+    limit = int(params.get("limit", 10))
+    min_age = float(params.get("minAge", JOB_REFRESH_MAX_AGE / 2))
+
+    if embedding_model is None:
+        embedding_model = load_model()
+    corpus, query_log = open_job_store()
+
+    cost = math.ceil(limit / SERPAPI_PAGE_SIZE)
+    spent = 0
+    refreshed = []
+    skipped = 0
+    for entry in query_log.top(top_n):
+        if time.time() - entry.get("refreshedAt", 0) < min_age:
+            skipped += 1
+            continue
+        # Stay within the request budget and the deadline of this refresh cycle
+        if spent + cost > budget or not has_budget(cost * SERPAPI_PAGE_SECONDS):
+            break
+        spent += cost
+        try:
+            refreshed.append(fetch_and_index(entry["jobTitle"], entry["location"], limit,
+                                             embedding_model, corpus, query_log))
+        except DeadlineExceeded:
+            break
+        except Exception as e:
+            print(f"Error refreshing '{entry['jobTitle']}' in '{entry['location']}': {str(e)}", file=sys.stderr)
+
+    return {
+        "status": "success",
+        "data": {
+            "refreshed": refreshed,
+            "skipped": skipped,
+            "requestsUsed": spent,
+            "budget": budget,
+            "refreshedAt": datetime.now().isoformat()
+        }
+    }
+
+def find_matching_jobs(resume_text=None, job_title=None, location=None, limit=5, embedding_model=None,
+                       skills=None, fusion=None, filters=None, projection=None):
     """
     Find jobs matching a resume or job title/location
-    Uses embeddings to rank results if resume_text is provided
+    Uses hybrid lexical + embedding ranking if resume_text is provided
+    filters (location, jobType, postedWithin) are applied before ranking
     """
     try:
         # If no embedding model is provided, load it
         if embedding_model is None:
-            embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+            embedding_model = load_model()
             
-        # Get jobs from SerpAPI
-        jobs = get_multiple_jobs_with_pagination(job_title, location, limit=limit)
+        # Popular queries are kept warm by the background refresher; serve
+        # those from the job corpus and only go to SerpAPI otherwise
+        corpus, query_log = open_job_store()
+        query_log.record(job_title, location)
+        warm = warm_jobs(corpus, query_log, job_title, location, limit)
+
+        if warm:
+            jobs, job_ids, refreshed_at = warm
+            dedup = {"fetched": len(jobs), "duplicates": 0, "seenBefore": len(jobs), "encodesSaved": 0}
+        else:
+            jobs = get_multiple_jobs_with_pagination(job_title, location, limit=limit)
+            refreshed_at = time.time()
+
+            # Drop syndicated copies before anything is embedded; postings seen by
+            # earlier queries reuse the embedding stored in the job corpus
+            signatures = SignatureIndex(os.path.join(corpus.root, "signatures.json"))
+            jobs, job_ids, dedup = dedupe_jobs(jobs, signatures, job_id)
+            dedup["encodesSaved"] = 0
+
+        freshness = {
+            "source": "corpus" if warm else "serpapi",
+            "refreshedAt": datetime.fromtimestamp(refreshed_at).isoformat(),
+            "ageSeconds": round(time.time() - refreshed_at)
+        }
+
+        # Facet filters select rows up front so non-matching jobs are never embedded
+        fetched_at = time.time()
+        facets = FacetIndex.build([dict(job, postedAt=posted_at(job.get("postedTime"), now=fetched_at))
+                                   for job in jobs])
+        rows = facets.rows(filters)
         
+        # Matches carry their jobId so callers can refer back to the corpus
+        def stored(job_id_value):
+            return corpus.get(job_id_value) is not None
+
         # If no resume text, just return the jobs without ranking
         if not resume_text:
+            selected = range(len(jobs)) if rows is None else rows
+            jobs = [dict(jobs[row], jobId=job_ids[row]) for row in selected]
             return {
                 "status": "success",
                 "data": {
-                    "matches": jobs,
+                    "matches": project_jobs(jobs, projection, stored),
                     "metadata": {
                         "query": {
                             "jobTitle": job_title,
                             "location": location
                         },
                         "total": len(jobs),
+                        "dedup": dedup,
+                        "freshness": freshness,
                         "generatedAt": datetime.now().isoformat()
                     }
                 }
             }
         
-        # If we have resume text, use embeddings to rank the jobs
-        job_descriptions = [job["description"] for job in jobs]
-        
-        # Generate embeddings
-        resume_embedding = embedding_model.encode([resume_text]).astype("float32")
-        job_embeddings = embedding_model.encode(job_descriptions).astype("float32")
-        
-        # Use FAISS for efficient similarity search
-        dimension = job_embeddings.shape[1]
-        index = faiss.IndexFlatL2(dimension)
-        index.add(job_embeddings)
-        
-        # Search for similar jobs
-        distances, indices = index.search(resume_embedding, len(jobs))
-        
-        # Normalize distances to similarity scores (higher is better)
-        # Since FAISS returns L2 distances (lower is better), we convert to similarity
-        max_distance = np.max(distances) if len(distances) > 0 and len(distances[0]) > 0 else 1
-        similarities = [1 - (distance / max_distance) for distance in distances[0]]
-        
-        # Sort jobs by similarity
+        # If we have resume text, prefilter on skills/keywords and only
+        # embed the surviving job descriptions
+        index = InvertedIndex()
+        for job in jobs:
+            index.add(extract_terms(job["title"]) * 2 + extract_terms(job["description"]))
+        # Only this path encodes postings, so only here do dropped duplicates save encodes
+        dedup["encodesSaved"] += dedup["duplicates"]
+
+        check_deadline("encode", needed=ENCODE_MIN_SECONDS)
+        resume_embedding = embedding_model.encode([resume_text]).astype("float32")[0]
+        resume_embedding /= np.linalg.norm(resume_embedding) or 1.0
+
+        def dense_scores(rows):
+            ids = [job_ids[row] for row in rows]
+            job_embeddings = corpus.embeddings_for(ids)
+            missing = [i for i, vector in enumerate(job_embeddings) if vector is None]
+            if missing:
+                check_deadline("encode", needed=ENCODE_MIN_SECONDS)
+                encoded = embedding_model.encode([jobs[rows[i]]["description"] for i in missing]).astype("float32")
+                encoded /= np.linalg.norm(encoded, axis=1, keepdims=True).clip(min=1e-12)
+                corpus.add_jobs([corpus_record(jobs[rows[i]], ids[i]) for i in missing], encoded)
+                for i, vector in zip(missing, encoded):
+                    job_embeddings[i] = vector
+            dedup["encodesSaved"] += len(rows) - len(missing)
+            return np.stack(job_embeddings) @ resume_embedding
+
+        results, _ = hybrid_search(
+            index,
+            query_terms(resume_text, skills),
+            dense_scores,
+            top_k=limit,
+            rows=rows,
+            **(fusion or {})
+        )
+
+        # Results are already sorted by fused score (highest first)
         ranked_jobs = []
-        for i, idx in enumerate(indices[0]):
-            if idx < len(jobs):  # Safety check
-                job = jobs[idx].copy()
-                job["similarityScore"] = float(similarities[i])
-                ranked_jobs.append(job)
-        
-        # Sort by similarity score (highest first)
-        ranked_jobs.sort(key=lambda x: x["similarityScore"], reverse=True)
+        for result in results:
+            job = dict(jobs[result["row"]], jobId=job_ids[result["row"]])
+            job["similarityScore"] = result["denseScore"]
+            job["matchScore"] = result["score"]
+            ranked_jobs.append(job)
         
         return {
             "status": "success",
             "data": {
-                "matches": ranked_jobs,
+                "matches": project_jobs(ranked_jobs, projection, stored),
                 "metadata": {
                     "query": {
                         "jobTitle": job_title,
                         "location": location
                     },
                     "total": len(ranked_jobs),
+                    "dedup": dedup,
+                    "freshness": freshness,
                     "generatedAt": datetime.now().isoformat()
                 }
             }
@@ -181,6 +352,39 @@ def find_matching_jobs(resume_text=None, job_title=None, location=None, limit=5,
             "message": f"Error finding matching jobs: {str(e)}"
         }
 
+def run_job_matching(params, embedding_model=None):
+    """Run find_matching_jobs (or a refresh cycle) for a request's parameters."""
+    if params.get("refresh"):
+        return refresh_popular_jobs(params, embedding_model=embedding_model)
+
+    # Extract parameters
+    job_title = params.get("jobTitle")
+    fusion = {
+        "lexical_weight": params.get("lexicalWeight"),
+        "dense_weight": params.get("denseWeight"),
+        "rrf_k": params.get("rrfK"),
+        "prefilter_k": params.get("prefilterK")
+    }
+
+    # Validate required parameters
+    if not job_title:
+        return {
+            "status": "error",
+            "message": "Job title is required"
+        }
+
+    return find_matching_jobs(
+        resume_text=params.get("resumeText"),
+        job_title=job_title,
+        location=params.get("location", ""),
+        limit=int(params.get("limit", 5)),
+        embedding_model=embedding_model,
+        skills=params.get("skills", []),
+        fusion=fusion,
+        filters=params.get("filters"),
+        projection=projection_from(params)
+    )
+
 def main():
     """
     Main function to parse command line arguments and execute job matching
@@ -195,31 +399,15 @@ def main():
             return
             
         params = json.loads(sys.argv[1])
-        
-        # Extract parameters
-        resume_text = params.get("resumeText")
-        job_title = params.get("jobTitle")
-        location = params.get("location", "")
-        limit = int(params.get("limit", 5))
-        
-        # Validate required parameters
-        if not job_title:
-            print(json.dumps({
-                "status": "error",
-                "message": "Job title is required"
-            }))
-            return
             
-        # Execute job matching
-        result = find_matching_jobs(
-            resume_text=resume_text,
-            job_title=job_title,
-            location=location,
-            limit=limit
-        )
+        # Execute job matching within the caller's deadline, if one was given,
+        # and under the profiler if "profile" or --profile was given
+        with deadline_scope(Deadline.from_ms(params.get("deadlineMs"))):
+            result = call_with_profile("job_matching", profile_requested(params, sys.argv[2:]),
+                                       run_job_matching, params)
         
-        # Return result as JSON
-        print(json.dumps(result))
+        # Return result as compact JSON
+        print(dumps(result))
         
     except Exception as e:
         print(json.dumps({
@@ -228,4 +416,4 @@ def main():
         }))
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,797 @@
+#!/usr/bin/env python3
+"""
+Load Test
+
+Drives the Python entry points at a fixed concurrency or arrival rate
+against local stand-ins for Groq and SerpAPI, so runs are repeatable,
+offline and free:
+
+    match_jobs, parse_enhanced_resume, generate_cover_letter  (enhancer_wrapper.py)
+    find_matching_jobs                                         (job_matching.py)
+
+Usage:
+    python load_test.py --concurrency 8 --duration 60
+    python load_test.py --rate 4 --requests 200 --mode spawn --mix match_jobs=3,find_matching_jobs=1
+    python load_test.py --groq-latency 1500:600 --groq-errors 0.05 --label slow-groq
+    python load_test.py --compare load_test_runs/a.json load_test_runs/b.json
+
+Modes:
+    serve  one `enhancer_wrapper.py --serve` worker pool fed over stdin (default)
+    spawn  a new process per call, the way pythonBridge.js calls the scripts
+
+--concurrency runs a closed loop (each client waits for its reply before
+sending the next request); --rate runs an open loop with Poisson arrivals,
+where latency is measured from the scheduled arrival so a backed-up
+system can't hide its queueing delay.
+
+The stand-ins listen on 127.0.0.1 and reach the code under test through
+GROQ_BASE_URL and SERPAPI_URL. Latency is lognormal around a median
+("MEDIAN_MS:SPREAD_MS"); failures are returned at the given rate, half as
+429 and half as 500. Corpus, caches and stores go to a scratch directory
+per run unless --state-dir is given.
+
+Each run reports throughput, p50/p95/p99 latency and error rates per
+function and overall, plus the peak PSS (proportional set size) of the process tree under test,
+and is saved as JSON under LOAD_TEST_DIR (default load_test_runs/).
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+PY_MODELS_DIR = SCRIPTS_DIR.parent.parent / "py_models"
+WRAPPER_SCRIPT = PY_MODELS_DIR / "enhancer_wrapper.py"
+JOB_MATCHING_SCRIPT = SCRIPTS_DIR / "job_matching.py"
+
+RUNS_DIR = os.environ.get("LOAD_TEST_DIR", "load_test_runs")
+FUNCTIONS = ("match_jobs", "parse_enhanced_resume", "generate_cover_letter", "find_matching_jobs")
+DEFAULT_MIX = "match_jobs=2,parse_enhanced_resume=2,generate_cover_letter=1,find_matching_jobs=2"
+# Where the code under test keeps state; pointed at a scratch directory per run
+STATE_ENV = ("JOB_CORPUS_DIR", "SECTION_CACHE_DIR", "RESUME_STORE_DIR", "PDF_CACHE_DIR", "PROFILE_DIR",
+             "SKILL_TAXONOMY_DIR")
+JOBS_PER_PAGE = 10
+MEMORY_INTERVAL = 0.2
+OUTCOMES = ("ok", "error", "overloaded", "deadline", "timeout")
+
+
+# ----------------------------------------------------------------------
+# Stand-ins for Groq and SerpAPI
+# ----------------------------------------------------------------------
+class ServiceProfile:
+    """Latency distribution and failure rate of one stand-in service."""
+
+    def __init__(self, latency="0", error_rate=0.0):
+        median, _, spread = str(latency).partition(":")
+        self.median_ms = float(median)
+        self.spread_ms = float(spread or 0)
+        self.error_rate = float(error_rate)
+
+    def delay(self):
+        if self.median_ms <= 0:
+            return 0.0
+        sigma = self.spread_ms / self.median_ms
+        return random.lognormvariate(math.log(self.median_ms), sigma) / 1000
+
+    def to_dict(self):
+        return {"medianMs": self.median_ms, "spreadMs": self.spread_ms, "errorRate": self.error_rate}
+
+
+SKILLS = ("Python", "SQL", "React", "TypeScript", "AWS", "Docker", "Kubernetes", "PostgreSQL",
+          "Machine learning", "REST APIs", "Spark", "Go", "Terraform", "CI/CD", "GraphQL")
+COMPANIES = ("Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises")
+LOCATIONS = ("Bengaluru, India", "Pune, India", "Hyderabad, India", "Remote")
+
+
+def fake_resume_document():
+    return {
+        "about": "Software developer who builds reliable data-heavy web services.",
+        "skills": list(SKILLS[:8]),
+        "experience": [{"heading": "Software Developer at ABC Inc (2019-Present)",
+                        "details": ["Built REST APIs in Python serving 2M requests a day",
+                                    "Cut p95 latency by 40% by moving reports to a queue"]}],
+        "education": ["BS Computer Science"],
+        "projects": [{"heading": "Project X", "details": ["Realtime job feed with React and PostgreSQL"]}],
+        "certifications": ["AWS Certified Developer"],
+        "achievements": ["Speaker at a local Python meetup"]
+    }
+
+
+def fake_resume_text():
+    document = fake_resume_document()
+    lines = ["**About**", document["about"], "", "**Skills**"]
+    lines += [f"- {skill}" for skill in document["skills"]]
+    for title in ("experience", "projects"):
+        lines += ["", f"**{title.title()}**"]
+        for entry in document[title]:
+            lines.append(entry["heading"])
+            lines += [f"- {detail}" for detail in entry["details"]]
+    for title in ("education", "certifications", "achievements"):
+        lines += ["", f"**{title.title()}**"] + [f"- {item}" for item in document[title]]
+    return "\n".join(lines)
+
+
+def fake_completion(request):
+    """A chat.completion for a request: JSON in JSON mode, else resume or letter text."""
+    prompt = " ".join(str(message.get("content", "")) for message in request.get("messages", []))
+    if (request.get("response_format") or {}).get("type") == "json_object":
+        content = json.dumps(fake_resume_document())
+    elif "cover letter" in prompt.lower():
+        content = ("Dear Hiring Manager,\n\nI am excited to apply for this role. "
+                   "I have built Python services and REST APIs used by millions of people.\n\n"
+                   "I would welcome the chance to discuss how I can help your team.\n\nSincerely,\nJohn Doe")
+    else:
+        content = fake_resume_text()
+    prompt_tokens = len(prompt) // 4
+    completion_tokens = len(content) // 4
+    return {
+        "id": f"chatcmpl-standin-{random.getrandbits(48):x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "stand-in"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                     "finish_reason": "stop", "logprobs": None}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                  "total_tokens": prompt_tokens + completion_tokens}
+    }
+
+
+def fake_search_page(query, page_token, pages):
+    """One page of google_jobs results for a query, with a next_page_token until `pages`."""
+    page = int(page_token.rsplit("-", 1)[-1]) if page_token else 0
+    jobs = []
+    for offset in range(JOBS_PER_PAGE):
+        number = page * JOBS_PER_PAGE + offset
+        skills = [SKILLS[(number + k) % len(SKILLS)] for k in range(4)]
+        jobs.append({
+            "job_id": f"standin-{zlib.crc32(query.encode()):08x}-{number}",
+            "title": f"{query or 'Software Engineer'} {['', 'II', 'Senior', 'Lead'][number % 4]}".strip(),
+            "company_name": f"{COMPANIES[number % len(COMPANIES)]} {number}",
+            "location": LOCATIONS[number % len(LOCATIONS)],
+            "via": "via Stand-in Jobs",
+            "description": (f"We are hiring a {query} to build and run our platform. "
+                            f"Requirements: {skills[0]} and {skills[1]} in production. "
+                            f"Experience with {skills[2]} is required. Nice to have: {skills[3]}."),
+            "apply_options": [{"title": "Stand-in", "link": f"https://jobs.example.com/{number}"}],
+            "detected_extensions": {"schedule_type": "Full-time", "posted_at": f"{number % 7 + 1} days ago"}
+        })
+    result = {"search_metadata": {"status": "Success"}, "jobs_results": jobs}
+    if page + 1 < pages:
+        result["serpapi_pagination"] = {"next_page_token": f"page-{page + 1}"}
+    return result
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _delay_or_fail(self, service):
+        """Sleep for the service's latency; True if a failure was sent instead of a result."""
+        profile = self.server.profiles[service]
+        time.sleep(profile.delay())
+        status = 200
+        if random.random() < profile.error_rate:
+            status = random.choice((429, 500))
+        self.server.count(service, status)
+        if status != 200:
+            self._send(status, {"error": {"message": f"Stand-in {service} failure", "code": status}})
+            return True
+        return False
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self.path.endswith("/chat/completions"):
+            self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        if not self._delay_or_fail("groq"):
+            self._send(200, fake_completion(json.loads(body or b"{}")))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/search":
+            self._send(404, {"error": f"Unknown path {url.path}"})
+            return
+        query = parse_qs(url.query)
+        if not self._delay_or_fail("serpapi"):
+            self._send(200, fake_search_page(query.get("q", [""])[0], query.get("next_page_token", [None])[0],
+                                             self.server.search_pages))
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Groq (POST /openai/v1/chat/completions) and SerpAPI (GET /search) on one port."""
+
+    daemon_threads = True
+
+    def __init__(self, groq, serpapi, search_pages=1, port=0):
+        super().__init__(("127.0.0.1", port), StandInHandler)
+        self.profiles = {"groq": groq, "serpapi": serpapi}
+        self.search_pages = search_pages
+        self.counts = {"groq": {}, "serpapi": {}}
+        self._lock = threading.Lock()
+
+    def count(self, service, status):
+        with self._lock:
+            self.counts[service][str(status)] = self.counts[service].get(str(status), 0) + 1
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="stand-ins", daemon=True).start()
+        return self
+
+
+# ----------------------------------------------------------------------
+# Request payloads
+# ----------------------------------------------------------------------
+ROLES = ("Software Developer", "Data Engineer", "Backend Engineer", "Frontend Developer", "ML Engineer")
+
+
+def sample_resume(variant):
+    """The enhancer_test.py resume, varied so section caches see `variant` distinct resumes."""
+    role = ROLES[variant % len(ROLES)]
+    return {
+        "data": {
+            "resumeId": f"load-{variant}",
+            "classification": {
+                "contactInfo": {"name": f"John Doe {variant}", "email": f"john{variant}@example.com",
+                                "phone": "123-456-7890", "address": "123 Main St",
+                                "linkedin": "linkedin.com/in/johndoe"},
+                "education": ["BS Computer Science"],
+                "experience": [{"role": role, "organization": "ABC Inc", "duration": "2019-Present",
+                                "description": f"Developing software as a {role.lower()} (#{variant})"}],
+                "projects": [{"name": "Project X", "description": "A cool project"}],
+                "skills": [SKILLS[(variant + k) % len(SKILLS)] for k in range(4)],
+                "certifications": [],
+                "achievements": []
+            },
+            "isScannedDocument": False
+        }
+    }
+
+
+def build_request(function_name, index, resume_variants):
+    variant = index % resume_variants
+    resume = sample_resume(variant)
+    role = ROLES[variant % len(ROLES)]
+    if function_name == "generate_cover_letter":
+        return {"resumeData": resume, "selectedJobTitle": role, "companyName": COMPANIES[variant % len(COMPANIES)],
+                "selectedJobDescription": f"We are hiring a {role} with Python and SQL experience."}
+    if function_name == "find_matching_jobs":
+        classification = resume["data"]["classification"]
+        return {"jobTitle": role, "location": LOCATIONS[variant % len(LOCATIONS)], "limit": 5,
+                "resumeText": f"{role}. {classification['experience'][0]['description']}",
+                "skills": classification["skills"]}
+    return resume
+
+
+def parse_mix(spec):
+    """'match_jobs=2,find_matching_jobs=1' -> {"match_jobs": 2.0, "find_matching_jobs": 1.0}"""
+    mix = {}
+    for part in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in FUNCTIONS:
+            raise ValueError(f"Unknown function '{name}'. Choose from: {', '.join(FUNCTIONS)}")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("The mix needs at least one function with a positive weight")
+    return mix
+
+
+# ----------------------------------------------------------------------
+# Targets: the code under test
+# ----------------------------------------------------------------------
+def classify(reply):
+    """Outcome of one call: ok, error, overloaded, deadline or timeout."""
+    result = reply.get("result")
+    failed = "error" in reply or (isinstance(result, dict) and result.get("status") == "error")
+    if not failed:
+        return "ok"
+    if reply.get("timeout"):
+        return "timeout"
+    if reply.get("overloaded"):
+        return "overloaded"
+    message = str(reply.get("error") or result.get("message", "")).lower()
+    if reply.get("deadlineExceeded") or "deadline" in message:
+        return "deadline"
+    return "error"
+
+
+class ServeTarget:
+    """An `enhancer_wrapper.py --serve` worker pool; replies are matched to requests by id."""
+
+    def __init__(self, env, log, workers=None, max_pending=None, deadline_ms=None):
+        command = [sys.executable, str(WRAPPER_SCRIPT), "--serve"]
+        if workers:
+            command += ["--workers", str(workers)]
+        if max_pending:
+            command += ["--max-pending", str(max_pending)]
+        self.deadline_ms = deadline_ms
+        self.process = subprocess.Popen(command, cwd=PY_MODELS_DIR, env=env, stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, stderr=log, text=True, bufsize=1)
+        self.ids = itertools.count(1)
+        self.waiters = {}
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.ready_info = {}
+        self.exited = False
+        threading.Thread(target=self._read_replies, name="serve-replies", daemon=True).start()
+
+    def _read_replies(self):
+        for line in self.process.stdout:
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if message.get("event") == "ready":
+                self.ready_info = message
+                self.ready.set()
+                continue
+            with self.lock:
+                waiter = self.waiters.pop(message.get("id"), None)
+            if waiter:
+                waiter[1] = message
+                waiter[0].set()
+        # The pool exited: fail everything still waiting
+        with self.lock:
+            self.exited = True
+            waiters, self.waiters = self.waiters, {}
+        self.ready.set()
+        for waiter in waiters.values():
+            waiter[1] = {"error": "Worker pool exited"}
+            waiter[0].set()
+
+    def wait_ready(self, timeout):
+        if not self.ready.wait(timeout) or self.exited:
+            raise RuntimeError("The worker pool did not become ready")
+        return self.ready_info
+
+    def call(self, function_name, data, timeout):
+        request_id = str(next(self.ids))
+        waiter = [threading.Event(), None]
+        request = {"id": request_id, "function": function_name, "data": data}
+        if self.deadline_ms:
+            request["deadlineMs"] = self.deadline_ms
+        with self.lock:
+            if self.exited:
+                return {"error": "Worker pool exited"}
+            self.waiters[request_id] = waiter
+            try:
+                self.process.stdin.write(json.dumps(request) + "\n")
+                self.process.stdin.flush()
+            except OSError:
+                self.waiters.pop(request_id, None)
+                return {"error": "Worker pool exited"}
+        if not waiter[0].wait(timeout):
+            with self.lock:
+                self.waiters.pop(request_id, None)
+            return {"error": f"No reply within {timeout}s", "timeout": True}
+        return waiter[1]
+
+    def pids(self):
+        return [self.process.pid]
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=15)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            self.process.terminate()
+            self.process.wait()
+
+
+class SpawnTarget:
+    """A fresh Python process per call, as pythonBridge.js and the Node controllers do."""
+
+    def __init__(self, env, log, deadline_ms=None):
+        self.env = env
+        self.log = log
+        self.deadline_ms = deadline_ms
+        self.running = set()
+        self.lock = threading.Lock()
+        self.ready_info = {}
+
+    def wait_ready(self, timeout):
+        return {}
+
+    def _command(self, function_name, data):
+        if function_name == "find_matching_jobs":
+            if self.deadline_ms:
+                data = {**data, "deadlineMs": self.deadline_ms}
+            return [sys.executable, str(JOB_MATCHING_SCRIPT), json.dumps(data)]
+        command = [sys.executable, str(WRAPPER_SCRIPT), "--function", function_name, "--data", json.dumps(data)]
+        if self.deadline_ms:
+            command += ["--deadline-ms", str(self.deadline_ms)]
+        return command
+
+    def call(self, function_name, data, timeout):
+        process = subprocess.Popen(self._command(function_name, data), cwd=PY_MODELS_DIR, env=self.env,
+                                   stdout=subprocess.PIPE, stderr=self.log, text=True)
+        with self.lock:
+            self.running.add(process.pid)
+        try:
+            output, _ = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            return {"error": f"No reply within {timeout}s", "timeout": True}
+        finally:
+            with self.lock:
+                self.running.discard(process.pid)
+
+        # The JSON result is the last line on stdout
+        for line in reversed(output.strip().splitlines()):
+            try:
+                payload = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(payload, dict) and "error" in payload:
+                return payload
+            return {"result": payload}
+        return {"error": f"Exited with code {process.returncode} without a JSON result"}
+
+    def pids(self):
+        with self.lock:
+            return list(self.running)
+
+    def close(self):
+        pass
+
+
+# ----------------------------------------------------------------------
+# Peak PSS of the process tree under test
+# ----------------------------------------------------------------------
+def _children_by_parent():
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # Fields after the command name, which may itself contain spaces
+                parent = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+    return children
+
+
+def _process_pss(pid, page_size):
+    """Proportional set size of a process in bytes, or its RSS without smaps_rollup."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        pass
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * page_size
+
+
+def tree_pss_mb(root_pids):
+    """
+    Total PSS in MB of the given processes and all their descendants. Pages
+    forked workers share copy-on-write are split between them rather than
+    counted once per worker, as summing RSS would.
+    """
+    children = _children_by_parent()
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    pending = list(root_pids)
+    seen = set()
+    total = 0
+    while pending:
+        pid = pending.pop()
+        if pid in seen:
+            continue
+        seen.add(pid)
+        pending.extend(children.get(pid, []))
+        try:
+            total += _process_pss(pid, page_size)
+        except (OSError, IndexError, ValueError):
+            continue
+    return total / (1024 * 1024)
+
+
+class MemoryMonitor:
+    """Samples the PSS of a target's process tree every MEMORY_INTERVAL seconds."""
+
+    def __init__(self, target):
+        self.target = target
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="memory-monitor", daemon=True)
+
+    def _run(self):
+        while True:
+            self.peak_mb = max(self.peak_mb, tree_pss_mb(self.target.pids()))
+            if self._stop.wait(MEMORY_INTERVAL):
+                return
+
+    def start(self):
+        if os.path.isdir("/proc"):
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+
+# ----------------------------------------------------------------------
+# Load generation
+# ----------------------------------------------------------------------
+def run_load(target, mix, concurrency=None, rate=None, duration=None, total=None, timeout=120,
+             resume_variants=20, seed=0):
+    """
+    Call the target until `duration` seconds pass or `total` requests were
+    sent. Returns [{"function", "outcome", "latencyMs", "startedAt"}].
+    """
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    records = []
+    lock = threading.Lock()
+    counter = itertools.count()
+    start = time.perf_counter()
+
+    def next_request():
+        with lock:
+            index = next(counter)
+            if (total is not None and index >= total) or \
+                    (duration is not None and time.perf_counter() - start >= duration):
+                return None
+            function_name = rng.choices(names, weights)[0]
+        return index, function_name
+
+    def call(index, function_name, scheduled):
+        reply = target.call(function_name, build_request(function_name, index, resume_variants), timeout)
+        finished = time.perf_counter()
+        with lock:
+            records.append({"function": function_name, "outcome": classify(reply),
+                            "latencyMs": round((finished - scheduled) * 1000, 2),
+                            "startedAt": round(scheduled - start, 3)})
+
+    if rate:
+        # Open loop: arrivals don't wait for replies
+        with ThreadPoolExecutor(max_workers=concurrency or 256, thread_name_prefix="load") as executor:
+            scheduled = start
+            while True:
+                request = next_request()
+                if request is None:
+                    break
+                scheduled += rng.expovariate(rate)
+                time.sleep(max(0.0, scheduled - time.perf_counter()))
+                executor.submit(call, *request, scheduled)
+    else:
+        def client():
+            while True:
+                request = next_request()
+                if request is None:
+                    return
+                call(*request, time.perf_counter())
+
+        clients = [threading.Thread(target=client, name=f"load-{n}") for n in range(concurrency or 1)]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+
+    return records, time.perf_counter() - start
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(records, elapsed):
+    """Per-function and overall throughput, latency percentiles and error rates."""
+    groups = {"all": records}
+    for record in records:
+        groups.setdefault(record["function"], []).append(record)
+
+    summary = {}
+    for name, group in groups.items():
+        outcomes = {outcome: 0 for outcome in OUTCOMES}
+        for record in group:
+            outcomes[record["outcome"]] += 1
+        latencies = sorted(record["latencyMs"] for record in group if record["outcome"] == "ok")
+        summary[name] = {
+            "requests": len(group),
+            "outcomes": outcomes,
+            "errorRate": round(1 - outcomes["ok"] / len(group), 4) if group else 0.0,
+            "throughput": round(len(group) / elapsed, 3) if elapsed else 0.0,
+            "okThroughput": round(outcomes["ok"] / elapsed, 3) if elapsed else 0.0,
+            "latencyMs": {
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "max": latencies[-1] if latencies else None,
+                "mean": round(sum(latencies) / len(latencies), 2) if latencies else None
+            }
+        }
+    return summary
+
+
+def _ms(value):
+    return f"{value:9.1f}" if value is not None else f"{'-':>9}"
+
+
+def print_report(run):
+    print(f"\n{run['label']}: {run['mode']} mode, {run['load']}, {run['elapsedSeconds']:.1f}s, "
+          f"peak PSS {run['peakPssMb']:.0f} MB")
+    print(f"{'function':24s} {'reqs':>6} {'req/s':>7} {'ok/s':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'err%':>6}  failures")
+    for name, stats in sorted(run["summary"].items(), key=lambda item: (item[0] == "all", item[0])):
+        latency = stats["latencyMs"]
+        failures = ", ".join(f"{outcome} {count}" for outcome, count in stats["outcomes"].items()
+                             if outcome != "ok" and count)
+        print(f"{name:24s} {stats['requests']:6d} {stats['throughput']:7.2f} {stats['okThroughput']:7.2f} "
+              f"{_ms(latency['p50'])} {_ms(latency['p95'])} {_ms(latency['p99'])} "
+              f"{100 * stats['errorRate']:6.1f}  {failures or '-'}")
+    print(f"stand-ins: {json.dumps(run['standIns']['requests'])}")
+
+
+def save_run(run, directory=RUNS_DIR):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{run['label']}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+    return path
+
+
+def _change(before, after):
+    if before is None or after is None:
+        return f"{'-':>8}"
+    if not before:
+        return f"{'new':>8}" if after else f"{'0%':>8}"
+    return f"{100 * (after - before) / before:+7.1f}%"
+
+
+def compare_runs(path_a, path_b):
+    """Print how run b differs from run a, per function."""
+    with open(path_a, "r", encoding="utf-8") as f:
+        a = json.load(f)
+    with open(path_b, "r", encoding="utf-8") as f:
+        b = json.load(f)
+    print(f"a: {a['label']} ({a['mode']}, {a['load']})  {path_a}")
+    print(f"b: {b['label']} ({b['mode']}, {b['load']})  {path_b}")
+    print(f"{'function':24s} {'metric':10s} {'a':>10} {'b':>10} {'change':>9}")
+    names = sorted(set(a["summary"]) | set(b["summary"]), key=lambda name: (name == "all", name))
+    for name in names:
+        stats_a, stats_b = a["summary"].get(name, {}), b["summary"].get(name, {})
+        rows = [("ok/s", stats_a.get("okThroughput"), stats_b.get("okThroughput"))]
+        rows += [(metric, stats_a.get("latencyMs", {}).get(metric), stats_b.get("latencyMs", {}).get(metric))
+                 for metric in ("p50", "p95", "p99")]
+        rows.append(("err%", 100 * stats_a["errorRate"] if stats_a else None,
+                     100 * stats_b["errorRate"] if stats_b else None))
+        for metric, before, after in rows:
+            print(f"{name:24s} {metric:10s} {_ms(before):>10} {_ms(after):>10} {_change(before, after):>9}")
+    print(f"{'process tree':24s} {'peak PSS':10s} {_ms(a['peakPssMb']):>10} {_ms(b['peakPssMb']):>10} "
+          f"{_change(a['peakPssMb'], b['peakPssMb']):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Python entry points against local Groq/SerpAPI stand-ins")
+    parser.add_argument("--compare", nargs=2, metavar=("RUN_A", "RUN_B"), help="Compare two saved runs and exit")
+    parser.add_argument("--mode", choices=["serve", "spawn"], default="serve")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Function weights, e.g. match_jobs=2,find_matching_jobs=1")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Closed loop: clients each waiting for a reply (with --rate: cap on requests in flight)")
+    parser.add_argument("--rate", type=float, default=None, help="Open loop: mean arrivals per second (Poisson)")
+    parser.add_argument("--duration", type=float, default=None, help="Seconds to send requests for")
+    parser.add_argument("--requests", type=int, default=None, help="Number of requests to send")
+    parser.add_argument("--timeout", type=float, default=120, help="Client-side timeout per request, in seconds")
+    parser.add_argument("--deadline-ms", type=float, default=None, help="Deadline passed with every request")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes in serve mode")
+    parser.add_argument("--max-pending", type=int, default=None, help="Worker pool shedding limit in serve mode")
+    parser.add_argument("--resumes", type=int, default=20, help="Distinct sample resumes to cycle through")
+    parser.add_argument("--groq-latency", default="800:300", help="Groq stand-in latency, MEDIAN_MS[:SPREAD_MS]")
+    parser.add_argument("--groq-errors", type=float, default=0.0, help="Groq stand-in failure rate (0-1)")
+    parser.add_argument("--serpapi-latency", default="400:150", help="SerpAPI stand-in latency, MEDIAN_MS[:SPREAD_MS]")
+    parser.add_argument("--serpapi-errors", type=float, default=0.0, help="SerpAPI stand-in failure rate (0-1)")
+    parser.add_argument("--serpapi-pages", type=int, default=1, help="Result pages per SerpAPI query")
+    parser.add_argument("--state-dir", default=None, help="Corpus/cache directory (default: a fresh scratch directory)")
+    parser.add_argument("--label", default="run", help="Name for the saved run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_runs(*args.compare)
+        return
+    if args.duration is None and args.requests is None:
+        args.duration = 30
+    mix = parse_mix(args.mix)
+    if not args.rate and not args.concurrency:
+        args.concurrency = 4
+
+    random.seed(args.seed)
+    stand_ins = StandInServer(ServiceProfile(args.groq_latency, args.groq_errors),
+                              ServiceProfile(args.serpapi_latency, args.serpapi_errors),
+                              search_pages=args.serpapi_pages).start()
+    state_dir = os.path.abspath(args.state_dir or tempfile.mkdtemp(prefix="load_test_state_"))
+    env = dict(os.environ,
+               GROQ_BASE_URL=stand_ins.base_url,
+               SERPAPI_URL=f"{stand_ins.base_url}/search",
+               GROQ_API_KEY=os.environ.get("GROQ_API_KEY", "load-test"),
+               JOB_REFRESH_INTERVAL="0",
+               **{name: os.path.join(state_dir, name.lower()) for name in STATE_ENV})
+    log_path = os.path.join(state_dir, "load_test.log")
+    load = f"rate {args.rate}/s" if args.rate else f"concurrency {args.concurrency}"
+    print(f"Stand-ins on {stand_ins.base_url}; state and logs in {state_dir}", file=sys.stderr)
+
+    with open(log_path, "a", encoding="utf-8") as log:
+        if args.mode == "serve":
+            target = ServeTarget(env, log, workers=args.workers, max_pending=args.max_pending,
+                                 deadline_ms=args.deadline_ms)
+        else:
+            target = SpawnTarget(env, log, deadline_ms=args.deadline_ms)
+        try:
+            try:
+                ready_info = target.wait_ready(timeout=600)
+            except RuntimeError as e:
+                print(f"{e}; see {log_path}", file=sys.stderr)
+                sys.exit(1)
+            print(f"Running {load} for {f'{args.duration:g}s' if args.duration else f'{args.requests} requests'} "
+                  f"in {args.mode} mode", file=sys.stderr)
+            monitor = MemoryMonitor(target).start()
+            try:
+                records, elapsed = run_load(target, mix, concurrency=args.concurrency, rate=args.rate,
+                                            duration=args.duration, total=args.requests, timeout=args.timeout,
+                                            resume_variants=args.resumes, seed=args.seed)
+            finally:
+                monitor.stop()
+        finally:
+            target.close()
+            stand_ins.shutdown()
+
+    run = {
+        "label": args.label,
+        "startedAt": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(time.time() - elapsed)),
+        "mode": args.mode,
+        "load": load,
+        "config": {key: value for key, value in vars(args).items() if key != "compare"},
+        "mix": mix,
+        "elapsedSeconds": round(elapsed, 3),
+        "peakPssMb": round(monitor.peak_mb, 1),
+        "ready": ready_info,
+        "standIns": {"groq": stand_ins.profiles["groq"].to_dict(),
+                     "serpapi": stand_ins.profiles["serpapi"].to_dict(),
+                     "requests": stand_ins.counts},
+        "summary": summarize(records, elapsed),
+        "requests": records
+    }
+    print_report(run)
+    print(f"Saved {save_run(run)}")
+
+
+if __name__ == "__main__":
+    main()
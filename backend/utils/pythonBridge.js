@@ -20,6 +20,10 @@ const PYTHON_VENV_PATH = path.resolve(process.cwd(), '../py_env/bin/python');
 // Default timeout for Python processes (in milliseconds)
 const DEFAULT_TIMEOUT = process.env.PYTHON_TIMEOUT ? parseInt(process.env.PYTHON_TIMEOUT) : 60000; // 60 seconds
 
+// Time reserved for process exit and output parsing; the Python side gets the
+// rest of the timeout as its deadline so it stops work the caller would drop
+const DEADLINE_MARGIN = process.env.PYTHON_DEADLINE_MARGIN ? parseInt(process.env.PYTHON_DEADLINE_MARGIN) : 1000;
+
 // Performance metrics
 const metrics = {
   functionCalls: 0,
@@ -76,49 +80,49 @@ const verifyTemplates = async () => {
 };
 
 /**
- * Execute a Python function with the provided arguments
+ * Determine the Python executable (the virtual environment if available)
+ * @returns {Promise<string>} - Path or name of the Python executable
+ */
+const resolvePythonExecutable = async () => {
+  try {
+    await fs.access(PYTHON_VENV_PATH);
+    logger.info(`Using Python virtual environment: ${PYTHON_VENV_PATH}`);
+    return PYTHON_VENV_PATH;
+  } catch (error) {
+    logger.warn(`Python virtual environment not found at ${PYTHON_VENV_PATH}, falling back to system Python`);
+    return 'python3';
+  }
+};
+
+/**
+ * Deadline handed to the Python side: the timeout minus the margin reserved
+ * for process exit and output parsing
+ * @param {number} timeout - Timeout in milliseconds
+ * @returns {number} - Deadline in milliseconds
+ */
+const deadlineFor = (timeout) => Math.max(timeout - DEADLINE_MARGIN, 0);
+
+/**
+ * Run a Python process and resolve with its parsed JSON output
  * 
- * @param {string} functionName - Name of the function to call
- * @param {Object} data - Data to pass to the Python function
- * @param {number} timeout - Timeout in milliseconds (default: 60000)
- * @returns {Promise<Object>} - Promise resolving with the Python function result
+ * @param {string[]} args - Arguments for the Python executable
+ * @param {Object} options - timeout, label (for logs) and rejectOnError
+ *   (reject when the output carries an "error" field)
+ * @returns {Promise<Object>} - Promise resolving with the parsed output
  */
-const executePythonFunction = async (functionName, data, timeout = DEFAULT_TIMEOUT) => {
-  return new Promise(async (resolve, reject) => {
+const runPythonProcess = async (args, { timeout, label, rejectOnError }) => {
+  const pythonExecutable = await resolvePythonExecutable();
+
+  return new Promise((resolve, reject) => {
     let timeoutId;
     let isResolved = false;
 
     try {
-      // Check if wrapper script exists
-      await fs.access(PYTHON_WRAPPER_SCRIPT)
-        .catch((error) => {
-          logger.error(`Python wrapper script not found: ${PYTHON_WRAPPER_SCRIPT}`, { error });
-          throw new Error(`Python wrapper script not found: ${PYTHON_WRAPPER_SCRIPT}`);
-        });
-      
-      // Prepare input data for Python script
-      const jsonData = JSON.stringify(data);
-      
-      // Determine Python executable (use virtual environment if available)
-      let pythonExecutable;
-      try {
-        await fs.access(PYTHON_VENV_PATH);
-        logger.info(`Using Python virtual environment: ${PYTHON_VENV_PATH}`);
-        pythonExecutable = PYTHON_VENV_PATH;
-      } catch (error) {
-        logger.warn(`Python virtual environment not found at ${PYTHON_VENV_PATH}, falling back to system Python`);
-        pythonExecutable = 'python3';
-      }
-      
       // Log the command for debugging
-      logger.info(`Executing Python command: ${pythonExecutable} ${PYTHON_WRAPPER_SCRIPT} --function ${functionName}`);
+      logger.info(`Executing Python command: ${pythonExecutable} ${label}`);
       
       // Spawn Python process
-      const pythonProcess = spawn(pythonExecutable, [
-        PYTHON_WRAPPER_SCRIPT,
-        '--function', functionName,
-        '--data', jsonData
-      ]);
+      const pythonProcess = spawn(pythonExecutable, args);
       
       let result = '';
       let errorOutput = '';
@@ -127,7 +131,7 @@ const executePythonFunction = async (functionName, data, timeout = DEFAULT_TIMEO
       timeoutId = setTimeout(() => {
         if (!isResolved) {
           isResolved = true;
-          logger.error(`Python process timed out after ${timeout}ms`, { function: functionName });
+          logger.error(`Python process timed out after ${timeout}ms`, { function: label });
           
           // Kill the process
           try {
@@ -170,7 +174,7 @@ const executePythonFunction = async (functionName, data, timeout = DEFAULT_TIMEO
           const parsedResult = JSON.parse(result);
           
           // Check if the result contains an error
-          if (parsedResult.error) {
+          if (rejectOnError && parsedResult.error) {
             logger.error('Python function returned an error', { 
               error: parsedResult.error,
               traceback: parsedResult.traceback
@@ -181,6 +185,16 @@ const executePythonFunction = async (functionName, data, timeout = DEFAULT_TIMEO
           
           resolve(parsedResult);
         } catch (error) {
+          // Batch scripts write one JSON object per line
+          const lines = result.split('\n').filter((line) => line.trim());
+          try {
+            if (lines.length > 1) {
+              resolve({ results: lines.map((line) => JSON.parse(line)) });
+              return;
+            }
+          } catch (lineError) {
+            // Not NDJSON either
+          }
           logger.error('Failed to parse Python output as JSON', { error, output: result });
           // If it's not JSON, just return the raw output
           resolve({ rawOutput: result });
@@ -203,12 +217,67 @@ const executePythonFunction = async (functionName, data, timeout = DEFAULT_TIMEO
       if (isResolved) return;
       isResolved = true;
       
-      logger.error('Error in executePythonFunction', { error });
+      logger.error('Error in runPythonProcess', { error });
       reject(error);
     }
   });
 };
 
+/**
+ * Execute a Python function with the provided arguments
+ * 
+ * @param {string} functionName - Name of the function to call
+ * @param {Object} data - Data to pass to the Python function
+ * @param {number} timeout - Timeout in milliseconds (default: 60000)
+ * @returns {Promise<Object>} - Promise resolving with the Python function result
+ */
+const executePythonFunction = async (functionName, data, timeout = DEFAULT_TIMEOUT) => {
+  // Check if wrapper script exists
+  try {
+    await fs.access(PYTHON_WRAPPER_SCRIPT);
+  } catch (error) {
+    logger.error(`Python wrapper script not found: ${PYTHON_WRAPPER_SCRIPT}`, { error });
+    throw new Error(`Python wrapper script not found: ${PYTHON_WRAPPER_SCRIPT}`);
+  }
+
+  return runPythonProcess([
+    PYTHON_WRAPPER_SCRIPT,
+    '--function', functionName,
+    '--data', JSON.stringify(data),
+    '--deadline-ms', String(deadlineFor(timeout))
+  ], { timeout, label: `${PYTHON_WRAPPER_SCRIPT} --function ${functionName}`, rejectOnError: true });
+};
+
+/**
+ * Execute a standalone Python script (e.g. scripts/job_matching.py) that
+ * takes its parameters as one JSON argument. The remaining time budget is
+ * passed as deadlineMs, so the script stops work the caller would drop.
+ * 
+ * @param {string} scriptPath - Path to the Python script
+ * @param {Object} params - Parameters, serialised as the JSON argument
+ * @param {number} timeout - Timeout in milliseconds (default: 60000)
+ * @returns {Promise<Object>} - Promise resolving with the script's JSON output
+ *   ({ results: [...] } for scripts that write one JSON object per line)
+ */
+const executePythonScript = async (scriptPath, params = {}, timeout = DEFAULT_TIMEOUT) => {
+  try {
+    await fs.access(scriptPath);
+  } catch (error) {
+    logger.error(`Python script not found: ${scriptPath}`, { error });
+    throw new Error(`Python script not found: ${scriptPath}`);
+  }
+
+  // A caller may ask for a tighter deadline, never a looser one
+  const deadlineMs = params.deadlineMs !== undefined
+    ? Math.min(Number(params.deadlineMs), deadlineFor(timeout))
+    : deadlineFor(timeout);
+
+  return runPythonProcess([
+    scriptPath,
+    JSON.stringify({ ...params, deadlineMs })
+  ], { timeout, label: scriptPath, rejectOnError: false });
+};
+
 /**
  * Enhance a resume using the Python enhancement function
  * 
@@ -290,6 +359,25 @@ const matchJobs = async (resumeData) => {
   }
 };
 
+/**
+ * Get stored job postings by id (e.g. references returned by job matching)
+ * 
+ * @param {string[]} jobIds - Ids of the stored postings
+ * @param {Object} projection - Optional fields / snippetLength projection
+ * @returns {Promise<Object>} - Promise resolving with { jobs }
+ */
+const getJobs = async (jobIds, projection = {}) => {
+  try {
+    // Call Python function to look up the postings
+    const result = await executePythonFunction('get_jobs', { jobIds, ...projection });
+    
+    return result;
+  } catch (error) {
+    logger.error('Job lookup failed', { error });
+    throw new Error(`Job lookup failed: ${error.message}`);
+  }
+};
+
 /**
  * Generate a learning path based on resume data
  * 
@@ -350,9 +438,11 @@ const getPerformanceMetrics = () => {
 
 module.exports = {
   executePythonFunction,
+  executePythonScript,
   enhanceResume,
   generateLatex,
   matchJobs,
+  getJobs,
   generateLearningPath,
   generateCoverLetter,
   resolveTemplatePath,
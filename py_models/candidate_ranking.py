@@ -0,0 +1,119 @@
+"""
+Candidate Ranking
+
+Reverse matching: given a job posting, rank the stored resumes that fit it
+best. The posting is embedded once, the resume vector store is searched in a
+single pass, and the top-N hits can be re-ranked by how many of the skills
+the posting asks for each candidate lists.
+"""
+
+import re
+import time
+
+from skill_gap import AMBIGUOUS_NAMES, TAXONOMY
+
+WORD_PATTERN = re.compile(r"[a-z0-9+#.]+")
+
+
+def _normalize_skill(skill):
+    # Keep ".net" and "node.js", drop sentence-final periods
+    return " ".join(word.rstrip(".") or word for word in WORD_PATTERN.findall(str(skill).lower()))
+
+
+# Normalised skill name or alias -> canonical taxonomy skill
+SKILL_NAMES = {}
+for _skills in TAXONOMY.values():
+    for _skill, _aliases in _skills.items():
+        for _name in [_skill] + _aliases:
+            SKILL_NAMES.setdefault(_normalize_skill(_name), _skill)
+LEXICAL_SKILL_NAMES = {name: skill for name, skill in SKILL_NAMES.items() if name not in AMBIGUOUS_NAMES}
+
+
+def posting_skills(posting_text):
+    """Canonical taxonomy skills named (by name or alias) in a posting."""
+    padded = f" {_normalize_skill(posting_text)} "
+    return {skill for name, skill in LEXICAL_SKILL_NAMES.items() if f" {name} " in padded}
+
+
+def skill_overlap_score(skills, posting_text, required=None):
+    """
+    Fraction of the posting's skills that the candidate lists.
+
+    The posting's skills are the taxonomy skills it names (pass required to
+    reuse posting_skills() across candidates) plus any other skill of the
+    candidate's that appears in the text, unless it is too common a word to
+    match in free text (AMBIGUOUS_NAMES). Multi-word skills must appear as a
+    contiguous phrase. Candidates are scored against the same posting, so
+    listing many skills neither inflates nor dilutes the score.
+    """
+    normalized = {_normalize_skill(skill) for skill in skills or []}
+    normalized.discard("")
+    if required is None:
+        required = posting_skills(posting_text)
+
+    posting = f" {_normalize_skill(posting_text)} "
+    matched = set()
+    for skill in normalized:
+        canonical = SKILL_NAMES.get(skill)
+        if canonical in required:
+            matched.add(canonical)
+        elif skill not in AMBIGUOUS_NAMES and f" {skill} " in posting:
+            # Ambiguous names ("go", "rest") only count through the taxonomy,
+            # never as ordinary words in the text
+            matched.add(canonical or skill)
+
+    asked = len(required | matched)
+    return len(matched) / asked if asked else 0.0
+
+
+def rank_candidates_for_job(job_title, job_description, encode, store,
+                            top_k=10, rerank_top_n=100, skill_weight=0.3):
+    """
+    Return the top_k resumes in the store for a job posting.
+
+    encode is a callable mapping a list of texts to an embedding matrix
+    (e.g. SentenceTransformer.encode). When skill_weight is non-zero the best
+    rerank_top_n dense hits are re-scored as
+    (1 - skill_weight) * similarity + skill_weight * skill overlap, where the
+    overlap is the share of the posting's skills the candidate lists.
+    """
+    timings = {}
+    posting_text = f"{job_title or ''}\n{job_description or ''}".strip()
+
+    start = time.perf_counter()
+    query_embedding = encode([posting_text])
+    timings["encodeMs"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    pool_size = max(top_k, rerank_top_n) if skill_weight else top_k
+    hits = store.search(query_embedding, top_k=pool_size)
+    timings["searchMs"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    required = posting_skills(posting_text) if skill_weight else set()
+    candidates = []
+    for hit in hits:
+        metadata = hit.get("metadata", {})
+        overlap = skill_overlap_score(metadata.get("skills", []), posting_text, required) if skill_weight else 0.0
+        candidates.append({
+            "key": hit["key"],
+            "userId": metadata.get("userId"),
+            "resumeId": metadata.get("resumeId"),
+            "name": metadata.get("name", ""),
+            "version": hit["version"],
+            "similarityScore": hit["score"],
+            "skillOverlap": overlap,
+            "score": (1 - skill_weight) * hit["score"] + skill_weight * overlap
+        })
+    candidates.sort(key=lambda c: c["score"], reverse=True)
+    timings["rerankMs"] = (time.perf_counter() - start) * 1000
+
+    return {
+        "candidates": candidates[:top_k],
+        "metadata": {
+            "query": {"jobTitle": job_title},
+            "searched": len(store),
+            "total": min(top_k, len(candidates)),
+            "timings": {name: round(value, 2) for name, value in timings.items()}
+        }
+    }
@@ -0,0 +1,93 @@
+"""
+Request Deadlines
+
+Every request can carry a deadline that each stage checks before starting
+work it cannot finish in time (LLM calls, SerpAPI pages, encoding). The
+active deadline lives in a context variable, so code deep in the call stack
+can check it without threading an extra argument through every function.
+
+    with deadline_scope(Deadline.from_ms(25000)):
+        ...
+        check_deadline("groq", needed=LLM_MIN_SECONDS)
+        client.create(..., timeout=request_timeout(60))
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+
+# Rough lower bounds for how long a stage needs; work is skipped when less
+# than this remains.
+LLM_MIN_SECONDS = 2.0
+SERPAPI_PAGE_SECONDS = 1.5
+ENCODE_MIN_SECONDS = 0.05
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the remaining budget cannot cover the next stage."""
+
+
+class Overloaded(Exception):
+    """Raised when the admission queue is full and a request is shed."""
+
+
+class Deadline:
+    """Absolute wall-clock deadline; None means unbounded."""
+
+    def __init__(self, expires_at=None):
+        self.expires_at = expires_at
+
+    @classmethod
+    def from_ms(cls, milliseconds):
+        if milliseconds is None:
+            return cls()
+        return cls(time.time() + float(milliseconds) / 1000)
+
+    def remaining(self):
+        if self.expires_at is None:
+            return float("inf")
+        return self.expires_at - time.time()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def check(self, stage, needed=0.0):
+        remaining = self.remaining()
+        if remaining < needed or remaining <= 0:
+            raise DeadlineExceeded(
+                f"Deadline exceeded before {stage}: {max(remaining, 0) * 1000:.0f}ms left, "
+                f"{needed * 1000:.0f}ms needed"
+            )
+
+
+_UNBOUNDED = Deadline()
+_current = contextvars.ContextVar("deadline", default=_UNBOUNDED)
+
+
+def current_deadline():
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline):
+    """Make deadline the active deadline for the enclosed block."""
+    token = _current.set(deadline or _UNBOUNDED)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def check_deadline(stage, needed=0.0):
+    """Raise DeadlineExceeded if the active deadline can't cover `needed` seconds."""
+    _current.get().check(stage, needed)
+
+
+def has_budget(needed):
+    """True if at least `needed` seconds remain on the active deadline."""
+    return _current.get().remaining() >= needed
+
+
+def request_timeout(default):
+    """Timeout for an outbound call: the default, capped by the remaining budget."""
+    return max(0.001, min(default, _current.get().remaining()))
@@ -1,18 +1,31 @@
-from sentence_transformers import SentenceTransformer
 import faiss
 import numpy as np
 import pickle
-import re
 from tqdm.notebook import tqdm
 import requests
 from jinja2 import Environment, FileSystemLoader
 import time
 import serpapi
-import json
-from groq import Groq
+from groq import Groq, AsyncGroq
 import os
-
-model = SentenceTransformer("all-MiniLM-L6-v2")
+from resume_store import ResumeVectorStore, resume_key
+from candidate_ranking import rank_candidates_for_job
+from job_corpus import JobCorpus, job_from_record, job_id
+from job_dedup import SignatureIndex, dedupe_jobs
+from resume_parser import parse_sections
+from resume_schema import parse_resume_output, schema_instructions
+from section_enhancer import SectionCache, enhance_sections
+from llm_policy import call_with_policy
+from payloads import project_jobs, projection_from
+from model_bundle import load_model
+from skill_gap import SkillTaxonomy, analyze_skill_gap, format_gap
+from prompt_budget import (compact_resume, contact_lines, count_tokens,
+                           learning_path_prompt, resume_prompt)
+from deadline import (check_deadline, has_budget, request_timeout,
+                      ENCODE_MIN_SECONDS, LLM_MIN_SECONDS, SERPAPI_PAGE_SECONDS)
+
+# Shared, process-wide embedding model (loaded from the local bundle when there is one)
+model = load_model()
 
 ats_snippets = [
     "Use action verbs like 'Led', 'Managed', 'Developed', instead of passive phrases.",
@@ -37,8 +50,18 @@ faiss.write_index(index, "cv_guide.index")
 with open("cv_guide_texts.pkl", "wb") as f:
     pickle.dump(chunks, f)
 
-def retrieve_cv_guidelines(query_text, top_k=3):
-    query_embedding = model.encode([query_text]).astype("float32")
+def encode(texts):
+    """Encode texts with the shared model, respecting the request deadline."""
+    check_deadline("encode", needed=ENCODE_MIN_SECONDS)
+    return np.asarray(model.encode(texts)).astype("float32")
+
+# Skills taxonomy for the learning path's gap analysis, embedded once (cached on disk);
+# the model reports its dimension, so a warm cache costs no forward pass
+skill_taxonomy = SkillTaxonomy(encode, dimension=model.get_sentence_embedding_dimension())
+
+def retrieve_cv_guidelines(query_text, top_k=3, query_embedding=None):
+    if query_embedding is None:
+        query_embedding = encode([query_text])
     index = faiss.read_index("cv_guide.index")
     with open("cv_guide_texts.pkl", "rb") as f:
         guide_chunks = pickle.load(f)
@@ -51,12 +74,8 @@ def flatten_resume_json(resume_json):
     parts = []
 
     # Contact Info
-    contact = classification.get("contactInfo", {})
-    parts.append(f"Name: {contact.get('name', '')}")
-    parts.append(f"Email: {contact.get('email', '')}")
-    parts.append(f"Phone: {contact.get('phone', '')}")
-    parts.append(f"Address: {contact.get('address', '')}")
-    parts.append(f"LinkedIn: {contact.get('linkedin', '')}")
+    # Contact Info (empty fields are left out of the prompt)
+    parts.extend(contact_lines(classification.get("contactInfo", {})))
 
     # Education
     education = classification.get("education", [])
@@ -100,54 +119,80 @@ def flatten_resume_json(resume_json):
 
     return "\n".join(parts)
 
-def embed_resume_for_future_matching(resume_text):
-    emb = model.encode([resume_text]).astype("float32")
-    index = faiss.IndexFlatL2(emb.shape[1])
-    index.add(emb)
-    faiss.write_index(index, "resume_vectors.index")
-
-def build_prompt(resume_json):
-    resume_text = flatten_resume_json(resume_json)
-    rag_context = retrieve_cv_guidelines(resume_text, top_k=3)
-    embed_resume_for_future_matching(resume_text)
+resume_store = ResumeVectorStore()
+job_corpus = JobCorpus()
+job_signatures = SignatureIndex(os.path.join(job_corpus.root, "signatures.json"))
 
-    return f"""
-        You are a resume enhancement AI.
-
-        From the following raw resume data and RAG context, extract and rewrite content into structured professional resume sections: About, Skills, Experience, Education, Projects, Certifications, and Achievements.
+def embed_resume_for_future_matching(resume_text, resume_json=None, embedding=None):
+    """
+    Upsert the resume into the per-user resume vector store so it can be
+    found again by reverse (job -> candidates) searches.
+    Returns the store key and the stored version.
+    """
+    if embedding is None:
+        embedding = encode([resume_text])
+
+    data = (resume_json or {}).get("data", {})
+    key = resume_key(data.get("userId"), data.get("resumeId"))
+    classification = data.get("classification", {})
+    metadata = {
+        "userId": data.get("userId"),
+        "resumeId": data.get("resumeId"),
+        "name": classification.get("contactInfo", {}).get("name", ""),
+        "skills": classification.get("skills", [])
+    }
+    version = resume_store.upsert(key, embedding, metadata)
+    return key, version
 
-        Only return the enhanced resume content. Content should fit into a single page. Do NOT include any explanations, notes, or repeat the prompt.
-        === RAG CONTEXT ===
-        {rag_context}
-        === Resume Input ===
-        {resume_text}
+def build_prompt(resume_json, output_format="text"):
+    resume_text = flatten_resume_json(resume_json)
+    resume_embedding = encode([resume_text])
+    rag_context = retrieve_cv_guidelines(resume_text, top_k=3, query_embedding=resume_embedding)
+    embed_resume_for_future_matching(resume_text, resume_json, embedding=resume_embedding)
 
-        === Enhanced Resume ===
-    """
+    # Guidelines are trimmed first, then the resume, if the prompt runs over budget
+    return resume_prompt(resume_text, rag_context,
+                         schema=schema_instructions() if output_format == "json" else None)
 
 os.environ["GROQ_API_KEY"] = "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"
 
-client = Groq(api_key=os.environ["GROQ_API_KEY"])
-
-def query_groq(prompt: str) -> str:
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[
-            {
-                "role": "system",
-                "content": "You are a helpful resume enhancement assistant that interprets user's resume and enhances them while matching their resumes with suitable jobs and suggesting ways to the user to upskill."
-            },
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ],
-        temperature=0.7,
-        max_tokens=1000,
-        top_p=1,
-        stop=None,
-    )
-    return response.choices[0].message.content.strip()
+# GROQ_BASE_URL / SERPAPI_URL point the clients at local stand-ins (see backend/scripts/load_test.py)
+GROQ_BASE_URL = os.environ.get("GROQ_BASE_URL") or None
+SERPAPI_URL = os.environ.get("SERPAPI_URL")
+
+client = Groq(api_key=os.environ["GROQ_API_KEY"], base_url=GROQ_BASE_URL)
+async_client = AsyncGroq(api_key=os.environ["GROQ_API_KEY"], base_url=GROQ_BASE_URL)
+
+def query_groq(prompt: str, llm_model: str = "llama-3.3-70b-versatile", json_mode: bool = False,
+               max_tokens: int = 1000) -> str:
+    # JSON mode makes the API guarantee a syntactically valid JSON object
+    extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+
+    async def attempt(model, timeout):
+        response = await async_client.chat.completions.create(
+            timeout=timeout,
+            model=model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are a helpful resume enhancement assistant that interprets user's resume and enhances them while matching their resumes with suitable jobs and suggesting ways to the user to upskill."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=0.7,
+            max_tokens=max_tokens,
+            top_p=1,
+            stop=None,
+            **extra
+        )
+        return response.choices[0].message.content.strip()
+
+    # Hedged after a slow primary response, smaller model when the deadline
+    # is close; the policy also enforces the remaining budget
+    return call_with_policy(attempt, primary=llm_model, details={"promptTokens": count_tokens(prompt)})
 
 def structure_user_prompt(user_prompt):
     """
@@ -166,7 +211,7 @@ def structure_user_prompt(user_prompt):
     Apply these modifications to the resume along with the enhancement.
     """
 
-def modify_resume(user_prompt="", resume_json=None):
+def modify_resume(user_prompt="", resume_json=None, output_format="text"):
     if resume_json is None:
         raise ValueError("Resume JSON must be provided.")
 
@@ -174,57 +219,78 @@ def modify_resume(user_prompt="", resume_json=None):
     structured_instruction = structure_user_prompt(user_prompt)
 
     # Step 2: Build the basic enhancement prompt
-    base_prompt = build_prompt(resume_json)
+    base_prompt = build_prompt(resume_json, output_format=output_format)
 
     # Step 3: Combine prompts
     final_prompt = base_prompt + structured_instruction
 
     # Step 4: Send to Groq (or any LLM)
-    return query_groq(final_prompt)
+    return query_groq(final_prompt, json_mode=output_format == "json")
+
 
+section_cache = SectionCache()
+
+# Per-unit output limit for incremental enhancement; one entry needs far
+# less than a whole resume
+SECTION_MAX_TOKENS = 400
+
+def modify_resume_incremental(user_prompt="", resume_json=None, llm_model="llama-3.3-70b-versatile"):
+    """
+    Enhance the resume one section (or entry) at a time, in parallel,
+    reusing cached results for unchanged sections. Returns (text, stats).
+    """
+    if resume_json is None:
+        raise ValueError("Resume JSON must be provided.")
+
+    resume_text = flatten_resume_json(resume_json)
+    resume_embedding = encode([resume_text])
+    guidelines = retrieve_cv_guidelines(resume_text, top_k=3, query_embedding=resume_embedding)
+    embed_resume_for_future_matching(resume_text, resume_json, embedding=resume_embedding)
+
+    return enhance_sections(
+        resume_json["data"]["classification"],
+        query=lambda prompt: query_groq(prompt, llm_model=llm_model, max_tokens=SECTION_MAX_TOKENS),
+        guidelines=guidelines,
+        user_instruction=structure_user_prompt(user_prompt),
+        cache=section_cache,
+        model=llm_model
+    )
+
+
+def use_incremental(resume_json):
+    """Section-level enhancement is enabled per request (options.incremental) or via ENHANCER_INCREMENTAL."""
+    option = resume_json.get("options", {}).get("incremental")
+    if option is not None:
+        return bool(option)
+    return os.environ.get("ENHANCER_INCREMENTAL", "").lower() in ("1", "true", "yes")
+
+
+def use_json_mode(resume_json):
+    """JSON mode is enabled per request (options.jsonMode) or via ENHANCER_JSON_MODE."""
+    option = resume_json.get("options", {}).get("jsonMode")
+    if option is not None:
+        return bool(option)
+    return os.environ.get("ENHANCER_JSON_MODE", "").lower() in ("1", "true", "yes")
 
 
 def parse_enhanced_resume(resume_json):
-    raw_text = modify_resume(resume_json=resume_json)
+    section_stats = None
+    if use_incremental(resume_json):
+        # Only sections whose content changed since the last run are regenerated
+        raw_text, section_stats = modify_resume_incremental(resume_json=resume_json)
+        parsed = parse_sections(raw_text)
+    elif use_json_mode(resume_json):
+        # Schema-constrained output, validated and repaired locally
+        raw_text = modify_resume(resume_json=resume_json, output_format="json")
+        parsed = parse_resume_output(raw_text)
+    else:
+        raw_text = modify_resume(resume_json=resume_json)
+        parsed = parse_sections(raw_text)
 
     metadata = resume_json["data"]["classification"]["contactInfo"]
-    section_titles = [
-        "About", "Skills", "Experience", "Education", "Projects",
-        "Certifications", "Achievements"
-    ]
-
-    sections = {title.lower(): [] for title in section_titles}
-    current_section = None
-
-    lines = raw_text.strip().splitlines()
-    for line in lines:
-        # Detect section headers like **Skills**
-        match = re.match(r"\*\*(.*?)\*\*", line.strip())
-        if match:
-            header = match.group(1).strip()
-            if header in section_titles:
-                current_section = header.lower()
-                continue
-
-        # Store content lines under the current section
-        if current_section:
-            content = line.strip("•").strip("-").strip()
-            if content:
-                sections[current_section].append(content)
+    sections = parsed["sections"]
 
     # Now build the final resume JSON
-    def get_single_line(section_name):
-        items = sections.get(section_name.lower(), [])
-        return items[0] if items else ""
-
-    def clean_items(items):
-        if items is None:
-            return []
-        cleaned = []
-        for item in items:
-            item = item.lstrip('*+•- ').strip()
-            cleaned.append(item)
-        return cleaned
 
     parsed_resume = {
         "name": metadata.get("name", ""),
@@ -232,19 +298,27 @@ def parse_enhanced_resume(resume_json):
         "phone": metadata.get("phone", ""),
         "address": metadata.get("address", ""),
         "linkedin": metadata.get("linkedin", ""),
-        "about": get_single_line("About"),
-        "skills": clean_items(sections.get("skills", [])),
-        "experience": clean_items(sections.get("experience", [])),
-        "education": clean_items(sections.get("education", [])),
-        "projects": clean_items(sections.get("projects", [])),
-        "certifications": clean_items(sections.get("certifications", [])),
-        "achievements": clean_items(sections.get("achievements", []))
+        "about": " ".join(sections["about"]),
+        "skills": sections["skills"],
+        "experience": sections["experience"],
+        "education": sections["education"],
+        "projects": sections["projects"],
+        "certifications": sections["certifications"],
+        "achievements": sections["achievements"],
+        "experience_entries": parsed["entries"]["experience"],
+        "project_entries": parsed["entries"]["projects"],
+        # Callers can skip a re-generation when this is high
+        "parse_confidence": parsed["confidence"],
+        "parse_problems": parsed.get("problems", [])
     }
+    if section_stats is not None:
+        parsed_resume["section_cache"] = section_stats
 
     return parsed_resume
 
-def render_latex(resume_json, template_path="resume_template.tex"):
-    resume_data = parse_enhanced_resume(resume_json)
+def render_latex(resume_json, template_path="resume_template.tex", resume_data=None):
+    if resume_data is None:
+        resume_data = parse_enhanced_resume(resume_json)
     
     env = Environment(loader=FileSystemLoader('.'))
     template = env.get_template(template_path)
@@ -272,8 +346,15 @@ def get_multiple_jobs_with_pagination(job_title, location):
         else:
             params.pop("next_page_token", None)
 
-        search = serpapi.search(params)   # returns SerpResults (dict-like)
-        data = search          
+        if not all_jobs:
+            check_deadline("SerpAPI search", needed=SERPAPI_PAGE_SECONDS)
+
+        if SERPAPI_URL:
+            response = requests.get(SERPAPI_URL, params=params, timeout=request_timeout(30))
+            response.raise_for_status()
+            data = response.json()
+        else:
+            data = serpapi.search(params)   # returns SerpResults (dict-like)
 
         jobs = data.get("jobs_results", [])
         all_jobs.extend(jobs)
@@ -285,6 +366,10 @@ def get_multiple_jobs_with_pagination(job_title, location):
         if not next_page_token:
             break
 
+        # Cut pagination short when the budget can't cover the pause and another page
+        if not has_budget(1 + SERPAPI_PAGE_SECONDS):
+            break
+
         time.sleep(1)
 
     all_jobs = all_jobs[:max_jobs]
@@ -305,7 +390,10 @@ def get_multiple_jobs_with_pagination(job_title, location):
         result[actual_job_title] = {
             "company_name": company_name,
             "description": description,
-            "application_link": application_link
+            "application_link": application_link,
+            "location": job.get('location', ''),
+            "jobType": job.get('detected_extensions', {}).get('schedule_type', '') or job.get('detected_extensions', {}).get('job_type', ''),
+            "postedTime": job.get('detected_extensions', {}).get('posted_at', '')
         }
 
     return result
@@ -314,94 +402,144 @@ def get_multiple_jobs_with_pagination(job_title, location):
 def embed_job_data(job_title, location):
     job_descriptions_json = get_multiple_jobs_with_pagination(job_title, location)
 
-    descriptions = []
-    metadata = []
+    jobs = []
 
     for title, data in job_descriptions_json.items():
-        description = data.get("description", "")
-        descriptions.append(description)
-
-        metadata.append({
+        jobs.append({
             "title": title,
             "company_name": data.get("company_name", ""),
             "application_link": data.get("application_link", ""),
-            "description": description  # 🔥 also saving description inside metadata now
+            "description": data.get("description", ""),
+            "location": data.get("location", ""),
+            "jobType": data.get("jobType", ""),
+            "postedTime": data.get("postedTime", "")
         })
 
-    # Step 4: Generate embeddings
-    embeddings = model.encode(descriptions)
-    embeddings_np = np.array(embeddings).astype("float32")  # FAISS requires float32
+    if not jobs:
+        return {"jobIds": [], "dedup": {"fetched": 0, "duplicates": 0, "encodesSaved": 0}}
 
-    # Step 5: Create FAISS index and add embeddings
-    dimension = embeddings_np.shape[1]
-    index = faiss.IndexFlatL2(dimension)
-    index.add(embeddings_np)
+    # Syndicated copies (in this batch or already in the corpus) are not re-embedded
+    unique_jobs, job_ids, dedup = dedupe_jobs(jobs, job_signatures, job_id)
+    new_jobs = [dict(job, jobId=jid) for job, jid in zip(unique_jobs, job_ids) if job_corpus.get(jid) is None]
+    dedup["encodesSaved"] = len(jobs) - len(new_jobs)
 
-    # Optional: Save FAISS index
-    faiss.write_index(index, "job_faiss.index")
+    # Generate embeddings and add them, with the skills/keyword index, to the job corpus
+    if new_jobs:
+        job_corpus.add_jobs(new_jobs, encode([job["description"] for job in new_jobs]))
 
-    # Step 6: Save metadata (with descriptions) for lookup
-    with open("job_faiss_metadata.json", "w", encoding="utf-8") as f:
-        json.dump(metadata, f, indent=2, ensure_ascii=False)
+    return {"jobIds": job_ids, "dedup": dedup}
 
 
-def match_jobs(resume_json):
-    enhanced_resume = parse_enhanced_resume(resume_json)
-    render_latex(resume_json)
+def enhanced_resume_text(enhanced_resume):
+    """Flatten the parsed resume dict into plain text for embedding."""
+    parts = []
+    for key in ("about", "skills", "experience", "projects", "education", "certifications", "achievements"):
+        value = enhanced_resume.get(key)
+        if isinstance(value, list):
+            parts.extend(str(item) for item in value)
+        elif value:
+            parts.append(str(value))
+    return "\n".join(parts)
 
-    index = faiss.read_index("job_faiss.index")
-    
-    with open("job_faiss_metadata.json", "r", encoding="utf-8") as f:
-        metadata = json.load(f)
-    
-    model = SentenceTransformer("all-MiniLM-L6-v2")  # Ensure model is loaded
-    resume_embedding = model.encode([enhanced_resume]).astype("float32")
 
+def match_jobs(resume_json, enhanced_resume=None, project=True):
+    if enhanced_resume is None:
+        enhanced_resume = parse_enhanced_resume(resume_json)
+    render_latex(resume_json, resume_data=enhanced_resume)
+
+    resume_text = enhanced_resume_text(enhanced_resume)
+    resume_embedding = encode([resume_text])
+
+    # Hybrid retrieval: skills/keyword BM25 prefilter, dense scoring on survivors
+    skills = enhanced_resume.get("skills", []) + resume_json["data"]["classification"].get("skills", [])
+    options = resume_json.get("options", {})
     top_k = 3
-    D, I = index.search(resume_embedding, top_k)
+    matches, _ = job_corpus.search(
+        resume_embedding,
+        text=resume_text,
+        skills=skills,
+        top_k=top_k,
+        # Facet filters (location, jobType, postedWithin) are applied before scoring
+        filters=options.get("filters"),
+        lexical_weight=options.get("lexicalWeight"),
+        dense_weight=options.get("denseWeight"),
+        rrf_k=options.get("rrfK"),
+        prefilter_k=options.get("prefilterK")
+    )
 
     matched_jobs = []
 
-    for idx in I[0]:
-        job = metadata[idx]
+    for job in matches:
         matched_jobs.append({
+            "jobId": job.get('jobId'),
             "title": job.get('title', ''),
             "company_name": job.get('company_name', ''),
             "application_link": job.get('application_link', ''),
             "description": job.get('description', '')  # 🔥 Include description now
         })
-    
-    return json.dumps({"matched_jobs": matched_jobs}, indent=2, ensure_ascii=False)
+
+    # Callers can trim what comes back: options.fields / snippetLength / references
+    if project:
+        matched_jobs = project_jobs(matched_jobs, projection_from(options),
+                                    stored=lambda job_id_value: job_corpus.get(job_id_value) is not None)
+    return {"matched_jobs": matched_jobs}
 
 #---------------------------Entry Point----------------------------
-def generate_learning_path(resume_json) :
-    enhanced_resume = parse_enhanced_resume(resume_json)
-    job_desc = match_jobs(resume_json)
-    rag_prompt = f"""
-        You are a career advisor AI. The following is a candidate's resume:
+def get_jobs(request_json):
+    """
+    Stored postings for a list of jobIds (e.g. references returned by
+    job_matching.py), in job_matching.py's field names so the same
+    projection applies.
+    """
+    projection = projection_from(request_json)
+    jobs = []
+    for job_id_value in request_json.get("jobIds", []):
+        record = job_corpus.get(job_id_value)
+        if record is not None:
+            jobs.append({"jobId": record["jobId"], **job_from_record(record)})
+    return {"jobs": project_jobs(jobs, projection)}
 
-        --- RESUME ---
-        {enhanced_resume}
+#---------------------------Entry Point----------------------------
+def rank_candidates(job_json):
+    """Rank stored resumes against a job posting (recruiter-side matching)."""
+    job_title = job_json.get("jobTitle", "")
+    job_description = job_json.get("jobDescription", "")
+    if not job_title and not job_description:
+        raise ValueError("jobTitle or jobDescription must be provided.")
+
+    return rank_candidates_for_job(
+        job_title,
+        job_description,
+        encode=encode,
+        store=resume_store,
+        top_k=int(job_json.get("topK", 10)),
+        rerank_top_n=int(job_json.get("rerankTopN", 100)),
+        skill_weight=float(job_json.get("skillWeight", 0.3))
+    )
 
-        These are the job descriptions of top matches:
+#---------------------------Entry Point----------------------------
+def generate_learning_path(resume_json) :
+    enhanced_resume = parse_enhanced_resume(resume_json)
+    matched_jobs = match_jobs(resume_json, enhanced_resume=enhanced_resume, project=False)["matched_jobs"]
 
-        --- JOB DESCRIPTIONS ---
-        {job_desc}
+    # Missing skills are worked out locally; the LLM only writes the learning path
+    skills = [str(skill) for skill in
+              enhanced_resume.get("skills", []) + resume_json["data"]["classification"].get("skills", [])]
+    gap = analyze_skill_gap(skills, matched_jobs, skill_taxonomy, encode)
 
-        1. Identify what technical or domain-specific skills the candidate is missing.
-        2. Recommend a step-by-step learning path (with topics/tools/technologies) to bridge the gap.
-        3. Suggest resources (platforms or certifications) for each skill if possible.
-    """
-    
-    return query_groq(rag_prompt)
+    prompt = learning_path_prompt([f"{job.get('title', '')} at {job.get('company_name', '')}" for job in matched_jobs],
+                                  skills, format_gap(gap, len(matched_jobs)))
+    return {"text": query_groq(prompt), "skillGap": gap}
 
 #----------------------------------------Entry Point----------------------------------------------
 os.environ["GROQ_API_KEY"] = "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"
 
-client = Groq(api_key=os.environ["GROQ_API_KEY"])
+client = Groq(api_key=os.environ["GROQ_API_KEY"], base_url=GROQ_BASE_URL)
 
 def query_groq2(prompt: str) -> str:
+    check_deadline("Groq completion", needed=LLM_MIN_SECONDS)
     response = client.chat.completions.create(
+        timeout=request_timeout(60),
         model="llama-3.3-70b-versatile",
         messages=[
             {
@@ -427,7 +565,7 @@ def generate_cover_letter(resume_json, selected_job_title, selected_job_descript
         The letter should be 3-4 paragraphs, tailored to the job description below, and should highlight how the candidate's skills align with the company's requirements.
 
         --- Candidate's Resume ---
-        {enhance_resume}
+        {compact_resume(enhance_resume)}
 
         --- Job Description ---
         {selected_job_description}
@@ -436,4 +574,4 @@ def generate_cover_letter(resume_json, selected_job_title, selected_job_descript
         Begin your response directly from the actual response, no need to give headers like 'Here is your generated cover letter'.
     """
 
-    return query_groq(prompt, model="llama3-8b-8192")
\ No newline at end of file
+    return query_groq(prompt, llm_model="llama3-8b-8192")
\ No newline at end of file
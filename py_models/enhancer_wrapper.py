@@ -16,6 +16,11 @@ import traceback
 from pathlib import Path
 import logging
 import os
+import time
+
+# Deadlines passed with --deadline-ms count from process start, so the time
+# spent importing the model is part of the budget
+START_TIME = time.time()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
@@ -25,6 +30,8 @@ logger = logging.getLogger("enhancer_wrapper")
 # Add the parent directory to the path so we can import the enhancer module
 parent_dir = str(Path(__file__).parent)
 sys.path.append(parent_dir)
+# Job search lives with the backend scripts
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend" / "scripts"))
 
 logger.info(f"Python version: {sys.version}")
 logger.info(f"Working directory: {os.getcwd()}")
@@ -34,21 +41,158 @@ logger.info(f"Module search path: {sys.path}")
 try:
     logger.info("Attempting to import enhancer module...")
     import enhancer
+    import job_matching
+    from deadline import Deadline, deadline_scope
+    from llm_policy import call_log
+    from payloads import dumps
+    from model_bundle import model_info
+    from request_profiler import profile_requested, profiled
     logger.info("Successfully imported enhancer module")
+    logger.info(f"Embedding model: {json.dumps(model_info())}")
 except ImportError as e:
     error_msg = f"Failed to import enhancer module: {str(e)}"
     logger.error(error_msg)
     print(json.dumps({"error": error_msg}))
     sys.exit(1)
 
+def find_matching_jobs(data):
+    """Job search with the enhancer's already-loaded embedding model."""
+    return job_matching.run_job_matching(data, embedding_model=enhancer.model)
+
+def refresh_popular_jobs(data):
+    return job_matching.refresh_popular_jobs(data, embedding_model=enhancer.model)
+
+def generate_cover_letter(data):
+    """Unpack the fields pythonBridge.js sends for a cover letter."""
+    return enhancer.generate_cover_letter(data["resumeData"], data.get("selectedJobTitle", ""),
+                                          data.get("selectedJobDescription", ""), data.get("companyName", ""))
+
+# Map function names to actual functions
+FUNCTION_MAP = {
+    "parse_enhanced_resume": enhancer.parse_enhanced_resume,
+    "render_latex": enhancer.render_latex,
+    "match_jobs": enhancer.match_jobs,
+    "generate_learning_path": enhancer.generate_learning_path,
+    "generate_cover_letter": generate_cover_letter,
+    "rank_candidates": enhancer.rank_candidates,
+    "get_jobs": enhancer.get_jobs,
+    "find_matching_jobs": find_matching_jobs,
+    "refresh_popular_jobs": refresh_popular_jobs
+}
+
+def format_result(result):
+    """Normalise a function result into the JSON payload returned to Node.js."""
+    if isinstance(result, str):
+        # If the result is a string, assume it's either JSON or plain text
+        try:
+            # Try to parse as JSON first
+            parsed_result = json.loads(result)
+            logger.info("Result is a JSON string, returning parsed JSON")
+            return parsed_result
+        except json.JSONDecodeError:
+            # If not valid JSON, return as text
+            logger.info("Result is a plain text string, wrapping in text field")
+            return {"text": result}
+
+    # If already a dict or other JSON-serializable object
+    logger.info(f"Result is a {type(result).__name__}, returning as JSON")
+    return result
+
+def run_function(function_name, data):
+    logger.info(f"Executing function: {function_name}")
+    with call_log() as llm_calls:
+        result = FUNCTION_MAP[function_name](data)
+    logger.info(f"Function execution completed")
+    payload = format_result(result)
+    # Which model tier served each LLM call, and how long it took
+    if llm_calls and isinstance(payload, dict):
+        payload["llmCalls"] = llm_calls
+    return payload
+
+def execute_function(function_name, data, profile=False):
+    """
+    Execute a mapped function and return its formatted result.
+    Used directly by the CLI and by the worker pool in --serve mode.
+    With profile (or "profile": true in the data or its options) the call
+    runs under the sampling profiler and the payload gets "profile".
+    """
+    if function_name not in FUNCTION_MAP:
+        available_functions = ", ".join(FUNCTION_MAP.keys())
+        raise KeyError(f"Function '{function_name}' not found. Available functions: {available_functions}")
+
+    if not (profile or profile_requested(data)):
+        return run_function(function_name, data)
+
+    with profiled(function_name) as report:
+        payload = run_function(function_name, data)
+        # Include the JSON encoding of the response in the profile
+        dumps(payload)
+    logger.info(f"Profile written to {report['path']} ({report['samples']} samples)")
+    if isinstance(payload, dict):
+        payload["profile"] = report
+    return payload
+
+def serve_forever(args):
+    """Run as a pre-forked worker pool speaking newline-delimited JSON."""
+    from worker_pool import BackgroundTask, serve
+
+    background = []
+    if args.refresh_interval > 0:
+        # Keep the most requested job searches warm in the job corpus
+        logger.info(f"Refreshing the top {args.refresh_top_n} job queries every {args.refresh_interval:.0f}s "
+                    f"(budget {args.refresh_budget} SerpAPI requests)")
+        background.append(BackgroundTask(
+            "refresh_popular_jobs",
+            {"topN": args.refresh_top_n, "budget": args.refresh_budget},
+            interval=args.refresh_interval
+        ))
+
+    logger.info(f"Starting worker pool with {args.workers or os.cpu_count()} workers")
+    serve(
+        execute_function,
+        workers=args.workers,
+        max_requests=args.max_requests,
+        max_rss_mb=args.max_rss_mb,
+        max_pending=args.max_pending,
+        background=background,
+        ready_info={"model": model_info()}
+    )
+
 def main():
     """Main entry point for the wrapper script."""
     parser = argparse.ArgumentParser(description="Python enhancer wrapper for Node.js")
-    parser.add_argument("--function", required=True, help="Function to execute")
-    parser.add_argument("--data", required=True, help="JSON-encoded data for the function")
+    parser.add_argument("--function", help="Function to execute")
+    parser.add_argument("--data", help="JSON-encoded data for the function")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run as a worker pool reading newline-delimited JSON requests from stdin")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes in --serve mode (default: CPU count)")
+    parser.add_argument("--max-requests", type=int, default=500,
+                        help="Recycle a worker after this many requests (0 disables)")
+    parser.add_argument("--max-rss-mb", type=float, default=0,
+                        help="Recycle a worker once its private memory exceeds this many MB (0 disables)")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="Shed requests beyond this many in flight in --serve mode (default: 4 per worker)")
+    parser.add_argument("--refresh-interval", type=float,
+                        default=float(os.environ.get("JOB_REFRESH_INTERVAL", 0)),
+                        help="Refresh popular job searches every this many seconds in --serve mode (0 disables)")
+    parser.add_argument("--refresh-top-n", type=int, default=int(os.environ.get("JOB_REFRESH_TOP_N", 20)),
+                        help="Number of most requested job searches to keep fresh")
+    parser.add_argument("--refresh-budget", type=int, default=int(os.environ.get("JOB_REFRESH_BUDGET", 20)),
+                        help="Maximum SerpAPI requests per refresh cycle")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile the call; the response gets the profile paths and top functions")
+    parser.add_argument("--deadline-ms", type=float, default=None,
+                        help="Deadline for the call in milliseconds, counted from process start")
     
     try:
         args = parser.parse_args()
+        if args.serve:
+            serve_forever(args)
+            return
+
+        if not args.function or args.data is None:
+            parser.error("--function and --data are required unless --serve is given")
+
         function_name = args.function
         logger.info(f"Called with function: {function_name}")
         
@@ -61,29 +205,19 @@ def main():
             print(json.dumps({"error": error_msg}))
             sys.exit(1)
         
-        # Map function names to actual functions
-        function_map = {
-            "parse_enhanced_resume": enhancer.parse_enhanced_resume,
-            "render_latex": enhancer.render_latex,
-            "match_jobs": enhancer.match_jobs,
-            "generate_learning_path": enhancer.generate_learning_path,
-            "generate_cover_letter": enhancer.generate_cover_letter
-        }
-        
         # Check if the requested function exists
-        if function_name not in function_map:
-            available_functions = ", ".join(function_map.keys())
+        if function_name not in FUNCTION_MAP:
+            available_functions = ", ".join(FUNCTION_MAP.keys())
             error_msg = f"Function '{function_name}' not found. Available functions: {available_functions}"
             logger.error(error_msg)
             print(json.dumps({"error": error_msg}))
             sys.exit(1)
         
-        logger.info(f"Executing function: {function_name}")
-        
         # Execute the function
+        deadline = Deadline(START_TIME + args.deadline_ms / 1000) if args.deadline_ms is not None else Deadline()
         try:
-            result = function_map[function_name](data)
-            logger.info(f"Function execution completed")
+            with deadline_scope(deadline):
+                payload = execute_function(function_name, data, profile=args.profile)
         except Exception as e:
             error_msg = f"Error executing function '{function_name}': {str(e)}"
             logger.error(error_msg)
@@ -94,23 +228,9 @@ def main():
             }))
             sys.exit(1)
         
-        # Handle different result types
+        # Serialize the result
         try:
-            if isinstance(result, str):
-                # If the result is a string, assume it's either JSON or plain text
-                try:
-                    # Try to parse as JSON first
-                    parsed_result = json.loads(result)
-                    logger.info("Result is a JSON string, returning parsed JSON")
-                    print(json.dumps(parsed_result))
-                except json.JSONDecodeError:
-                    # If not valid JSON, return as text
-                    logger.info("Result is a plain text string, wrapping in text field")
-                    print(json.dumps({"text": result}))
-            else:
-                # If already a dict or other JSON-serializable object
-                logger.info(f"Result is a {type(result).__name__}, returning as JSON")
-                print(json.dumps(result))
+            print(dumps(payload))
         except Exception as e:
             error_msg = f"Error formatting result: {str(e)}"
             logger.error(error_msg)
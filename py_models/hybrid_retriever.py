@@ -0,0 +1,288 @@
+"""
+Hybrid Retriever
+
+Lexical + semantic retrieval for job postings. An inverted index over
+normalised skills and keywords prefilters candidates cheaply with BM25; the
+dense scorer only runs on the survivors (at most HYBRID_PREFILTER_K rows),
+and the two rankings are merged with weighted reciprocal rank fusion (RRF).
+
+Fusion settings can be configured per call or through the environment:
+    HYBRID_LEXICAL_WEIGHT  (default 1.0)
+    HYBRID_DENSE_WEIGHT    (default 1.0)
+    HYBRID_RRF_K           (default 60)
+    HYBRID_PREFILTER_K     (default 200)
+"""
+
+import itertools
+import math
+import os
+import re
+from collections import Counter
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+STOP_WORDS = frozenset("""
+    a about above after all also an and any are as at be been being both but by can could
+    do does each etc for from has have having he her his how i if in into is it its
+    just may more most must no not of on or other our out over own per same she should
+    so some such than that the their them then there these they this those through to
+    under until up very was we were what when where which while who will with within
+    would you your job role work working team teams candidate candidates company
+    looking ability strong good excellent including etc years year experience
+""".split())
+
+# Common spellings mapped to one canonical skill name
+SKILL_ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "reactjs": "react",
+    "react.js": "react",
+    "nodejs": "node.js",
+    "node": "node.js",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "golang": "go",
+    "postgres": "postgresql",
+    "k8s": "kubernetes",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "aws": "amazon web services",
+    "gcp": "google cloud",
+    "sklearn": "scikit-learn",
+    "py": "python",
+}
+
+
+def _env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def fusion_settings(lexical_weight=None, dense_weight=None, rrf_k=None, prefilter_k=None):
+    """Resolve fusion settings, falling back to the environment defaults."""
+    return {
+        "lexical_weight": _env_float("HYBRID_LEXICAL_WEIGHT", 1.0) if lexical_weight is None else float(lexical_weight),
+        "dense_weight": _env_float("HYBRID_DENSE_WEIGHT", 1.0) if dense_weight is None else float(dense_weight),
+        "rrf_k": _env_float("HYBRID_RRF_K", 60) if rrf_k is None else float(rrf_k),
+        "prefilter_k": int(_env_float("HYBRID_PREFILTER_K", 200)) if prefilter_k is None else int(prefilter_k),
+    }
+
+
+def normalize_skill(skill):
+    """Lower-case a skill, collapse punctuation and map known aliases."""
+    normalized = " ".join(TOKEN_PATTERN.findall(str(skill).lower()))
+    return SKILL_ALIASES.get(normalized, normalized)
+
+
+def extract_terms(text):
+    """Tokenise free text into normalised index terms (stop words removed)."""
+    terms = []
+    for token in TOKEN_PATTERN.findall(str(text).lower()):
+        if token in STOP_WORDS or token.isdigit():
+            continue
+        terms.append(SKILL_ALIASES.get(token, token))
+    return terms
+
+
+def query_terms(text="", skills=None):
+    """
+    Build BM25 query terms from structured skills and free text. Multi-word
+    skills are split into their words so they hit the same postings as
+    free-text documents.
+    """
+    terms = []
+    for skill in skills or []:
+        terms.extend(extract_terms(normalize_skill(skill)))
+    terms.extend(extract_terms(text))
+    return terms
+
+
+class InvertedIndex:
+    """
+    Term -> postings with BM25 scoring. Each term's postings are kept as
+    sorted row / term-frequency arrays (rebuilt lazily after a change), so
+    a query is scored with one vectorised update per query term. A forward
+    index (row -> term counts) makes replacing a row, and scoring a small
+    set of rows, proportional to those rows' terms.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}
+        self.doc_terms = []
+        self._lengths = np.zeros(64, dtype=np.float64)
+        self._total_length = 0
+        self._arrays = {}
+
+    def __len__(self):
+        return len(self.doc_terms)
+
+    def _set_length(self, row, length):
+        if row >= len(self._lengths):
+            self._lengths = np.concatenate([self._lengths, np.zeros(len(self._lengths), dtype=np.float64)])
+        self._total_length += length - self._lengths[row]
+        self._lengths[row] = length
+
+    def _index(self, row, counts):
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[row] = tf
+            self._arrays.pop(term, None)
+
+    def add(self, terms):
+        """Index one document and return its row number."""
+        row = len(self.doc_terms)
+        counts = Counter(terms)
+        self.doc_terms.append(counts)
+        self._set_length(row, len(terms))
+        self._index(row, counts)
+        return row
+
+    def replace(self, row, terms):
+        """Re-index an existing row with new terms."""
+        for term in self.doc_terms[row]:
+            posting = self.postings[term]
+            del posting[row]
+            if not posting:
+                del self.postings[term]
+            self._arrays.pop(term, None)
+        counts = Counter(terms)
+        self.doc_terms[row] = counts
+        self._set_length(row, len(terms))
+        self._index(row, counts)
+
+    def _posting_arrays(self, term):
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            posting = self.postings.get(term)
+            if not posting:
+                return None
+            rows = np.fromiter(posting.keys(), dtype=np.int64, count=len(posting))
+            tfs = np.fromiter(posting.values(), dtype=np.float64, count=len(posting))
+            order = np.argsort(rows)
+            arrays = self._arrays[term] = (rows[order], tfs[order])
+        return arrays
+
+    def _idf(self, document_frequency, num_docs):
+        return math.log(1 + (num_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def bm25(self, terms, rows=None):
+        """
+        BM25 scores of the rows that contain a query term, as (rows, scores)
+        arrays. With rows, only those rows are scored: through the forward
+        index when they are few, otherwise by masking the postings.
+        """
+        num_docs = len(self.doc_terms)
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+        query = Counter(terms)
+        if num_docs == 0 or not query:
+            return empty
+        avg_length = self._total_length / num_docs or 1.0
+        lengths = self._lengths[:num_docs]
+        k1, b = self.k1, self.b
+
+        if rows is not None:
+            rows = np.asarray(rows, dtype=np.int64)
+            posting_size = sum(len(self.postings.get(term, ())) for term in query)
+            if len(rows) * len(query) < posting_size:
+                idfs = {term: self._idf(len(self.postings[term]), num_docs)
+                        for term in query if term in self.postings}
+                hits, scores = [], []
+                for row in rows.tolist():
+                    counts = self.doc_terms[row]
+                    norm = k1 * (1 - b + b * lengths[row] / avg_length)
+                    score = sum(query[term] * idf * counts[term] * (k1 + 1) / (counts[term] + norm)
+                                for term, idf in idfs.items() if term in counts)
+                    if score:
+                        hits.append(row)
+                        scores.append(score)
+                return np.asarray(hits, dtype=np.int64), np.asarray(scores, dtype=np.float64)
+
+        scores = np.zeros(num_docs, dtype=np.float64)
+        for term, query_tf in query.items():
+            arrays = self._posting_arrays(term)
+            if arrays is None:
+                continue
+            posting_rows, tfs = arrays
+            norm = k1 * (1 - b + b * lengths[posting_rows] / avg_length)
+            scores[posting_rows] += query_tf * self._idf(len(posting_rows), num_docs) * tfs * (k1 + 1) / (tfs + norm)
+
+        hits = np.flatnonzero(scores) if rows is None else rows[scores[rows] > 0]
+        return hits, scores[hits]
+
+
+def reciprocal_rank_fusion(rankings, weights, rrf_k=60):
+    """
+    Merge several rankings (name -> list of rows, best first) into one
+    {row: fused score} dict using weighted reciprocal rank fusion.
+    """
+    fused = {}
+    for name, rows in rankings.items():
+        weight = weights.get(name, 1.0)
+        if not weight:
+            continue
+        for rank, row in enumerate(rows):
+            fused[row] = fused.get(row, 0.0) + weight / (rrf_k + rank + 1)
+    return fused
+
+
+def hybrid_search(index, terms, dense_scores, top_k=10, rows=None, **settings):
+    """
+    Rank documents in an InvertedIndex for a query.
+
+    terms        - BM25 query terms (see query_terms)
+    dense_scores - callable mapping an int array of rows to similarity
+                   scores; only called for prefilter survivors
+    rows         - optional int array restricting the searchable rows;
+                   only these rows are scored, lexically or densely
+
+    Returns a list of dicts with row, score, lexicalScore and denseScore,
+    best first, plus the number of vectors that were dense-scored.
+    """
+    settings = fusion_settings(**settings)
+
+    lexical_rows, lexical_scores = index.bm25(terms, rows=rows)
+    keep = min(settings["prefilter_k"], len(lexical_rows))
+    if keep:
+        top = np.argpartition(-lexical_scores, keep - 1)[:keep]
+        top = top[np.argsort(-lexical_scores[top], kind="stable")]
+        lexical_rows, lexical_scores = lexical_rows[top], lexical_scores[top]
+    lexical_ranking = lexical_rows[:keep].tolist()
+    lexical = dict(zip(lexical_ranking, lexical_scores[:keep].tolist()))
+
+    # Too few lexical hits to fill top_k: top up the dense candidates with
+    # other searchable rows, at most up to the prefilter size
+    survivors = list(lexical_ranking)
+    if len(survivors) < top_k:
+        seen = set(survivors)
+        pool = range(len(index)) if rows is None else np.asarray(rows, dtype=np.int64).tolist()
+        room = max(settings["prefilter_k"], top_k) - len(survivors)
+        survivors.extend(itertools.islice((row for row in pool if row not in seen), room))
+
+    if not survivors:
+        return [], 0
+
+    survivor_rows = np.asarray(survivors, dtype=np.int64)
+    dense = np.asarray(dense_scores(survivor_rows), dtype="float32")
+    dense_by_row = {int(row): float(score) for row, score in zip(survivor_rows, dense)}
+    dense_ranking = [int(row) for row in survivor_rows[np.argsort(-dense)]]
+
+    fused = reciprocal_rank_fusion(
+        {"lexical": lexical_ranking, "dense": dense_ranking},
+        {"lexical": settings["lexical_weight"], "dense": settings["dense_weight"]},
+        rrf_k=settings["rrf_k"]
+    )
+    ranked = sorted(fused, key=fused.get, reverse=True)[:top_k]
+
+    results = [{
+        "row": row,
+        "score": fused[row],
+        "lexicalScore": lexical.get(row, 0.0),
+        "denseScore": dense_by_row.get(row, 0.0)
+    } for row in ranked]
+    return results, len(survivors)
@@ -0,0 +1,412 @@
+"""
+Job Corpus
+
+Persistent collection of job postings with their embeddings and a skills /
+keyword inverted index, searched through the hybrid retriever.
+
+Layout on disk (one directory per corpus):
+    corpus.db       - sqlite (WAL) table of job records by row, each with a
+                      stable jobId and the generation that last wrote it,
+                      plus the corpus's row count, dimension and generation
+    embeddings.f32  - float32 matrix, one L2-normalised row per posting,
+                      read through np.memmap
+    .lock           - advisory lock file serialising writers
+
+An add appends new rows (a re-fetched posting overwrites its own row) and
+commits them in one transaction under the next generation, so it costs
+O(added postings). Readers keep the records, the lexical index and the
+facet indexes (location, job type, posting time; see job_facets) in
+memory and, when the generation moves, apply only the rows written since
+the one they hold. Records, index and row count always come from the same
+committed generation.
+
+A corpus written by earlier versions (jobs.json, embeddings.npy,
+lexical.json) is imported the first time it is opened.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from hybrid_retriever import InvertedIndex, extract_terms, hybrid_search, query_terms
+from job_facets import FacetIndex, posted_at
+
+DEFAULT_CORPUS_DIR = os.environ.get("JOB_CORPUS_DIR", "job_corpus")
+DATABASE_FILE = "corpus.db"
+EMBEDDINGS_FILE = "embeddings.f32"
+LOCK_FILE = ".lock"
+# Layout of earlier versions, imported on first open
+LEGACY_FILES = ("jobs.json", "embeddings.npy", "lexical.json")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS corpus (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    dimension INTEGER,
+    rows INTEGER NOT NULL,
+    generation INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    row INTEGER PRIMARY KEY,
+    job_id TEXT NOT NULL UNIQUE,
+    record TEXT NOT NULL,
+    generation INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_generation ON jobs (generation);
+"""
+
+
+def job_id(job):
+    """Stable id for a posting, derived from title, company and link."""
+    parts = [
+        job.get("title", ""),
+        job.get("company", job.get("company_name", "")),
+        job.get("applicationLink", job.get("application_link", ""))
+    ]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def corpus_record(job, job_id_value):
+    """A fetched posting (job_matching.py's field names) as stored in the corpus, in the enhancer's."""
+    return {
+        "jobId": job_id_value,
+        "title": job.get("title", ""),
+        "company_name": job.get("company", ""),
+        "application_link": job.get("applicationLink", ""),
+        "description": job.get("description", ""),
+        "location": job.get("location", ""),
+        "jobType": job.get("jobType", ""),
+        "postedTime": job.get("postedTime", "")
+    }
+
+
+def job_from_record(record):
+    """Inverse of corpus_record: a stored posting in job_matching.py's field names."""
+    return {
+        "title": record.get("title", ""),
+        "company": record.get("company_name", ""),
+        "location": record.get("location", ""),
+        "description": record.get("description", ""),
+        "applicationLink": record.get("application_link", ""),
+        "postedTime": record.get("postedTime", ""),
+        "jobType": record.get("jobType", "")
+    }
+
+
+def job_terms(job):
+    """Index terms for a posting: title words count twice."""
+    title = job.get("title", "")
+    return extract_terms(title) * 2 + extract_terms(job.get("description", ""))
+
+
+def _normalize(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype="float32"))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class JobCorpus:
+    """Job postings, embeddings and lexical index persisted in one directory."""
+
+    def __init__(self, root=DEFAULT_CORPUS_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._db = None
+        self._db_pid = None
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._jobs = []
+        self._rows_by_id = {}
+        self._embeddings = None
+        self._lexical = InvertedIndex()
+        self._facets = FacetIndex.build([])
+        self._generation = None
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    @contextmanager
+    def _write_lock(self):
+        with open(self._path(LOCK_FILE), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _connection(self):
+        # sqlite connections must not cross a fork: reopen in each process
+        if self._db is None or self._db_pid != os.getpid():
+            db = sqlite3.connect(self._path(DATABASE_FILE), isolation_level=None,
+                                 check_same_thread=False, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            with self._write_lock():
+                db.executescript(SCHEMA)
+                if db.execute("SELECT COUNT(*) FROM corpus").fetchone()[0] == 0:
+                    self._initialize(db)
+            self._db = db
+            self._db_pid = os.getpid()
+        return self._db
+
+    def _initialize(self, db):
+        """Create the corpus row, importing a jobs.json corpus if there is one."""
+        jobs_path, embeddings_path, _ = (self._path(name) for name in LEGACY_FILES)
+        if not os.path.exists(jobs_path):
+            db.execute("INSERT INTO corpus VALUES (0, NULL, 0, 0)")
+            return
+
+        with open(jobs_path, "r", encoding="utf-8") as f:
+            jobs = json.load(f)
+        embeddings = np.load(embeddings_path).astype("float32")
+        with open(self._path(EMBEDDINGS_FILE), "wb") as f:
+            f.write(np.ascontiguousarray(embeddings[:len(jobs)]).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        db.execute("BEGIN IMMEDIATE")
+        db.execute("INSERT INTO corpus VALUES (0, ?, ?, 1)", (int(embeddings.shape[1]), len(jobs)))
+        db.executemany("INSERT INTO jobs VALUES (?, ?, ?, 1)",
+                       [(row, job["jobId"], json.dumps(job, ensure_ascii=False)) for row, job in enumerate(jobs)])
+        db.execute("COMMIT")
+        for name in LEGACY_FILES:
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
+
+    @contextmanager
+    def _transaction(self, write=False):
+        """A read snapshot (or, with write, the write lock) over the corpus tables."""
+        with self._lock:
+            db = self._connection()
+            if write:
+                with self._write_lock():
+                    db.execute("BEGIN IMMEDIATE")
+                    try:
+                        yield db
+                    except BaseException:
+                        db.execute("ROLLBACK")
+                        raise
+                    db.execute("COMMIT")
+            else:
+                db.execute("BEGIN")
+                try:
+                    yield db
+                finally:
+                    db.execute("COMMIT")
+
+    def _load(self):
+        """Bring the in-memory records and indexes up to the latest committed generation."""
+        with self._transaction() as db:
+            dimension, rows, generation = db.execute("SELECT dimension, rows, generation FROM corpus").fetchone()
+            if generation == self._generation:
+                return
+            if self._generation is None or generation < self._generation:
+                self._reset()
+            full = self._generation is None
+
+            changes = []
+            changed = db.execute("SELECT row, record FROM jobs WHERE generation > ? ORDER BY row",
+                                 (self._generation or 0,))
+            for row, record in changed:
+                job = json.loads(record)
+                if row < len(self._jobs):
+                    self._lexical.replace(row, job_terms(job))
+                    changes.append((row, self._jobs[row], job))
+                    self._jobs[row] = job
+                else:
+                    self._lexical.add(job_terms(job))
+                    changes.append((row, None, job))
+                    self._jobs.append(job)
+                self._rows_by_id[job["jobId"]] = row
+
+            self._embeddings = (np.memmap(self._path(EMBEDDINGS_FILE), dtype="float32", mode="r",
+                                          shape=(rows, dimension)) if rows else None)
+            self._facets = FacetIndex.build(self._jobs) if full else self._facets.update(changes)
+            self._generation = generation
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._jobs)
+
+    def get(self, job_id_value):
+        """Return the stored job record for a jobId, or None."""
+        with self._lock:
+            self._load()
+            row = self._rows_by_id.get(job_id_value)
+            return None if row is None else self._jobs[row]
+
+    def job(self, row):
+        with self._lock:
+            self._load()
+            return self._jobs[row]
+
+    def embeddings_for(self, job_ids):
+        """Stored (normalised) embedding for each jobId, or None where it isn't stored."""
+        with self._lock:
+            self._load()
+            rows = [self._rows_by_id.get(job_id_value) for job_id_value in job_ids]
+            return [None if row is None else np.array(self._embeddings[row]) for row in rows]
+
+    def add_jobs(self, jobs, embeddings):
+        """
+        Add postings with their embeddings. Postings whose jobId is already
+        stored are replaced in place. Returns the jobIds in input order.
+        """
+        if not jobs:
+            return []
+
+        vectors = _normalize(embeddings)
+        ids = []
+        with self._transaction(write=True) as db:
+            dimension, rows, generation = db.execute("SELECT dimension, rows, generation FROM corpus").fetchone()
+            dimension = dimension or int(vectors.shape[1])
+            if vectors.shape[1] != dimension:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match corpus dimension {dimension}")
+            generation += 1
+            row_bytes = dimension * 4
+
+            fd = os.open(self._path(EMBEDDINGS_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+            with os.fdopen(fd, "r+b") as f:
+                # Drop any tail left behind by a writer that died before committing
+                f.truncate(rows * row_bytes)
+                fetched_at = time.time()
+                for job, vector in zip(jobs, vectors):
+                    record = dict(job)
+                    record["jobId"] = record.get("jobId") or job_id(record)
+                    if "postedAt" not in record:
+                        # "3 days ago" is relative to when the posting was fetched
+                        record["postedAt"] = posted_at(record.get("postedTime"), now=fetched_at)
+                    ids.append(record["jobId"])
+
+                    existing = db.execute("SELECT row FROM jobs WHERE job_id = ?", (record["jobId"],)).fetchone()
+                    if existing is None:
+                        row, rows = rows, rows + 1
+                    else:
+                        row = existing[0]
+                    f.seek(row * row_bytes)
+                    f.write(vector.tobytes())
+                    db.execute("INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?)",
+                               (row, record["jobId"], json.dumps(record, ensure_ascii=False), generation))
+                f.flush()
+                os.fsync(f.fileno())
+
+            db.execute("UPDATE corpus SET dimension = ?, rows = ?, generation = ?", (dimension, rows, generation))
+        return ids
+
+    def filter_rows(self, filters):
+        """Rows matching the facet filters (see job_facets), or None for no filter."""
+        with self._lock:
+            self._load()
+            return self._facets.rows(filters)
+
+    def search(self, query_embedding, text="", skills=None, top_k=10, rows=None, filters=None, **settings):
+        """
+        Hybrid search over the corpus. Returns (jobs, stats) where each job
+        carries matchScore, lexicalScore and similarityScore, and stats
+        reports how many vectors were dense-scored. filters restricts the
+        search to matching rows before any vector is scored.
+        """
+        with self._lock:
+            self._load()
+            return self._search(query_embedding, text, skills, top_k, rows, filters, settings)
+
+    def _search(self, query_embedding, text, skills, top_k, rows, filters, settings):
+        if not self._jobs:
+            return [], {"corpusSize": 0, "denseScored": 0, "filtered": 0}
+
+        if filters:
+            matching = self._facets.rows(filters)
+            rows = matching if rows is None else np.intersect1d(matching, np.asarray(rows, dtype=np.int64))
+            if not len(rows):
+                return [], {"corpusSize": len(self._jobs), "denseScored": 0, "filtered": 0}
+
+        query = _normalize(query_embedding)[0]
+        embeddings = self._embeddings
+        results, dense_scored = hybrid_search(
+            self._lexical,
+            query_terms(text, skills),
+            lambda survivor_rows: embeddings[survivor_rows] @ query,
+            top_k=top_k,
+            rows=rows,
+            **settings
+        )
+
+        matches = []
+        for result in results:
+            job = dict(self._jobs[result["row"]])
+            job["matchScore"] = result["score"]
+            job["lexicalScore"] = result["lexicalScore"]
+            job["similarityScore"] = result["denseScore"]
+            matches.append(job)
+        return matches, {
+            "corpusSize": len(self._jobs),
+            "denseScored": dense_scored,
+            "filtered": len(self._jobs) if rows is None else len(rows)
+        }
+
+
+def _benchmark(size=20000, dimension=384, top_k=10, repeat=5):
+    import random
+    import tempfile
+    import timeit
+
+    rng = np.random.default_rng(0)
+    random.seed(0)
+    cities = [f"City{i}" for i in range(50)] + ["Remote"]
+    types = ["Full-time", "Part-time", "Contractor", "Internship"]
+    skills = ["python", "java", "go", "sql", "react", "aws", "docker", "kubernetes", "spark", "django"]
+    jobs = [{
+        "title": f"{random.choice(skills)} engineer",
+        "company_name": f"Company {i % 500}",
+        "application_link": f"https://jobs.example.com/{i}",
+        "description": " ".join(random.choices(skills, k=12)),
+        "location": f"{random.choice(cities)}, Country",
+        "jobType": random.choice(types),
+        "postedTime": f"{random.randint(0, 60)} days ago"
+    } for i in range(size)]
+
+    corpus = JobCorpus(tempfile.mkdtemp(prefix="job_corpus_bench_"))
+    corpus.add_jobs(jobs, rng.standard_normal((size, dimension)).astype("float32"))
+    query = rng.standard_normal((1, dimension)).astype("float32")
+    text = "python sql django aws"
+
+    print(f"corpus: {size} jobs, {dimension}-d embeddings, top_k={top_k}")
+    for label, filters in (("1 city + full-time + 7d", {"location": "City3", "jobType": "full-time", "postedWithin": "7d"}),
+                           ("1 city", {"location": "City3"}),
+                           ("full-time", {"jobType": "full-time"})):
+        def pre_filter():
+            return corpus.search(query, text=text, top_k=top_k, filters=filters)
+
+        def post_filter():
+            # Rank with the default settings, then drop non-matching postings
+            ranked, stats = corpus.search(query, text=text, top_k=size)
+            allowed = set(corpus.filter_rows(filters).tolist())
+            rows = {job["jobId"]: row for row, job in enumerate(corpus._jobs)}
+            return [job for job in ranked if rows[job["jobId"]] in allowed][:top_k], stats
+
+        pre_results, pre_stats = pre_filter()
+        post_results, post_stats = post_filter()
+        pre_ms = min(timeit.repeat(pre_filter, number=1, repeat=repeat)) * 1000
+        post_ms = min(timeit.repeat(post_filter, number=1, repeat=repeat)) * 1000
+        overlap = len({j["jobId"] for j in pre_results} & {j["jobId"] for j in post_results})
+        print(f"  {label:26s} matching={pre_stats['filtered']:6d}  "
+              f"pre-filter {pre_ms:8.2f} ms ({pre_stats['denseScored']} scored)  "
+              f"post-filter {post_ms:8.2f} ms ({post_stats['denseScored']} scored)  "
+              f"results {len(pre_results)} vs {len(post_results)}, overlap {overlap}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--benchmark" in sys.argv:
+        _benchmark()
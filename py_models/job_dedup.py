@@ -0,0 +1,177 @@
+"""
+Job Deduplication
+
+Near-duplicate detection for job postings. The same job syndicated through
+several boards comes back from SerpAPI as several results, usually with the
+same title and company and a description that is truncated or wrapped in a
+board's boilerplate.
+
+Each posting gets a signature made of a header key (normalised title +
+company) and a 64-bit SimHash over its description shingles. Postings with
+the same header key whose SimHashes differ in at most HAMMING_THRESHOLD
+bits are treated as copies. Postings are bucketed by header key, so each
+one is only compared against the few postings sharing its title and
+company, and a batch is processed in linear time.
+
+Signatures persist in a SignatureIndex next to the job corpus, so copies
+seen by an earlier query map to the posting already stored.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from hybrid_retriever import TOKEN_PATTERN
+
+# Independent descriptions differ in ~32 of 64 bits; a copy truncated by
+# 15% with added board boilerplate usually stays within 16
+HAMMING_THRESHOLD = 16
+SHINGLE_SIZE = 2
+
+_BIT_SHIFTS = np.arange(64, dtype=np.uint64)
+
+
+def _feature_hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def simhash(weighted_features):
+    """64-bit SimHash of {feature: weight}."""
+    if not weighted_features:
+        return 0
+    hashes = np.fromiter((_feature_hash(f) for f in weighted_features), dtype=np.uint64,
+                         count=len(weighted_features))
+    weights = np.fromiter(weighted_features.values(), dtype=np.float64, count=len(weighted_features))
+    bits = ((hashes[:, None] >> _BIT_SHIFTS) & np.uint64(1)).astype(np.float64)
+    totals = weights @ (2 * bits - 1)
+    return int(sum(1 << int(i) for i in np.flatnonzero(totals > 0)))
+
+
+def job_signature(job):
+    """(header key, description SimHash) for a posting."""
+    header = " ".join(TOKEN_PATTERN.findall(
+        f"{job.get('title', '')} | {job.get('company', job.get('company_name', ''))}".lower()))
+    header_key = hashlib.sha1(header.encode("utf-8")).hexdigest()[:16]
+
+    features = {}
+    words = TOKEN_PATTERN.findall(job.get("description", "").lower())
+    for i in range(max(len(words) - SHINGLE_SIZE + 1, 0)):
+        shingle = " ".join(words[i:i + SHINGLE_SIZE])
+        features[shingle] = features.get(shingle, 0) + 1
+    return header_key, simhash(features)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class SignatureIndex:
+    """Persistent signature -> jobId map, bucketed by header key."""
+
+    def __init__(self, path):
+        self.path = path
+        self.buckets = {}
+        self.added = []
+        self._mtime = None
+        self.refresh()
+
+    def refresh(self):
+        """Reload the file if another process has saved since it was read."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            stored = {}
+        self._mtime = mtime
+        self.buckets = {key: [(int(fingerprint, 16), job_id_value) for fingerprint, job_id_value in entries]
+                        for key, entries in stored.items()}
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.buckets.values())
+
+    def find(self, signature):
+        """jobId of a stored near-duplicate, or None."""
+        header_key, fingerprint = signature
+        for candidate, job_id_value in self.buckets.get(header_key, ()):
+            if hamming(fingerprint, candidate) <= HAMMING_THRESHOLD:
+                return job_id_value
+        return None
+
+    def add(self, signature, job_id_value):
+        header_key, fingerprint = signature
+        entries = self.buckets.setdefault(header_key, [])
+        if all(candidate != fingerprint for candidate, _ in entries):
+            entries.append((fingerprint, job_id_value))
+            self.added.append((header_key, fingerprint, job_id_value))
+
+    def save(self):
+        """Merge new signatures into the file, which other processes may also write."""
+        if not self.added:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        stored = json.load(f)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    stored = {}
+                for header_key, fingerprint, job_id_value in self.added:
+                    entries = stored.setdefault(header_key, [])
+                    if all(int(existing, 16) != fingerprint for existing, _ in entries):
+                        entries.append([f"{fingerprint:016x}", job_id_value])
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(stored, f, separators=(",", ":"))
+                os.replace(tmp_path, self.path)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        self.added = []
+
+
+def dedupe_jobs(jobs, index, job_id_fn):
+    """
+    Drop near-duplicate postings from a batch.
+
+    Returns (unique_jobs, canonical_ids, stats). canonical_ids[i] is the
+    jobId under which unique_jobs[i] is (or will be) stored: the id of a
+    copy seen by an earlier query if there was one, else its own id.
+    """
+    unique_jobs = []
+    canonical_ids = []
+    batch_ids = set()
+    duplicates = 0
+    known = 0
+
+    index.refresh()
+    for job in jobs:
+        signature = job_signature(job)
+        match = index.find(signature)
+        if match is not None and match in batch_ids:
+            duplicates += 1
+            continue
+        if match is not None:
+            known += 1
+        canonical = match or job_id_fn(job)
+        index.add(signature, canonical)
+        batch_ids.add(canonical)
+        unique_jobs.append(job)
+        canonical_ids.append(canonical)
+
+    index.save()
+    return unique_jobs, canonical_ids, {
+        "fetched": len(jobs),
+        "duplicates": duplicates,
+        "seenBefore": known,
+        "indexSize": len(index)
+    }
@@ -0,0 +1,229 @@
+"""
+Job Facets
+
+Normalised facets for job postings (location, job type, posting age) and
+a FacetIndex of sorted row arrays per facet value, so filtered searches
+can intersect the matching rows before any vector is scored.
+
+Filters are a dict; values within a facet are OR-ed, facets are AND-ed:
+    {"location": ["Bengaluru", "Remote"], "jobType": "full-time", "postedWithin": "7d"}
+
+postedWithin takes an age bucket (24h, 3d, 7d, 30d) or a number of days.
+"""
+
+import re
+import time
+
+import numpy as np
+
+from hybrid_retriever import TOKEN_PATTERN
+
+AGE_BUCKETS = {"24h": 1, "3d": 3, "7d": 7, "30d": 30}
+
+JOB_TYPES = (
+    ("full", "full-time"),
+    ("part", "part-time"),
+    ("contract", "contract"),
+    ("intern", "internship"),
+    ("temp", "temporary"),
+    ("freelance", "contract"),
+)
+
+REMOTE_PATTERN = re.compile(r"\b(?:remote|anywhere|work from home|wfh)\b", re.IGNORECASE)
+AGE_PATTERN = re.compile(r"(\d+)\+?\s*(minute|min|hour|hr|day|week|month)s?", re.IGNORECASE)
+AGE_UNIT_DAYS = {"minute": 1 / 1440, "min": 1 / 1440, "hour": 1 / 24, "hr": 1 / 24,
+                 "day": 1, "week": 7, "month": 30}
+
+
+def _normalize(text):
+    return " ".join(TOKEN_PATTERN.findall(str(text).lower()))
+
+
+def location_facets(location):
+    """Facet values for a location: each comma-separated part, plus "remote"."""
+    values = {_normalize(part) for part in re.split(r"[,/]", location or "")}
+    values.discard("")
+    if REMOTE_PATTERN.search(location or ""):
+        values.add("remote")
+    return values
+
+
+def job_type_facet(job_type):
+    text = _normalize(job_type)
+    for marker, value in JOB_TYPES:
+        if marker in text:
+            return value
+    return text
+
+
+def posted_at(posted_time, now=None):
+    """Epoch seconds for a SerpAPI 'posted_at' string such as '3 days ago', or None."""
+    now = time.time() if now is None else now
+    text = (posted_time or "").lower()
+    if not text:
+        return None
+    if "just" in text or "today" in text:
+        return now
+    match = AGE_PATTERN.search(text)
+    if not match:
+        return None
+    return now - int(match.group(1)) * AGE_UNIT_DAYS[match.group(2)] * 86400
+
+
+def max_age_days(posted_within):
+    if posted_within in AGE_BUCKETS:
+        return AGE_BUCKETS[posted_within]
+    try:
+        days = float(posted_within)
+    except (TypeError, ValueError):
+        days = None
+    if days is None or not days > 0 or days == float("inf"):
+        raise ValueError(f"Invalid postedWithin {posted_within!r}: use one of "
+                         f"{', '.join(AGE_BUCKETS)} or a number of days")
+    return days
+
+
+def _stamp(job):
+    stamp = job.get("postedAt")
+    return -np.inf if stamp is None else stamp
+
+
+def _patch(postings, removals, additions):
+    """Rebuild only the row arrays of the facet values that lost or gained rows."""
+    for value in set(removals) | set(additions):
+        rows = postings.get(value, np.empty(0, dtype=np.int64))
+        if value in removals:
+            rows = np.setdiff1d(rows, removals[value], assume_unique=True)
+        if value in additions:
+            rows = np.union1d(rows, np.asarray(additions[value], dtype=np.int64))
+        if len(rows):
+            postings[value] = rows.astype(np.int64, copy=False)
+        else:
+            postings.pop(value, None)
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, (list, tuple, set)) else [value]
+
+
+class FacetIndex:
+    """Sorted row arrays per facet value, plus a posting-time order."""
+
+    def __init__(self):
+        self.locations = {}
+        self.job_types = {}
+        self.posted = []
+
+    @classmethod
+    def build(cls, jobs):
+        index = cls()
+        for row, job in enumerate(jobs):
+            index.add(row, job)
+        return index.finalize()
+
+    def add(self, row, job):
+        # Rows are added in increasing order, so every list stays sorted
+        for value in location_facets(job.get("location", "")):
+            self.locations.setdefault(value, []).append(row)
+        job_type = job_type_facet(job.get("jobType", ""))
+        if job_type:
+            self.job_types.setdefault(job_type, []).append(row)
+        self.posted.append(_stamp(job))
+
+    def finalize(self):
+        self.locations = {value: np.asarray(rows, dtype=np.int64) for value, rows in self.locations.items()}
+        self.job_types = {value: np.asarray(rows, dtype=np.int64) for value, rows in self.job_types.items()}
+        posted = np.asarray(self.posted, dtype=np.float64)
+        self.posted_order = np.argsort(posted, kind="stable")
+        self.posted_sorted = posted[self.posted_order]
+        self.posted = None
+        return self
+
+    def update(self, changes):
+        """
+        Apply changed postings, [(row, previous job or None, job)], to a
+        finalized index. Only the row arrays of facet values those postings
+        had or now have are rebuilt, and their posting times are spliced
+        into the sorted order, so nothing is re-parsed for the other rows.
+        """
+        if not changes:
+            return self
+        for facets, values_of in ((self.locations, lambda job: location_facets(job.get("location", ""))),
+                                  (self.job_types, lambda job: {job_type_facet(job.get("jobType", ""))} - {""})):
+            removals, additions = {}, {}
+            for row, previous, job in changes:
+                for value in values_of(previous) if previous is not None else ():
+                    removals.setdefault(value, []).append(row)
+                for value in values_of(job):
+                    additions.setdefault(value, []).append(row)
+            _patch(facets, removals, additions)
+
+        order, stamps = self.posted_order, self.posted_sorted
+        replaced = [row for row, previous, _ in changes if previous is not None]
+        if replaced:
+            keep = ~np.isin(order, replaced)
+            order, stamps = order[keep], stamps[keep]
+        rows = np.array([row for row, _, _ in changes], dtype=np.int64)
+        new_stamps = np.array([_stamp(job) for _, _, job in changes], dtype=np.float64)
+        by_stamp = np.argsort(new_stamps, kind="stable")
+        positions = np.searchsorted(stamps, new_stamps[by_stamp], side="right")
+        self.posted_order = np.insert(order, positions, rows[by_stamp])
+        self.posted_sorted = np.insert(stamps, positions, new_stamps[by_stamp])
+        return self
+
+    def _union(self, postings, values):
+        arrays = [postings.get(value) for value in values]
+        arrays = [array for array in arrays if array is not None]
+        if not arrays:
+            return np.empty(0, dtype=np.int64)
+        return arrays[0] if len(arrays) == 1 else np.unique(np.concatenate(arrays))
+
+    def _union_of_all(self, postings, value_sets):
+        """Rows having every value of at least one of the sets."""
+        arrays = []
+        for values in value_sets:
+            rows = None
+            for value in values:
+                posting = postings.get(value, np.empty(0, dtype=np.int64))
+                rows = posting if rows is None else np.intersect1d(rows, posting, assume_unique=True)
+            arrays.append(rows)
+        return arrays[0] if len(arrays) == 1 else np.unique(np.concatenate(arrays))
+
+    def rows(self, filters, now=None):
+        """
+        Sorted array of rows matching every filter, or None when no filter
+        is set (all rows match).
+        """
+        filters = filters or {}
+        selections = []
+
+        # A location filter matches the way postings are indexed: every
+        # comma-separated part of the value ("New York, NY") must match
+        locations = [location_facets(str(value)) for value in _as_list(filters.get("location"))]
+        locations = [parts for parts in locations if parts]
+        if locations:
+            selections.append(self._union_of_all(self.locations, locations))
+
+        job_types = [job_type_facet(value) for value in _as_list(filters.get("jobType"))]
+        if job_types:
+            selections.append(self._union(self.job_types, job_types))
+
+        if filters.get("postedWithin") is not None:
+            now = time.time() if now is None else now
+            cutoff = now - max_age_days(filters["postedWithin"]) * 86400
+            start = np.searchsorted(self.posted_sorted, cutoff, side="left")
+            selections.append(np.sort(self.posted_order[start:]))
+
+        if not selections:
+            return None
+        # Intersect smallest first so each step works on the fewest rows
+        selections.sort(key=len)
+        rows = selections[0]
+        for selection in selections[1:]:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, selection, assume_unique=True)
+        return rows
+
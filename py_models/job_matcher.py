@@ -1,12 +1,10 @@
-import pdfplumber
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import util
+from model_bundle import load_model
+from pdf_extract import iter_page_text
 
 def extract_resume_text(file_path):
-    text = ""
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text()
-    return text
+    # Pages are extracted in parallel; pages without a text layer come back as ""
+    return "".join(iter_page_text(file_path))
 
 from serpapi import GoogleSearch
 
@@ -26,7 +24,7 @@ for job in job_listings:
     job_text = job['title'] + ' ' + job['description']
 resume_text = extract_resume_text("Naman Shah resume.pdf")
 
-model = SentenceTransformer('all-MiniLM-L6-v2')
+model = load_model()
 resume_embedding = model.encode(resume_text, convert_to_tensor=True)
 job_embedding = model.encode(job_text, convert_to_tensor=True)
 similarity = util.pytorch_cos_sim(resume_embedding, job_embedding)
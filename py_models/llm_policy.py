@@ -0,0 +1,237 @@
+"""
+LLM Call Policy
+
+Hedged and tiered LLM calls. A call starts on the primary model; if it has
+not answered after the hedge delay (a percentile of recent primary
+latencies), a second identical request is sent and whichever answers first
+wins. The other request is cancelled, which closes its connection.
+
+When the request deadline is too close for the primary model's typical
+latency, the call (or the hedge) goes to the smaller fallback model
+instead. Every call records which tier served it and how long it took.
+
+Configuration (environment):
+    LLM_HEDGE               enable hedged requests (default 1)
+    LLM_HEDGE_PERCENTILE    latency percentile used as hedge delay (default 95)
+    LLM_HEDGE_DELAY_SECONDS hedge delay until enough latencies are seen (default 6)
+    LLM_PRIMARY_SECONDS     assumed primary latency until enough are seen (default 5)
+    LLM_FALLBACK_MODEL      smaller model for tight deadlines (default llama3-8b-8192)
+
+Attempts run on one event loop thread per process, so the async client's
+connection pool is reused across calls. Latency history is also kept per
+process: the percentile delay adapts in worker mode, while one-shot
+processes use the defaults.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from deadline import DeadlineExceeded, current_deadline, LLM_MIN_SECONDS
+
+logger = logging.getLogger("llm_policy")
+
+FALLBACK_MODEL = os.environ.get("LLM_FALLBACK_MODEL", "llama3-8b-8192")
+MIN_SAMPLES = 20
+
+
+def _env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class LatencyTracker:
+    """Sliding window of call latencies per model (cancelled calls count with their elapsed time)."""
+
+    def __init__(self, window=200):
+        self.window = window
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def add(self, model, seconds):
+        with self.lock:
+            self.samples.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, model, percentile, default):
+        with self.lock:
+            samples = sorted(self.samples.get(model, ()))
+        if len(samples) < MIN_SAMPLES:
+            return default
+        index = min(len(samples) - 1, int(round(percentile / 100 * (len(samples) - 1))))
+        return samples[index]
+
+
+latencies = LatencyTracker()
+
+# Per-tier counters for the life of the process
+_tier_counts = {}
+_tier_lock = threading.Lock()
+
+# Calls made during the current request (see call_log)
+_call_log = contextvars.ContextVar("llm_call_log", default=None)
+
+
+@contextmanager
+def call_log():
+    """Collect the record of every LLM call made inside the block."""
+    calls = []
+    token = _call_log.set(calls)
+    try:
+        yield calls
+    finally:
+        _call_log.reset(token)
+
+
+def tier_stats():
+    with _tier_lock:
+        return dict(_tier_counts)
+
+
+def _record(record):
+    with _tier_lock:
+        _tier_counts[record["tier"]] = _tier_counts.get(record["tier"], 0) + 1
+    calls = _call_log.get()
+    if calls is not None:
+        calls.append(record)
+    logger.info(f"LLM call served by {record['tier']} ({record['model']}) in {record['latencyMs']}ms"
+                f"{' after hedging' if record['hedged'] else ''}")
+
+
+_loop = None
+_loop_pid = None
+_loop_lock = threading.Lock()
+
+
+def _event_loop():
+    """Background event loop for this process, started on first use (and again after fork)."""
+    global _loop, _loop_pid
+    with _loop_lock:
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            threading.Thread(target=_loop.run_forever, name="llm-policy-loop", daemon=True).start()
+        return _loop
+
+
+def retryable(error):
+    """
+    Whether a failed attempt is worth sending again: timeouts, connection
+    errors, 429 and 5xx responses. Other HTTP errors (bad request, auth)
+    would fail the same way.
+    """
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    # SDK errors without a response, e.g. APITimeoutError / APIConnectionError
+    name = type(error).__name__
+    return "Timeout" in name or "Connection" in name
+
+
+def _choose_model(deadline, primary, fallback, expected):
+    """Primary model if the remaining budget covers its typical latency."""
+    if fallback and fallback != primary and deadline.remaining() < expected:
+        return fallback
+    return primary
+
+
+async def _hedged(attempt, deadline, primary, fallback, hedge, hedge_delay, expected):
+    started = time.time()
+    tasks = {}
+
+    def launch(label, model):
+        deadline.check("LLM completion", needed=LLM_MIN_SECONDS)
+        attempt_started = time.time()
+        task = asyncio.ensure_future(attempt(model, max(0.001, min(60, deadline.remaining()))))
+        tasks[task] = (label, model, attempt_started)
+
+    first_model = _choose_model(deadline, primary, fallback, expected)
+    launch("primary" if first_model == primary else "fallback", first_model)
+    hedged = False
+    slow = False
+    errors = []
+
+    try:
+        while tasks:
+            timeout = None if hedged or not hedge else max(0.0, started + hedge_delay - time.time())
+            done, _ = await asyncio.wait(list(tasks), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                # Primary is slow: send the hedge, on the fallback tier if
+                # the deadline no longer covers another primary call
+                hedged = slow = True
+                model = _choose_model(deadline, primary, fallback, expected)
+                try:
+                    launch("hedge" if model == primary else "fallback", model)
+                except DeadlineExceeded:
+                    pass
+                continue
+
+            for task in done:
+                label, model, attempt_started = tasks.pop(task)
+                if task.exception() is None:
+                    latencies.add(model, time.time() - attempt_started)
+                    return task.result(), {
+                        "tier": label,
+                        "model": model,
+                        "latencyMs": round((time.time() - started) * 1000),
+                        "hedged": hedged,
+                        # Time spent waiting on the slow primary before hedging
+                        "hedgeDelayMs": round(hedge_delay * 1000) if slow else None
+                    }
+                errors.append(task.exception())
+
+            # A failed first attempt is retried once through the hedge slot,
+            # unless the failure would only repeat (bad request, auth). With
+            # no budget left for the retry the upstream error is raised.
+            if not tasks and not hedged and hedge and retryable(errors[-1]):
+                hedged = True
+                model = _choose_model(deadline, primary, fallback, expected)
+                try:
+                    launch("hedge" if model == primary else "fallback", model)
+                except DeadlineExceeded:
+                    pass
+    finally:
+        # Cancel the losing request so its connection is closed. Its elapsed
+        # time is still a sample: a lower bound, but leaving it out would
+        # keep only the fast calls and pull the hedge delay down
+        for task, (label, model, attempt_started) in tasks.items():
+            task.cancel()
+            latencies.add(model, time.time() - attempt_started)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    raise errors[-1]
+
+
+def call_with_policy(attempt, primary, fallback=FALLBACK_MODEL, hedge=None, details=None):
+    """
+    Run attempt(model, timeout) under the hedging/tiering policy and return
+    its result. attempt is an async function performing one LLM request;
+    details (e.g. prompt token counts) are added to the call record.
+    """
+    if hedge is None:
+        hedge = os.environ.get("LLM_HEDGE", "1").lower() not in ("0", "false", "no")
+    expected = latencies.percentile(primary, 50, _env_float("LLM_PRIMARY_SECONDS", 5))
+    hedge_delay = latencies.percentile(primary, _env_float("LLM_HEDGE_PERCENTILE", 95),
+                                       _env_float("LLM_HEDGE_DELAY_SECONDS", 6))
+
+    # The loop thread doesn't see this request's context, so the deadline is passed in
+    future = asyncio.run_coroutine_threadsafe(
+        _hedged(attempt, current_deadline(), primary, fallback, hedge, hedge_delay, expected),
+        _event_loop()
+    )
+    result, record = future.result()
+    record.update(details or {})
+    _record(record)
+    return result
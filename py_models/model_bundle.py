@@ -0,0 +1,130 @@
+"""
+Model Bundle
+
+Self-contained local copy of the embedding model and the single
+process-wide handle to it.
+
+    python model_bundle.py bundle [--model all-MiniLM-L6-v2] [--output DIR]
+    python model_bundle.py info
+
+`bundle` downloads the model once and writes safetensors weights, the
+tokenizer and the configs to MODEL_BUNDLE_DIR (default
+py_models/models/<model name>), plus a bundle.json manifest with file
+hashes. Ship that directory with the deployment and no node needs the
+Hugging Face hub at runtime.
+
+load_model() returns the shared SentenceTransformer. It loads from the
+bundle when one exists (safetensors weights are memory-mapped, and hub
+lookups are switched off), otherwise it falls back to the hub cache. The
+model is loaded once per process; forked workers share it copy-on-write.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger("model_bundle")
+
+MODEL_NAME = os.environ.get("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+BUNDLE_DIR = os.environ.get("MODEL_BUNDLE_DIR", str(Path(__file__).resolve().parent / "models" / MODEL_NAME))
+MANIFEST_FILE = "bundle.json"
+
+_model = None
+_info = {}
+_lock = threading.Lock()
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def bundle(model_name=MODEL_NAME, output_dir=BUNDLE_DIR):
+    """Write a self-contained copy of a model to output_dir and return its manifest."""
+    import sentence_transformers
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name, device="cpu")
+    os.makedirs(output_dir, exist_ok=True)
+    model.save(output_dir, safe_serialization=True)
+
+    root = Path(output_dir)
+    files = {str(path.relative_to(root)): {"bytes": path.stat().st_size, "sha256": _sha256(path)}
+             for path in sorted(root.rglob("*")) if path.is_file() and path.name != MANIFEST_FILE}
+    if not any(name.endswith(".safetensors") for name in files):
+        raise RuntimeError(f"No safetensors weights were written to {output_dir}")
+
+    manifest = {
+        "model": model_name,
+        "dimension": model.get_sentence_embedding_dimension(),
+        "sentenceTransformers": sentence_transformers.__version__,
+        "createdAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "files": files
+    }
+    with open(root / MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def has_bundle(bundle_dir=None):
+    return os.path.exists(os.path.join(bundle_dir or BUNDLE_DIR, MANIFEST_FILE))
+
+
+def load_model():
+    """The process-wide embedding model, loaded on first use."""
+    global _model
+    if _model is not None:
+        return _model
+    with _lock:
+        if _model is None:
+            start = time.perf_counter()
+            if has_bundle():
+                # Everything is local: don't let transformers or the hub client reach the network
+                os.environ.setdefault("HF_HUB_OFFLINE", "1")
+                os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(BUNDLE_DIR, device="cpu")
+                source, location = "bundle", BUNDLE_DIR
+            else:
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(MODEL_NAME, device="cpu")
+                source, location = "hub", MODEL_NAME
+                logger.warning(f"No model bundle at {BUNDLE_DIR}; loaded {MODEL_NAME} through the hub cache. "
+                               f"Run `python model_bundle.py bundle` to create one.")
+            _info.update({"model": MODEL_NAME, "source": source, "path": location,
+                          "dimension": model.get_sentence_embedding_dimension(),
+                          "loadMs": round((time.perf_counter() - start) * 1000, 1)})
+            logger.info(f"Embedding model loaded from {source} ({location}) in {_info['loadMs']} ms")
+            _model = model
+    return _model
+
+
+def model_info():
+    """How the shared model was loaded: source, path, dimension and loadMs (empty until loaded)."""
+    return dict(_info)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Bundle or inspect the local embedding model")
+    parser.add_argument("command", choices=["bundle", "info"])
+    parser.add_argument("--model", default=MODEL_NAME, help="Model to bundle")
+    parser.add_argument("--output", default=BUNDLE_DIR, help="Bundle directory")
+    args = parser.parse_args()
+
+    if args.command == "bundle":
+        manifest = bundle(args.model, args.output)
+        total_mb = sum(entry["bytes"] for entry in manifest["files"].values()) / (1024 * 1024)
+        print(f"Bundled {args.model} to {args.output}: {len(manifest['files'])} files, {total_mb:.1f} MB")
+    else:
+        load_model()
+        print(json.dumps(model_info(), indent=2))
@@ -0,0 +1,81 @@
+"""
+Payloads
+
+Compact encoding and field projection for job results sent back to Node.js.
+
+Callers choose what each job carries with a projection:
+    {"fields": ["title", "company", "applicationLink"], "snippetLength": 200, "references": true}
+
+- fields keeps only the listed keys (jobId is always kept when present)
+- snippetLength cuts the description to about that many characters
+- references drops the description of jobs already stored in the job
+  corpus; the caller fetches it by jobId only when it needs it
+"""
+
+import json
+
+COMPACT_SEPARATORS = (",", ":")
+
+
+def dumps(payload):
+    """JSON without the whitespace json.dumps adds by default."""
+    return json.dumps(payload, separators=COMPACT_SEPARATORS, ensure_ascii=False)
+
+
+def snippet(text, length):
+    """text cut at a word boundary to at most length characters, with "..." when cut."""
+    if not text or len(text) <= length:
+        return text
+    cut = text[:length]
+    # Drop the last word only when the cut lands inside it
+    if not text[length].isspace() and not cut[-1].isspace() and " " in cut:
+        cut = cut.rsplit(None, 1)[0]
+    return cut.rstrip(" ,.;:") + "..."
+
+
+def projection_from(options):
+    """
+    The projection settings in a request's params/options, or None if there
+    are none. Raises ValueError for a fields value that is not a non-empty
+    list of strings or a snippetLength that is not a positive integer.
+    """
+    options = options or {}
+    projection = {key: options[key] for key in ("fields", "snippetLength", "references")
+                  if options.get(key) is not None}
+
+    fields = projection.get("fields")
+    if fields is not None and (not isinstance(fields, list) or not fields
+                               or not all(isinstance(field, str) for field in fields)):
+        raise ValueError("Invalid fields: expected a non-empty list of field names")
+    if "snippetLength" in projection:
+        try:
+            projection["snippetLength"] = int(projection["snippetLength"])
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid snippetLength {projection['snippetLength']!r}: expected a number of characters")
+        if projection["snippetLength"] <= 0:
+            raise ValueError(f"Invalid snippetLength {projection['snippetLength']!r}: expected a number of characters")
+    return projection or None
+
+
+def project_job(job, projection=None, stored=None):
+    """
+    Apply a projection to one job. stored(job_id) says whether the job
+    corpus holds the posting (only needed for references).
+    """
+    if not projection:
+        return job
+    fields = projection.get("fields")
+    projected = {key: value for key, value in job.items() if not fields or key in fields or key == "jobId"}
+
+    if "description" in projected:
+        if projection.get("references") and stored and job.get("jobId") and stored(job["jobId"]):
+            del projected["description"]
+        elif projection.get("snippetLength"):
+            projected["description"] = snippet(projected["description"], projection["snippetLength"])
+    return projected
+
+
+def project_jobs(jobs, projection=None, stored=None):
+    if not projection:
+        return jobs
+    return [project_job(job, projection, stored) for job in jobs]
@@ -0,0 +1,245 @@
+"""
+PDF Extract
+
+Page-parallel text extraction for uploaded resume PDFs.
+
+iter_page_text(path) yields each page's text in page order. Pages are
+extracted in ranges of PAGES_PER_CHUNK by a process pool, so a long upload
+is spread across cores and the first pages can be used before the last
+ones are done. Pages without a text layer (scanned images: no fonts in the
+page resources) are skipped without running layout analysis and yield "".
+
+Results are cached in PDF_CACHE_DIR by a hash of the file contents, so a
+re-uploaded resume is not parsed again.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pdfplumber
+from pdfminer.pdftypes import resolve1
+
+CACHE_DIR = os.environ.get("PDF_CACHE_DIR", "pdf_cache")
+PAGES_PER_CHUNK = int(os.environ.get("PDF_PAGES_PER_CHUNK", 8))
+MAX_WORKERS = int(os.environ.get("PDF_EXTRACT_WORKERS", 0)) or os.cpu_count() or 1
+# Bump when extraction output changes so old cache entries are ignored
+EXTRACT_VERSION = 1
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _has_fonts(resources, depth=0):
+    resources = resolve1(resources) or {}
+    if resolve1(resources.get("Font")):
+        return True
+    # Text can also sit inside form XObjects drawn by the page
+    if depth < 2:
+        for xobject in (resolve1(resources.get("XObject")) or {}).values():
+            stream = resolve1(xobject)
+            attrs = getattr(stream, "attrs", {})
+            if getattr(resolve1(attrs.get("Subtype")), "name", None) == "Form" and \
+                    _has_fonts(attrs.get("Resources"), depth + 1):
+                return True
+    return False
+
+
+def has_text_layer(page):
+    """Cheap probe: a page that references no fonts has no text to extract."""
+    return _has_fonts(page.page_obj.resources)
+
+
+def _extract_range(path, start, stop):
+    """Text of pages [start, stop) of a PDF."""
+    texts = []
+    with pdfplumber.open(path, pages=list(range(start + 1, stop + 1))) as pdf:
+        for page in pdf.pages:
+            texts.append((page.extract_text() or "") if has_text_layer(page) else "")
+            # Drop the page's parsed layout before moving on
+            page.close()
+    return texts
+
+
+def page_count(path):
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+class PageCache:
+    """Extracted page texts on disk, one JSON file per PDF content hash."""
+
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+
+    def _path(self, digest):
+        return os.path.join(self.root, f"{digest}-v{EXTRACT_VERSION}.json")
+
+    def get(self, digest):
+        try:
+            with open(self._path(digest), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, digest, pages):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(digest)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(pages, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+def _can_fork_workers():
+    # Workers of the enhancer's pool are daemonic and may not have children
+    return not multiprocessing.current_process().daemon
+
+
+def iter_page_text(path, workers=None, cache=None):
+    """
+    Yield the text of each page of a PDF, in order. workers=1 extracts in
+    this process; cache=False disables the page cache.
+    """
+    cache = PageCache() if cache is None else cache
+    digest = file_hash(path) if cache else None
+    if cache:
+        cached = cache.get(digest)
+        if cached is not None:
+            yield from cached
+            return
+
+    count = page_count(path)
+    ranges = [(start, min(start + PAGES_PER_CHUNK, count)) for start in range(0, count, PAGES_PER_CHUNK)]
+    workers = min(workers or MAX_WORKERS, len(ranges))
+    pages = []
+
+    if workers <= 1 or not _can_fork_workers():
+        for start, stop in ranges:
+            texts = _extract_range(path, start, stop)
+            pages.extend(texts)
+            yield from texts
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+        try:
+            futures = [executor.submit(_extract_range, path, start, stop) for start, stop in ranges]
+            # Ranges are handed out in order, so waiting on them in order
+            # yields each page as soon as everything before it is done
+            for future in futures:
+                texts = future.result()
+                pages.extend(texts)
+                yield from texts
+        finally:
+            # Also reached when the caller stops iterating early
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    if cache:
+        cache.put(digest, pages)
+
+
+def extract_text(path, separator="\n", **kwargs):
+    """Whole-document text, pages joined with separator."""
+    return separator.join(iter_page_text(path, **kwargs))
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+def _pdf_string(text):
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def write_synthetic_pdf(path, pages=50, lines_per_page=55, image_every=10):
+    """
+    Write a resume-like PDF by hand: text pages using Helvetica, and every
+    image_every-th page a "scanned" page with no fonts (drawn shapes only).
+    """
+    words = ("python developer experience machine learning pipelines data engineering kubernetes "
+             "aws cloud react typescript led team delivered reduced latency percent users").split()
+    objects = {1: "<< /Type /Catalog /Pages 2 0 R >>",
+               3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids = []
+    next_id = 4
+    for number in range(pages):
+        page_id, content_id = next_id, next_id + 1
+        next_id += 2
+        if image_every and number % image_every == image_every - 1:
+            content = "".join(f"0.{i % 9} g {40 + i * 3} {60 + i * 5} 200 3 re f\n" for i in range(120))
+            resources = "<< >>"
+        else:
+            lines = []
+            for line in range(lines_per_page):
+                text = " ".join(words[(number + line + k) % len(words)] for k in range(12))
+                lines.append(f"BT /F1 10 Tf 50 {770 - line * 13} Td {_pdf_string(text)} Tj ET")
+            content = "\n".join(lines)
+            resources = "<< /Font << /F1 3 0 R >> >>"
+        objects[page_id] = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                            f"/Resources {resources} /Contents {content_id} 0 R >>")
+        objects[content_id] = f"<< /Length {len(content.encode('latin-1'))} >>\nstream\n{content}\nendstream"
+        kids.append(f"{page_id} 0 R")
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(out)
+        out += f"{object_id} 0 obj\n{objects[object_id]}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    size = max(objects) + 1
+    out += f"xref\n0 {size}\n0000000000 65535 f \n".encode("latin-1")
+    for object_id in range(1, size):
+        out += f"{offsets[object_id]:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def _benchmark(pages=50):
+    import tempfile
+    import time
+
+    directory = tempfile.mkdtemp(prefix="pdf_extract_bench_")
+    path = os.path.join(directory, "resume.pdf")
+    write_synthetic_pdf(path, pages=pages)
+
+    def serial():
+        # The previous approach: every page through layout analysis, in one process
+        text = ""
+        with pdfplumber.open(path) as pdf:
+            for page in pdf.pages:
+                text += page.extract_text() or ""
+        return text
+
+    def timed(label, run):
+        start = time.perf_counter()
+        first = None
+        chars = 0
+        for text in run():
+            if first is None:
+                first = time.perf_counter() - start
+            chars += len(text)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:32s} {elapsed * 1000:8.1f} ms  {pages / elapsed:8.1f} pages/s  "
+              f"first page {first * 1000:7.1f} ms  {chars} chars")
+
+    print(f"{pages}-page synthetic PDF ({os.path.getsize(path) // 1024} KB), {MAX_WORKERS} CPUs")
+    timed("serial pdfplumber", lambda: [serial()])
+    timed("iter_page_text, 1 process", lambda: iter_page_text(path, workers=1, cache=False))
+    timed(f"iter_page_text, {MAX_WORKERS} processes", lambda: iter_page_text(path, cache=False))
+    cache = PageCache(os.path.join(directory, "cache"))
+    timed("iter_page_text, cold cache", lambda: iter_page_text(path, cache=cache))
+    timed("iter_page_text, warm cache", lambda: iter_page_text(path, cache=cache))
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--benchmark" in sys.argv:
+        _benchmark()
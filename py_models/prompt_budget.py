@@ -0,0 +1,363 @@
+"""
+Prompt Budget
+
+Assembles LLM prompts under a token budget. Prompts are built from named
+sections; required sections are always kept, and optional ones are
+truncated (lowest priority first) until the prompt fits.
+
+Token counts use tiktoken's cl100k_base encoding when it is installed and
+fall back to a ~4 characters per token estimate otherwise. Neither matches
+the Llama tokenizer exactly, so budgets carry some headroom.
+
+Helpers render prompt inputs compactly: job descriptions are reduced to
+their requirement sentences and de-duplicated across postings, empty
+contact fields are dropped, and lists are written as bullets instead of
+Python reprs.
+
+resume_prompt and learning_path_prompt assemble the prompts enhancer.py
+sends. Run `python prompt_budget.py --benchmark` to compare their sizes
+with the prompts sent before, on a fixture resume and job set.
+"""
+
+import logging
+import math
+import os
+import re
+
+logger = logging.getLogger("prompt_budget")
+
+DEFAULT_BUDGET = int(os.environ.get("PROMPT_TOKEN_BUDGET", 3000))
+CHARS_PER_TOKEN = 4
+
+SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9•\-*])|\s*[\n\r]+\s*|\s*[•▪●]\s*")
+REQUIREMENT_PATTERN = re.compile(
+    r"\b(?:requir\w*|must|should|need\w*|experience (?:with|in)|\d+\+? years?|proficien\w*|"
+    r"familiar\w*|knowledge of|understanding of|skills?|degree|bachelor\w*|master\w*|"
+    r"qualifications?|expertise|hands-on|strong|ability to|you (?:have|bring|will)|"
+    r"nice to have|preferred|plus)\b",
+    re.IGNORECASE
+)
+NORMALIZE_PATTERN = re.compile(r"[^a-z0-9]+")
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    # tiktoken is optional (and its encoding download may be unavailable)
+    _encoding = None
+
+
+def count_tokens(text):
+    """Number of tokens in text (estimated when tiktoken isn't available)."""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text to at most max_tokens, preferring whole lines."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    kept = []
+    used = 0
+    for line in text.splitlines():
+        cost = count_tokens(line) + 1
+        if used + cost > max_tokens:
+            remaining = max_tokens - used
+            if not kept and remaining > 0:
+                # A single over-long line: cut it by characters, then trim
+                # until the cut plus its " ..." suffix fits (text can run
+                # denser than CHARS_PER_TOKEN)
+                cut = line[:remaining * CHARS_PER_TOKEN]
+                while cut and count_tokens(cut.rstrip() + " ...") > remaining:
+                    cut = cut[:len(cut) * 9 // 10]
+                if cut.strip():
+                    kept.append(cut.rstrip() + " ...")
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept)
+
+
+def bullets(items):
+    """Render a list as '- item' lines, skipping empty items."""
+    return "\n".join(f"- {str(item).strip()}" for item in items if item and str(item).strip())
+
+
+def contact_lines(contact):
+    """'Label: value' lines for the contact fields that are filled in."""
+    labels = (("name", "Name"), ("email", "Email"), ("phone", "Phone"),
+              ("address", "Address"), ("linkedin", "LinkedIn"))
+    return [f"{label}: {contact[key]}" for key, label in labels
+            if isinstance(contact.get(key), str) and contact[key].strip()]
+
+
+def requirement_sentences(description, seen=None, max_sentences=8):
+    """
+    Reduce a job description to its requirement sentences. Sentences
+    already in `seen` (normalised) are skipped, so boilerplate shared by
+    several postings is only sent once. Falls back to the opening
+    sentences when nothing looks like a requirement.
+    """
+    seen = set() if seen is None else seen
+    sentences = [s.strip(" -*\t") for s in SENTENCE_SPLIT_PATTERN.split(description or "")]
+    sentences = [s for s in sentences if len(s) > 3]
+
+    selected = [s for s in sentences if REQUIREMENT_PATTERN.search(s)] or sentences[:3]
+    kept = []
+    for sentence in selected:
+        key = NORMALIZE_PATTERN.sub(" ", sentence.lower()).strip()
+        if key in seen:
+            continue
+        seen.add(key)
+        kept.append(sentence)
+        if len(kept) >= max_sentences:
+            break
+    return kept
+
+
+def compact_resume(resume, keys=("about", "skills", "experience", "projects", "education",
+                                 "certifications", "achievements")):
+    """Render an enhanced resume dict as labelled sections, skipping empty ones."""
+    parts = []
+    for key in keys:
+        value = resume.get(key)
+        if not value:
+            continue
+        if key == "skills" and isinstance(value, list):
+            parts.append(f"Skills: {', '.join(str(item) for item in value)}")
+        elif isinstance(value, list):
+            parts.append(f"{key.title()}:\n{bullets(value)}")
+        else:
+            parts.append(f"{key.title()}: {value}")
+    return "\n".join(parts)
+
+
+class PromptAssembler:
+    """
+    Build a prompt from named sections within a token budget.
+
+        assembler = PromptAssembler(budget=3000)
+        assembler.add("instructions", text, required=True)
+        assembler.add("guidelines", text, priority=1)
+        prompt = assembler.build()
+        assembler.stats   # {"sections": {...}, "totalTokens": ..., ...}
+
+    Optional sections with the lowest priority are truncated first.
+    """
+
+    def __init__(self, budget=None, name="prompt"):
+        self.budget = DEFAULT_BUDGET if budget is None else budget
+        self.name = name
+        self.sections = []
+        self.stats = {}
+
+    def add(self, name, text, required=False, priority=0, heading=None):
+        text = (text or "").strip()
+        if text:
+            self.sections.append({"name": name, "text": text, "required": required,
+                                  "priority": priority, "heading": heading})
+        return self
+
+    def _render(self, sections):
+        parts = []
+        for section in sections:
+            if not section["text"]:
+                continue
+            parts.append(f"=== {section['heading']} ===\n{section['text']}" if section["heading"] else section["text"])
+        return "\n\n".join(parts)
+
+    def build(self):
+        sections = [dict(section) for section in self.sections]
+        original = {s["name"]: count_tokens(s["text"]) for s in sections}
+        truncated = []
+
+        overflow = count_tokens(self._render(sections)) - self.budget
+        for section in sorted((s for s in sections if not s["required"]), key=lambda s: s["priority"]):
+            if overflow <= 0:
+                break
+            size = original[section["name"]]
+            section["text"] = truncate_to_tokens(section["text"], size - overflow)
+            truncated.append(section["name"])
+            overflow = count_tokens(self._render(sections)) - self.budget
+
+        prompt = self._render(sections)
+        self.stats = {
+            "prompt": self.name,
+            "sections": {s["name"]: count_tokens(s["text"]) for s in sections},
+            "totalTokens": count_tokens(prompt),
+            "budget": self.budget,
+            "truncated": truncated,
+            "tokenizer": "cl100k_base" if _encoding is not None else "chars/4"
+        }
+        if overflow > 0:
+            logger.warning(f"{self.name}: required sections exceed the {self.budget} token budget "
+                           f"({self.stats['totalTokens']} tokens)")
+        logger.info(f"{self.name}: {self.stats['totalTokens']} prompt tokens {self.stats['sections']}"
+                    f"{' (truncated ' + ', '.join(truncated) + ')' if truncated else ''}")
+        return prompt
+
+
+def resume_prompt(resume_text, guidelines, schema=None):
+    """
+    The resume enhancement prompt (enhancer.build_prompt). schema is the
+    JSON-mode output instructions, if any. Guidelines are trimmed first,
+    then the resume, if the prompt runs over budget.
+    """
+    assembler = PromptAssembler(name="build_prompt")
+    assembler.add("instructions", (
+        "You are a resume enhancement AI.\n\n"
+        "From the following raw resume data and resume writing guidelines, extract and rewrite content into "
+        "structured professional resume sections: About, Skills, Experience, Education, Projects, "
+        "Certifications, and Achievements.\n\n"
+        "Only return the enhanced resume content. Content should fit into a single page. "
+        "Do NOT include any explanations, notes, or repeat the prompt."
+    ), required=True)
+    if schema:
+        assembler.add("schema", schema, required=True)
+    assembler.add("guidelines", bullets(guidelines), priority=0, heading="Resume Guidelines")
+    assembler.add("resume", resume_text, priority=1, heading="Resume Input")
+    assembler.add("output", "=== Enhanced Resume ===", required=True)
+    return assembler.build()
+
+
+def learning_path_prompt(roles, skills, gap_text):
+    """
+    The learning path prompt (enhancer.generate_learning_path): the target
+    roles, the candidate's skills and the skill gap worked out locally
+    (skill_gap.format_gap), instead of the resume and job descriptions.
+    """
+    assembler = PromptAssembler(name="generate_learning_path")
+    assembler.add("instructions", "You are a career advisor AI. A candidate's skills were compared with their "
+                                  "top matching jobs; below are the skills those jobs ask for that the "
+                                  "candidate is missing.", required=True)
+    assembler.add("roles", bullets(roles), priority=1, heading="Target Roles")
+    assembler.add("skills", ", ".join(dict.fromkeys(skills)), priority=0, heading="Current Skills")
+    assembler.add("gap", gap_text, required=True, heading="Skill Gaps")
+    assembler.add("task", (
+        "1. Recommend a step-by-step learning path (with topics/tools/technologies) for the missing skills, "
+        "most requested first.\n"
+        "2. Suggest resources (platforms or certifications) for each skill if possible.\n"
+        "3. Briefly note which of the candidate's current skills make each step easier."
+    ), required=True)
+    return assembler.build()
+
+
+def _benchmark():
+    """Token counts of the prompts build_prompt and generate_learning_path send, before and after."""
+    from skill_gap import format_gap
+
+    contact = {"name": "Jane Doe", "email": "jane@example.com", "phone": "", "address": "", "linkedin": ""}
+    labels = (("name", "Name"), ("email", "Email"), ("phone", "Phone"), ("address", "Address"),
+              ("linkedin", "LinkedIn"))
+    # flatten_resume_json's output after the contact lines
+    resume_body = (
+        "\nEducation:\n- B.Tech Computer Science, University of Technology (2012-2016)"
+        "\n\nExperience:"
+        "\n- Senior Engineer at Acme (2020-Present): Led the migration of batch ETL jobs to streaming "
+        "pipelines on Kafka, cutting data latency from hours to minutes. Mentored four engineers."
+        "\n- Software Engineer at Initech (2016-2020): Built REST APIs in Django and PostgreSQL serving "
+        "two million requests a day. Introduced CI with GitHub Actions and Docker."
+        "\n\nProjects:\n- Resume Matcher: Matches resumes to job postings with sentence embeddings."
+        "\n\nSkills: Python, Django, PostgreSQL, Docker, Kafka, SQL"
+        "\n\nCertifications:\n- AWS Certified Developer"
+    )
+    guidelines = [
+        "Start every bullet with a strong action verb and quantify impact where possible.",
+        "Keep the summary to two or three sentences focused on the target role.",
+        "Group skills by category and list the most relevant ones first.",
+    ]
+    boilerplate = ("We are an equal opportunity employer and value diversity at our company. "
+                   "We offer competitive salary, health insurance and flexible working hours. ")
+    jobs = [{
+        "jobId": f"{i:016x}",
+        "title": title,
+        "company_name": company,
+        "application_link": f"https://jobs.example.com/{i}",
+        "description": (f"{company} is a fast-growing company building tools for modern teams. "
+                        f"Our mission is to make work simpler for everyone. "
+                        f"In this role you will join the platform group. "
+                        f"Requirements: 3+ years of experience with Python and {stack}. "
+                        f"Strong knowledge of SQL and REST API design. "
+                        f"Familiarity with Docker and Kubernetes is a plus. "
+                        f"You will collaborate with product managers and designers every day. "
+                        + boilerplate * 2)
+    } for i, (title, company, stack) in enumerate([
+        ("Backend Engineer", "Acme", "Django"),
+        ("Python Developer", "Initech", "FastAPI"),
+        ("Platform Engineer", "Globex", "Go"),
+    ])]
+    enhanced = {
+        "name": "Jane Doe", "email": "jane@example.com", "phone": "", "address": "", "linkedin": "",
+        "about": "Backend engineer with five years of experience building data platforms.",
+        "skills": ["Python", "Django", "PostgreSQL", "Docker", "Kafka", "SQL"],
+        "experience": ["Senior Engineer at Acme (2020-Present)", "Led migration to streaming pipelines"],
+        "education": ["B.Tech Computer Science"], "projects": ["Resume Matcher"],
+        "certifications": ["AWS Certified Developer"], "achievements": [],
+        "experience_entries": [{"heading": "Senior Engineer at Acme (2020-Present)",
+                                "details": ["Led migration to streaming pipelines"]}],
+        "project_entries": [{"heading": "Resume Matcher", "details": []}],
+        "parse_confidence": 0.93, "parse_problems": []
+    }
+    # What analyze_skill_gap reports for these jobs
+    gap = {"missing": [
+        {"skill": "Kubernetes", "category": "Cloud & DevOps", "jobs": 3},
+        {"skill": "REST APIs", "category": "Backend", "jobs": 3},
+        {"skill": "FastAPI", "category": "Backend", "jobs": 1},
+        {"skill": "Go", "category": "Languages", "jobs": 1},
+    ]}
+
+    # The prompts as the code before prompt budgeting wrote them
+    old_resume_text = "\n".join(f"{label}: {contact[key]}" for key, label in labels) + "\n" + resume_body
+    before = {
+        "build_prompt": f"""
+        You are a resume enhancement AI.
+
+        From the following raw resume data and RAG context, extract and rewrite content into structured professional resume sections: About, Skills, Experience, Education, Projects, Certifications, and Achievements.
+
+        Only return the enhanced resume content. Content should fit into a single page. Do NOT include any explanations, notes, or repeat the prompt.
+        === RAG CONTEXT ===
+        {guidelines}
+        === Resume Input ===
+        {old_resume_text}
+
+        === Enhanced Resume ===
+    """,
+        "generate_learning_path": f"""
+        You are a career advisor AI. The following is a candidate's resume:
+
+        --- RESUME ---
+        {enhanced}
+
+        These are the job descriptions of top matches:
+
+        --- JOB DESCRIPTIONS ---
+        {({"matched_jobs": jobs})}
+
+        1. Identify what technical or domain-specific skills the candidate is missing.
+        2. Recommend a step-by-step learning path (with topics/tools/technologies) to bridge the gap.
+        3. Suggest resources (platforms or certifications) for each skill if possible.
+    """,
+    }
+    resume_text = "\n".join(contact_lines(contact)) + "\n" + resume_body
+    after = {
+        "build_prompt": resume_prompt(resume_text, guidelines),
+        "generate_learning_path": learning_path_prompt(
+            [f"{job['title']} at {job['company_name']}" for job in jobs],
+            enhanced["skills"], format_gap(gap, len(jobs))),
+    }
+    for name in before:
+        old, new = count_tokens(before[name]), count_tokens(after[name])
+        print(f"{name:24s} {old:6d} -> {new:6d} tokens ({(1 - new / old) * 100:.0f}% fewer)")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--benchmark" in sys.argv:
+        _benchmark()
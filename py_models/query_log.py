@@ -0,0 +1,109 @@
+"""
+Query Log
+
+Persistent job-search query frequencies, shared by every process that
+serves job matches. The background refresher reads the most frequent
+(jobTitle, location) pairs from it and records which postings each
+refresh stored in the job corpus, so later requests for those queries
+can be served from the corpus instead of SerpAPI.
+
+Popularity is a request count that decays exponentially with a half-life
+of QUERY_LOG_HALF_LIFE seconds (default one day), so searches nobody
+makes any more stop being refreshed and make room for new ones. When the
+log is full the entries with the lowest decayed count are forgotten,
+never the one just written.
+
+Stored as queries.json in the job corpus directory; writers serialise on
+an advisory lock and replace the file atomically.
+"""
+
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+
+MAX_QUERIES = 1000
+HALF_LIFE = float(os.environ.get("QUERY_LOG_HALF_LIFE", 86400))
+
+
+def query_key(job_title, location):
+    return f"{' '.join((job_title or '').lower().split())}|{' '.join((location or '').lower().split())}"
+
+
+def decayed_count(entry, now=None):
+    """An entry's request count, decayed to `now`."""
+    now = time.time() if now is None else now
+    # Entries written before decay was added only have a raw count
+    score = entry.get("score", entry.get("count", 0))
+    scored_at = entry.get("scoredAt", entry.get("lastRequestedAt", now))
+    return score * 0.5 ** (max(0.0, now - scored_at) / HALF_LIFE)
+
+
+def _new_entry(job_title, location):
+    return {"jobTitle": job_title, "location": location or "", "count": 0, "score": 0.0, "scoredAt": time.time()}
+
+
+class QueryLog:
+    """Request counts and last refresh per (jobTitle, location)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    @contextmanager
+    def _update(self, written):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                entries = self._read()
+                yield entries
+                if len(entries) > MAX_QUERIES:
+                    # Forget the least requested queries, but keep the one
+                    # just written so a new query can build up a count
+                    now = time.time()
+                    others = sorted((key for key in entries if key != written),
+                                    key=lambda key: decayed_count(entries[key], now), reverse=True)
+                    keep = others[:MAX_QUERIES - 1] + [written]
+                    entries = {key: entries[key] for key in keep if key in entries}
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(entries, f, ensure_ascii=False, separators=(",", ":"))
+                os.replace(tmp_path, self.path)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def record(self, job_title, location):
+        """Count one request for a query."""
+        key = query_key(job_title, location)
+        with self._update(key) as entries:
+            entry = entries.setdefault(key, _new_entry(job_title, location))
+            now = time.time()
+            entry["score"] = decayed_count(entry, now) + 1
+            entry["scoredAt"] = now
+            entry["count"] += 1
+            entry["lastRequestedAt"] = now
+
+    def get(self, job_title, location):
+        return self._read().get(query_key(job_title, location))
+
+    def top(self, n):
+        """The n queries with the highest decayed request counts."""
+        entries = self._read()
+        now = time.time()
+        return sorted(entries.values(), key=lambda entry: decayed_count(entry, now), reverse=True)[:n]
+
+    def mark_refreshed(self, job_title, location, job_ids, refreshed_at=None):
+        """Record the postings a refresh stored for a query."""
+        key = query_key(job_title, location)
+        with self._update(key) as entries:
+            entry = entries.setdefault(key, _new_entry(job_title, location))
+            entry["jobIds"] = list(job_ids)
+            entry["refreshedAt"] = time.time() if refreshed_at is None else refreshed_at
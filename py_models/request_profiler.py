@@ -0,0 +1,165 @@
+"""
+Request Profiler
+
+On-demand sampling profiler for a single request. While a profiled call
+runs, a background thread snapshots the stack of the calling thread (and
+of any thread started during the call, such as section-enhancement
+workers) every PROFILE_INTERVAL_MS through sys._current_frames().
+
+Two files are written to PROFILE_DIR per profiled request:
+    <name>-<time>-<pid>-<n>.collapsed  one "frame;frame;frame count" line
+                                       per stack, for flamegraph.pl / speedscope
+    <name>-<time>-<pid>-<n>.txt        top-N functions by self and total samples
+
+<n> numbers the profiles written by a process, so requests profiled in
+the same second (e.g. by one pool worker) don't overwrite each other.
+
+Unprofiled requests pay nothing: no thread is started and no frame is
+sampled unless a profile was asked for.
+"""
+
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", 5))
+TOP_N = 15
+
+_profile_numbers = itertools.count(1)
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _stack(frame):
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+class SamplingProfiler:
+    """Samples the stacks of one thread (plus threads it starts) on a timer."""
+
+    def __init__(self, interval_ms=INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.target = threading.get_ident()
+        self.existing = set(sys._current_frames()) - {self.target}
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started_at
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident == own or ident in self.existing:
+                    continue
+                if ident not in names:
+                    names.update((thread.ident, thread.name) for thread in threading.enumerate())
+                    names.setdefault(ident, str(ident))
+                # Threads other than the caller's are kept apart under their name
+                prefix = [] if ident == self.target else [f"[{names[ident]}]"]
+                self.stacks[";".join(prefix + _stack(frame))] += 1
+            self.samples += 1
+
+    def top(self, n=TOP_N):
+        """Functions with the most samples: [(label, self samples, total samples)]."""
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for label in set(frames):
+                total[label] += count
+        ranked = sorted(total, key=lambda label: (own[label], total[label]), reverse=True)
+        return [(label, own[label], total[label]) for label in ranked[:n]]
+
+    def write(self, name, directory=PROFILE_DIR):
+        """Write the collapsed stacks and the summary; returns their paths."""
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_profile_numbers)}")
+        with open(base + ".collapsed", "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        samples = max(self.samples, 1)
+        lines = [f"{name}: {self.samples} samples over {self.elapsed:.3f}s (every {self.interval * 1000:g} ms)",
+                 "Percentages are of samples; each thread counts separately, so with several",
+                 "threads running they can add up to more than 100.",
+                 "", f"{'self%':>7} {'total%':>7}  function"]
+        lines += [f"{100 * own / samples:7.1f} {100 * total / samples:7.1f}  {label}"
+                  for label, own, total in self.top()]
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return base + ".collapsed", base + ".txt"
+
+
+@contextmanager
+def profiled(name, directory=PROFILE_DIR, interval_ms=INTERVAL_MS):
+    """
+    Profile the body of the with-block. The yielded dict is filled in on
+    exit with the output paths, sample count and top functions, ready to be
+    attached to a response as "profile".
+    """
+    report = {}
+    profiler = SamplingProfiler(interval_ms).start()
+    try:
+        yield report
+    finally:
+        profiler.stop()
+        collapsed_path, summary_path = profiler.write(name, directory)
+        samples = max(profiler.samples, 1)
+        report.update({
+            "path": collapsed_path,
+            "summary": summary_path,
+            "samples": profiler.samples,
+            "elapsedMs": round(profiler.elapsed * 1000, 1),
+            "top": [{"function": label, "selfPct": round(100 * own / samples, 1),
+                     "totalPct": round(100 * total / samples, 1)}
+                    for label, own, total in profiler.top(5)]
+        })
+
+
+def profile_requested(params, argv=None):
+    """True if a request's params/options or the command line ask for a profile."""
+    params = params if isinstance(params, dict) else {}
+    options = params.get("options") if isinstance(params.get("options"), dict) else {}
+    return bool(params.get("profile") or options.get("profile") or "--profile" in (argv or []))
+
+
+def call_with_profile(name, enabled, function, *args, **kwargs):
+    """
+    Call function; when enabled, under the profiler, adding "profile" to a
+    dict result. The backend scripts use this around their main call.
+    """
+    if not enabled:
+        return function(*args, **kwargs)
+    with profiled(name) as report:
+        result = function(*args, **kwargs)
+    if isinstance(result, dict):
+        result["profile"] = report
+    return result
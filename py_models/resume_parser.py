@@ -0,0 +1,269 @@
+"""
+Resume Section Parser
+
+Single-pass parser for the enhanced resume text returned by the LLM.
+
+Recognised header styles (case-insensitive, with common aliases such as
+"Summary" -> About or "Work Experience" -> Experience):
+    **Skills**   **Skills:**   **Skills**: Python, SQL
+    ## Skills    ### Skills:
+    SKILLS:      Skills: Python, SQL
+    SKILLS       (a line holding nothing but the section name)
+
+Every line is visited once. Cheap string checks reject most lines before
+the precompiled header regex runs, and bullets and markdown emphasis are
+stripped in the same step instead of separate strip chains and clean-up
+passes. Experience and project
+sections also keep their sub-structure (entry heading + bullet details).
+The result carries a confidence score so callers can tell a clean parse
+from output that should be regenerated.
+
+Run `python resume_parser.py --benchmark` for a throughput comparison
+against the previous line-by-line parser.
+"""
+
+import re
+
+SECTION_TITLES = ("About", "Skills", "Experience", "Education", "Projects",
+                  "Certifications", "Achievements")
+
+SECTION_ALIASES = {
+    "about": "about",
+    "about me": "about",
+    "summary": "about",
+    "professional summary": "about",
+    "profile": "about",
+    "objective": "about",
+    "skills": "skills",
+    "technical skills": "skills",
+    "key skills": "skills",
+    "core competencies": "skills",
+    "experience": "experience",
+    "work experience": "experience",
+    "professional experience": "experience",
+    "employment history": "experience",
+    "education": "education",
+    "projects": "projects",
+    "key projects": "projects",
+    "personal projects": "projects",
+    "certifications": "certifications",
+    "certificates": "certifications",
+    "licenses and certifications": "certifications",
+    "achievements": "achievements",
+    "awards": "achievements",
+    "accomplishments": "achievements",
+    "honors and awards": "achievements",
+}
+
+# Sections that carry more weight when scoring parse confidence
+CORE_SECTIONS = ("about", "skills", "experience", "education")
+STRUCTURED_SECTIONS = ("experience", "projects")
+
+# A header is an optional markdown prefix, a short title, and then either
+# closing emphasis, a colon or the end of the line. The title is looked up
+# in SECTION_ALIASES, so ordinary content lines never become headers.
+HEADER_PATTERN = re.compile(
+    r"^(?P<hash>\#{1,6}[ \t]*)?(?P<bold>\*\*|__)?[ \t]*"
+    r"(?P<title>[A-Za-z][A-Za-z &/]{0,40}?)[ \t]*"
+    r"(?:(?:\*\*|__)[ \t]*(?P<colon_after>:)?|(?P<colon>:)(?:[ \t]*(?:\*\*|__))?|$)"
+    r"[ \t]*(?P<rest>.*?)[ \t]*$"
+)
+
+NUMBERED_BULLET_PATTERN = re.compile(r"^\d{1,2}[.)][ \t]+")
+
+BULLET_CHARS = frozenset("-*+•▪●◦–")
+MARKUP_START_CHARS = frozenset("#*_")
+MAX_TITLE_LENGTH = max(len(alias) for alias in SECTION_ALIASES)
+
+EMPHASIS_PATTERN = re.compile(r"\*\*|__")
+
+# Inline skill lists such as "Skills: Python, SQL, Docker"
+INLINE_SPLIT_PATTERN = re.compile(r"[ \t]*[,;|][ \t]*")
+
+
+def _match_marked_header(stripped):
+    """Return (section, inline content) for a header line carrying markup."""
+    match = HEADER_PATTERN.match(stripped)
+    if not match:
+        return None
+
+    section = SECTION_ALIASES.get(" ".join(match.group("title").lower().split()))
+    if section is None:
+        return None
+
+    rest = match.group("rest")
+    marked = match.group("hash") or match.group("bold") or match.group("colon") or match.group("colon_after")
+    # A title without markup is only a header when nothing else is on the line
+    if not marked and rest:
+        return None
+
+    return section, EMPHASIS_PATTERN.sub("", rest).strip()
+
+
+def parse_sections(raw_text):
+    """
+    Parse LLM resume output into sections.
+
+    Returns a dict with:
+        sections    - section name -> list of cleaned content lines
+        entries     - "experience"/"projects" -> list of
+                      {"heading": str, "details": [str]}
+        confidence  - 0..1 score of how well the text matched the
+                      expected structure
+        unassigned  - number of content lines seen before any header
+    """
+    sections = {title.lower(): [] for title in SECTION_TITLES}
+    entries = {name: [] for name in STRUCTURED_SECTIONS}
+    current = None
+    current_items = None
+    current_entries = None
+    unassigned = 0
+
+    aliases = SECTION_ALIASES
+    max_title = MAX_TITLE_LENGTH
+    markup_start = MARKUP_START_CHARS
+    bullet_chars = BULLET_CHARS
+    emphasis_sub = EMPHASIS_PATTERN.sub
+    numbered_match = NUMBERED_BULLET_PATTERN.match
+
+    for line in raw_text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+
+        # Header detection. Short lines are looked up directly once markup
+        # is trimmed ("## Skills", "**Skills:**", "SKILLS"); only lines with
+        # markup or an early colon that may carry inline content ("Skills:
+        # Python, SQL") go through the regex.
+        header = None
+        first = stripped[0]
+        if len(stripped) <= max_title + 8:
+            section = aliases.get(stripped.strip("#*_ \t").rstrip(":*_ \t").lower())
+            if section is not None:
+                header = (section, "")
+        if header is None and (first in markup_start or ":" in stripped[:max_title + 6]):
+            if first not in bullet_chars or stripped[1:2] not in (" ", "\t"):
+                header = _match_marked_header(stripped)
+
+        if header is not None:
+            current, inline = header
+            current_items = sections[current]
+            current_entries = entries.get(current)
+            if inline:
+                items = INLINE_SPLIT_PATTERN.split(inline) if current == "skills" else [inline]
+                current_items.extend(item for item in items if item)
+            continue
+
+        if current is None:
+            unassigned += 1
+            continue
+
+        # Strip one bullet marker ("- ", "• ", "1. ") and markdown emphasis
+        bulleted = False
+        if first in bullet_chars and stripped[1:2] in (" ", "\t"):
+            stripped = stripped[2:].lstrip()
+            bulleted = True
+        elif first.isdigit():
+            numbered = numbered_match(stripped)
+            if numbered:
+                stripped = stripped[numbered.end():]
+                bulleted = True
+        if "**" in stripped or "__" in stripped:
+            stripped = emphasis_sub("", stripped).strip()
+        if not stripped:
+            continue
+
+        current_items.append(stripped)
+
+        if current_entries is not None:
+            # Unbulleted, unindented lines open a new entry; bullets and
+            # indented lines are details of the current one.
+            if (bulleted or line[0] in " \t") and current_entries:
+                current_entries[-1]["details"].append(stripped)
+            else:
+                current_entries.append({"heading": stripped, "details": []})
+
+    assigned = sum(len(items) for items in sections.values())
+    return {
+        "sections": sections,
+        "entries": entries,
+        "confidence": _confidence(sections, assigned, unassigned),
+        "unassigned": unassigned
+    }
+
+
+def _confidence(sections, assigned, unassigned):
+    weights = {name: (2.0 if name in CORE_SECTIONS else 1.0) for name in sections}
+    found = sum(weight for name, weight in weights.items() if sections[name])
+    coverage = found / sum(weights.values())
+
+    total = assigned + unassigned
+    assigned_ratio = assigned / total if total else 0.0
+    return round(0.7 * coverage + 0.3 * assigned_ratio, 3)
+
+
+def _legacy_parse(raw_text):
+    """The previous per-line parser, kept for the benchmark only."""
+    sections = {title.lower(): [] for title in SECTION_TITLES}
+    current_section = None
+    for line in raw_text.strip().splitlines():
+        match = re.match(r"\*\*(.*?)\*\*", line.strip())
+        if match:
+            header = match.group(1).strip()
+            if header in SECTION_TITLES:
+                current_section = header.lower()
+                continue
+        if current_section:
+            content = line.strip("•").strip("-").strip()
+            if content:
+                sections[current_section].append(content)
+    return {name: [item.lstrip('*+•- ').strip() for item in items] for name, items in sections.items()}
+
+
+def _benchmark(repeat=200):
+    import timeit
+
+    mixed = "\n".join([
+        "**About**",
+        "Backend engineer with 6 years of experience building data platforms.",
+        "## Skills",
+        "- Python, Go, PostgreSQL, Kafka, Kubernetes",
+        "- AWS, Terraform, Docker",
+        "EXPERIENCE:",
+        "**Senior Engineer** at Acme Corp (2020-Present)",
+        "  - Led migration of batch pipelines to streaming, cutting latency by 80%",
+        "  - Mentored 4 engineers",
+        "Engineer at Initech (2017-2020)",
+        "  - Built internal billing service handling 2M invoices/month",
+        "**Education**",
+        "- B.Tech Computer Science, 2017",
+        "### Projects",
+        "Resume Matcher",
+        "- Semantic job matching with MiniLM and FAISS",
+        "Certifications:",
+        "- AWS Solutions Architect",
+        "**Achievements**",
+        "- Hackathon winner 2019",
+    ])
+    # Only **Header** style, which both parsers understand
+    bold_only = re.sub(r"^(?:#+ |)([A-Za-z]+):?$", lambda m: f"**{m.group(1).title()}**", mixed, flags=re.M)
+
+    for label, block in (("mixed headers", mixed), ("**Header** only", bold_only)):
+        text = "\n".join([block] * 50)
+        size_mb = len(text.encode("utf-8")) / (1024 * 1024)
+        print(f"{label} ({len(text.splitlines())} lines):")
+        for name, parser in (("legacy", _legacy_parse), ("single-pass", parse_sections)):
+            seconds = min(timeit.repeat(lambda: parser(text), number=repeat, repeat=3)) / repeat
+            print(f"  {name:12s} {seconds * 1000:8.3f} ms/parse  {size_mb / seconds:8.2f} MB/s")
+
+        found = sorted(name for name, items in parse_sections(text)["sections"].items() if items)
+        legacy_found = sorted(name for name, items in _legacy_parse(text).items() if items)
+        print(f"  sections found: single-pass={found}")
+        print(f"                  legacy={legacy_found}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--benchmark" in sys.argv:
+        _benchmark()
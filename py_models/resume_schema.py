@@ -0,0 +1,229 @@
+"""
+Resume Schema
+
+Schema for JSON-mode resume enhancement output, plus local validation and
+repair so that malformed or truncated LLM output is fixed here instead of
+through a second LLM call.
+
+The validated result has the same shape as resume_parser.parse_sections,
+so callers can use either path interchangeably.
+"""
+
+import json
+import re
+
+from resume_parser import SECTION_TITLES, parse_sections
+
+ENTRY_SECTIONS = ("experience", "projects")
+
+RESUME_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "about": {"type": "string"},
+        "skills": {"type": "array", "items": {"type": "string"}},
+        "experience": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "heading": {"type": "string", "description": "Role at Organization (Duration)"},
+                    "details": {"type": "array", "items": {"type": "string"}}
+                },
+                "required": ["heading", "details"]
+            }
+        },
+        "education": {"type": "array", "items": {"type": "string"}},
+        "projects": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "heading": {"type": "string", "description": "Project name"},
+                    "details": {"type": "array", "items": {"type": "string"}}
+                },
+                "required": ["heading", "details"]
+            }
+        },
+        "certifications": {"type": "array", "items": {"type": "string"}},
+        "achievements": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": [title.lower() for title in SECTION_TITLES]
+}
+
+FENCE_PATTERN = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+TRAILING_COMMA_PATTERN = re.compile(r",\s*([}\]])")
+SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+
+def schema_instructions():
+    """Prompt text describing the JSON the model must return."""
+    return (
+        "Return ONLY a JSON object (no markdown, no commentary) that matches this JSON schema:\n"
+        + json.dumps(RESUME_SCHEMA, separators=(",", ":"))
+    )
+
+
+def _close_truncated(text):
+    """Close strings, arrays and objects left open by a truncated response."""
+    stack = []
+    in_string = False
+    escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+
+    if in_string:
+        text += '"'
+    text = text.rstrip().rstrip(",").rstrip(":")
+    return text + "".join(reversed(stack))
+
+
+def load_json_output(raw_text):
+    """
+    Parse JSON from an LLM response, repairing the common defects locally:
+    code fences, leading/trailing prose, smart quotes, trailing commas and
+    truncation at max_tokens. Returns the object or None if unrecoverable.
+
+    When only repaired parses succeed, the one that recovers the most
+    content wins: cutting a truncated response at its last "}" parses, but
+    drops the partial entry that closing the full text keeps.
+    """
+    text = FENCE_PATTERN.sub("", raw_text.strip())
+    start = text.find("{")
+    if start == -1:
+        return None
+    end = text.rfind("}")
+    candidates = [text[start:end + 1]] if end > start else []
+    candidates.append(text[start:])
+
+    recovered = []
+    for candidate in candidates:
+        for attempt in (candidate,
+                        TRAILING_COMMA_PATTERN.sub(r"\1", candidate.translate(SMART_QUOTES)),
+                        TRAILING_COMMA_PATTERN.sub(r"\1", _close_truncated(candidate.translate(SMART_QUOTES)))):
+            try:
+                value = json.loads(attempt)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(value, dict):
+                if attempt == candidate:
+                    return value
+                recovered.append(value)
+                break
+    if not recovered:
+        return None
+    return max(recovered, key=lambda value: len(json.dumps(value, ensure_ascii=False)))
+
+
+def _as_string(value):
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (list, tuple)):
+        return " ".join(_as_string(item) for item in value if item)
+    if isinstance(value, dict):
+        return ", ".join(_as_string(item) for item in value.values() if item)
+    return str(value).strip()
+
+
+def _as_string_list(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = re.split(r"\s*[\n;]\s*|\s*,\s*", value) if "\n" in value or "," in value else [value]
+    elif isinstance(value, dict):
+        value = list(value.values())
+    items = []
+    for item in value:
+        text = _as_string(item)
+        if text:
+            items.append(text)
+    return items
+
+
+def _as_entries(value):
+    entries = []
+    for item in value if isinstance(value, list) else _as_string_list(value):
+        if isinstance(item, dict):
+            heading = _as_string(item.get("heading") or item.get("title") or item.get("name") or item.get("role"))
+            details = _as_string_list(item.get("details") or item.get("highlights") or item.get("description"))
+        else:
+            heading, details = _as_string(item), []
+        if heading or details:
+            entries.append({"heading": heading or details.pop(0), "details": details})
+    return entries
+
+
+def validate_resume(value):
+    """
+    Coerce a decoded JSON object into the resume schema. Returns
+    (sections, entries, problems) where problems lists every repair made.
+    """
+    problems = []
+    lowered = {str(key).lower(): item for key, item in value.items()}
+
+    sections = {}
+    entries = {}
+    for title in SECTION_TITLES:
+        name = title.lower()
+        raw = lowered.get(name)
+        if raw is None:
+            problems.append(f"missing section '{name}'")
+
+        if name == "about":
+            if raw is not None and not isinstance(raw, str):
+                problems.append("coerced 'about' to a string")
+            about = _as_string(raw)
+            sections[name] = [about] if about else []
+        elif name in ENTRY_SECTIONS:
+            if raw is not None and not (isinstance(raw, list) and all(isinstance(item, dict) for item in raw)):
+                problems.append(f"coerced '{name}' to heading/details entries")
+            entries[name] = _as_entries(raw or [])
+            sections[name] = [line for entry in entries[name] for line in [entry["heading"], *entry["details"]]]
+        else:
+            if raw is not None and not (isinstance(raw, list) and all(isinstance(item, str) for item in raw)):
+                problems.append(f"coerced '{name}' to a list of strings")
+            sections[name] = _as_string_list(raw)
+
+    unknown = set(lowered) - {title.lower() for title in SECTION_TITLES}
+    if unknown:
+        problems.append(f"dropped unknown keys: {', '.join(sorted(unknown))}")
+    return sections, entries, problems
+
+
+def parse_resume_output(raw_text):
+    """
+    Turn a JSON-mode LLM response into parse_sections-shaped output. Falls
+    back to the text parser when the JSON cannot be recovered, so no second
+    LLM call is needed.
+    """
+    value = load_json_output(raw_text)
+    if value is None:
+        parsed = parse_sections(raw_text)
+        parsed["problems"] = ["response was not valid JSON; parsed as text"]
+        return parsed
+
+    sections, entries, problems = validate_resume(value)
+    # Empty sections are legitimate in JSON mode; missing keys and type
+    # coercions are what lower confidence.
+    missing = sum(1 for problem in problems if problem.startswith("missing section"))
+    coerced = len(problems) - missing
+    return {
+        "sections": sections,
+        "entries": entries,
+        "confidence": round((len(sections) - missing) / len(sections) * (0.9 if coerced else 1.0), 3),
+        "unassigned": 0,
+        "problems": problems
+    }
@@ -0,0 +1,342 @@
+"""
+Resume Vector Store
+
+Persistent, per-user store of resume embeddings that replaces the single
+global resume_vectors.index file.
+
+Layout on disk (one directory per store):
+    entries.db          - sqlite (WAL) table of key -> row, version, metadata,
+                          plus the store's dimension, row count, generation
+                          and current vector file
+    vectors-<gen>.f32   - append-only float32 matrix, one L2-normalised row
+                          per stored resume version, read through np.memmap
+    .lock               - advisory lock file serialising writers
+
+An upsert appends its rows to the vector file and commits the entries in
+one sqlite transaction, so its cost does not grow with the store. Rows
+are never rewritten in place, and readers take a snapshot of the entry
+table, so they always see consistent vectors. compact() writes the live
+rows to a new vector file, points the table at it and only then removes
+the old one.
+
+A store written by earlier versions (manifest.json + vectors.f32) is
+imported the first time it is opened.
+"""
+
+import fcntl
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+DEFAULT_STORE_DIR = os.environ.get("RESUME_STORE_DIR", "resume_store")
+DATABASE_FILE = "entries.db"
+LOCK_FILE = ".lock"
+# Layout of earlier versions, imported on first open
+LEGACY_MANIFEST_FILE = "manifest.json"
+LEGACY_VECTORS_FILE = "vectors.f32"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS store (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    dimension INTEGER,
+    rows INTEGER NOT NULL,
+    generation INTEGER NOT NULL,
+    vectors TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    row INTEGER NOT NULL UNIQUE,
+    version INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    metadata TEXT NOT NULL
+);
+"""
+
+
+def resume_key(user_id, resume_id):
+    """Build the store key for a user's resume."""
+    return f"{user_id or 'anonymous'}:{resume_id or 'default'}"
+
+
+def _normalize(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype="float32"))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _vectors_file(generation):
+    return f"vectors-{generation}.f32"
+
+
+class ResumeVectorStore:
+    """Versioned resume embeddings keyed by user/resume id."""
+
+    def __init__(self, root=DEFAULT_STORE_DIR, dimension=None):
+        self.root = root
+        self.dimension = dimension
+        os.makedirs(root, exist_ok=True)
+        self._db = None
+        self._db_pid = None
+        self._db_lock = threading.RLock()
+        self._generation = None
+        self._live_rows = None
+        self._live_mask = None
+
+    # ------------------------------------------------------------------
+    # Paths, locking and the entry table
+    # ------------------------------------------------------------------
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    @contextmanager
+    def _write_lock(self):
+        with open(self._path(LOCK_FILE), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _connection(self):
+        # sqlite connections must not cross a fork: reopen in each process
+        if self._db is None or self._db_pid != os.getpid():
+            db = sqlite3.connect(self._path(DATABASE_FILE), isolation_level=None,
+                                 check_same_thread=False, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            with self._write_lock():
+                db.executescript(SCHEMA)
+                if db.execute("SELECT COUNT(*) FROM store").fetchone()[0] == 0:
+                    self._initialize(db)
+            self._db = db
+            self._db_pid = os.getpid()
+            self._generation = None
+        return self._db
+
+    def _initialize(self, db):
+        """Create the store row, importing a manifest.json store if there is one."""
+        manifest_path = self._path(LEGACY_MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            db.execute("INSERT INTO store VALUES (0, ?, 0, 0, ?)", (self.dimension, _vectors_file(0)))
+            return
+
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        db.execute("BEGIN IMMEDIATE")
+        db.execute("INSERT INTO store VALUES (0, ?, ?, ?, ?)",
+                   (manifest["dimension"], manifest["rows"], manifest["generation"], LEGACY_VECTORS_FILE))
+        db.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?)", [
+            (key, entry["row"], entry["version"], entry["updatedAt"], json.dumps(entry.get("metadata", {})))
+            for key, entry in manifest["entries"].items()
+        ])
+        db.execute("COMMIT")
+        os.remove(manifest_path)
+
+    @contextmanager
+    def _transaction(self, write=False):
+        """A read snapshot (or, with write, the write lock) over the entry table."""
+        with self._db_lock:
+            db = self._connection()
+            if write:
+                with self._write_lock():
+                    db.execute("BEGIN IMMEDIATE")
+                    try:
+                        yield db
+                    except BaseException:
+                        db.execute("ROLLBACK")
+                        raise
+                    db.execute("COMMIT")
+            else:
+                db.execute("BEGIN")
+                try:
+                    yield db
+                finally:
+                    db.execute("COMMIT")
+
+    def _state(self, db):
+        dimension, rows, generation, vectors = db.execute(
+            "SELECT dimension, rows, generation, vectors FROM store").fetchone()
+        return {"dimension": dimension, "rows": rows, "generation": generation, "vectors": vectors}
+
+    def _row_index(self, db, state):
+        """Live rows (sorted) and the mask of live rows, rebuilt when the generation changes."""
+        if self._generation != state["generation"]:
+            live_rows = np.fromiter((row for row, in db.execute("SELECT row FROM entries ORDER BY row")),
+                                    dtype=np.int64)
+            live_mask = np.zeros(state["rows"], dtype=bool)
+            live_mask[live_rows] = True
+            self._live_rows, self._live_mask = live_rows, live_mask
+            self._generation = state["generation"]
+        return self._live_rows, self._live_mask
+
+    def _vectors(self, state):
+        rows = state["rows"]
+        if rows == 0:
+            return np.empty((0, state["dimension"] or 0), dtype="float32")
+        return np.memmap(self._path(state["vectors"]), dtype="float32", mode="r",
+                         shape=(rows, state["dimension"]))
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def upsert(self, key, embedding, metadata=None):
+        """Insert or replace one resume embedding. Returns the new version."""
+        return self.upsert_many([(key, embedding, metadata)])[key]
+
+    def upsert_many(self, items):
+        """
+        Insert or replace several resume embeddings in one write.
+        items is an iterable of (key, embedding, metadata) tuples.
+        Returns a dict mapping key -> new version.
+        """
+        items = list(items)
+        if not items:
+            return {}
+
+        vectors = _normalize([embedding for _, embedding, _ in items])
+
+        with self._transaction(write=True) as db:
+            state = self._state(db)
+            if state["dimension"] is None:
+                state["dimension"] = int(vectors.shape[1])
+            if vectors.shape[1] != state["dimension"]:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match store dimension {state['dimension']}"
+                )
+
+            row_bytes = state["dimension"] * 4
+            with open(self._path(state["vectors"]), "ab") as f:
+                # Drop any tail left behind by a writer that died before
+                # committing its entries.
+                f.truncate(state["rows"] * row_bytes)
+                f.write(vectors.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            now = time.time()
+            versions = {}
+            for offset, (key, _, metadata) in enumerate(items):
+                previous = db.execute("SELECT version, metadata FROM entries WHERE key = ?", (key,)).fetchone()
+                version = (previous[0] if previous else 0) + 1
+                if metadata is not None:
+                    metadata_json = json.dumps(metadata, ensure_ascii=False)
+                else:
+                    metadata_json = previous[1] if previous else "{}"
+                db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                           (key, state["rows"] + offset, version, now, metadata_json))
+                versions[key] = version
+
+            db.execute("UPDATE store SET dimension = ?, rows = ?, generation = generation + 1",
+                       (state["dimension"], state["rows"] + len(items)))
+        return versions
+
+    def delete(self, key):
+        """Remove a resume from the store. Returns True if it existed."""
+        with self._transaction(write=True) as db:
+            if db.execute("DELETE FROM entries WHERE key = ?", (key,)).rowcount == 0:
+                return False
+            db.execute("UPDATE store SET generation = generation + 1")
+        return True
+
+    def compact(self):
+        """Rewrite the vectors to a new file keeping only the live row of each entry."""
+        with self._transaction(write=True) as db:
+            state = self._state(db)
+            old_rows = [row for row, in db.execute("SELECT row FROM entries ORDER BY row")]
+            vectors = self._vectors(state)
+            new_file = _vectors_file(state["generation"] + 1)
+
+            with open(self._path(new_file), "wb") as f:
+                if old_rows:
+                    f.write(np.ascontiguousarray(vectors[np.array(old_rows, dtype=np.int64)]).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            del vectors
+
+            # Rows only move down, in ascending order, so the UNIQUE row
+            # constraint never sees two entries on one row
+            db.executemany("UPDATE entries SET row = ? WHERE row = ?",
+                           [(new_row, old_row) for new_row, old_row in enumerate(old_rows)])
+            db.execute("UPDATE store SET rows = ?, generation = generation + 1, vectors = ?",
+                       (len(old_rows), new_file))
+        if state["vectors"] != new_file:
+            # Readers that already mapped the old file keep their mapping
+            try:
+                os.remove(self._path(state["vectors"]))
+            except FileNotFoundError:
+                pass
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def __len__(self):
+        with self._transaction() as db:
+            return db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @contextmanager
+    def _snapshot(self):
+        """A read snapshot with its vectors mapped; retried once if compact() removed the file."""
+        for attempt in range(2):
+            with self._transaction() as db:
+                state = self._state(db)
+                try:
+                    vectors = self._vectors(state)
+                except FileNotFoundError:
+                    if attempt:
+                        raise
+                    continue
+                yield db, state, vectors
+                return
+
+    def get(self, key):
+        """Return the stored entry (with its vector) for a key, or None."""
+        with self._snapshot() as (db, state, vectors):
+            entry = db.execute("SELECT row, version, updated_at, metadata FROM entries WHERE key = ?",
+                               (key,)).fetchone()
+            if entry is None:
+                return None
+            row, version, updated_at, metadata = entry
+            return {"key": key, "vector": np.array(vectors[row]), "row": row, "version": version,
+                    "updatedAt": updated_at, "metadata": json.loads(metadata)}
+
+    def search(self, query_embedding, top_k=10):
+        """
+        Return the top_k stored resumes closest to the query embedding
+        (cosine similarity), best first. The whole store is scored with a
+        single matrix-vector product over the memory-mapped vectors, and
+        only the hits' entries are read from the table.
+        """
+        with self._snapshot() as (db, state, vectors):
+            live_rows, live_mask = self._row_index(db, state)
+            if not len(live_rows):
+                return []
+
+            query = _normalize(query_embedding)[0]
+            scores = np.asarray(vectors @ query)
+            scores[~live_mask] = -np.inf
+
+            k = min(top_k, len(live_rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            rows = [int(row) for row in top]
+            entries = {row: (key, version, updated_at, metadata) for key, row, version, updated_at, metadata in
+                       db.execute(f"SELECT key, row, version, updated_at, metadata FROM entries "
+                                  f"WHERE row IN ({','.join('?' * len(rows))})", rows)}
+
+        results = []
+        for row in rows:
+            key, version, updated_at, metadata = entries[row]
+            results.append({
+                "key": key,
+                "score": float(scores[row]),
+                "version": version,
+                "updatedAt": updated_at,
+                "metadata": json.loads(metadata)
+            })
+        return results
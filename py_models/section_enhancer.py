@@ -0,0 +1,197 @@
+"""
+Section Enhancer
+
+Incremental, per-section resume enhancement. Instead of one LLM call that
+rewrites the whole resume, the classified resume is split into units (one
+per experience entry, one per project, and one each for the remaining
+sections), independent units are enhanced concurrently, and each result is
+cached on disk by a hash of the unit's content. Re-submitting a resume
+with a small edit only regenerates the units that changed.
+
+The enhanced units are reassembled as "**Section**" blocks, so the output
+goes through resume_parser.parse_sections like a whole-resume response.
+
+Configuration (environment):
+    SECTION_CACHE_DIR            cache directory (default section_cache)
+    SECTION_ENHANCE_CONCURRENCY  concurrent LLM calls (default 4)
+"""
+
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from prompt_budget import bullets
+
+logger = logging.getLogger("section_enhancer")
+
+DEFAULT_CACHE_DIR = os.environ.get("SECTION_CACHE_DIR", "section_cache")
+DEFAULT_CONCURRENCY = int(os.environ.get("SECTION_ENHANCE_CONCURRENCY", 4))
+
+# Bump when the unit prompts change so stale cache entries are not reused
+PROMPT_VERSION = 1
+
+SECTION_ORDER = ("about", "skills", "experience", "education", "projects", "certifications", "achievements")
+
+UNIT_INSTRUCTIONS = {
+    "about": "Write a 2-3 sentence professional summary for the About section of this resume. "
+             "Return only the summary text.",
+    "skills": "Rewrite this skills list for a resume: group related skills, normalise names and drop duplicates. "
+              "Return one skill per line as '- skill'.",
+    "experience": "Rewrite this work experience entry for a resume. Return the first line as "
+                  "'Role at Organization (Duration)' followed by 2-4 achievement bullets as '- bullet', "
+                  "starting with action verbs and quantifying impact where the input supports it.",
+    "education": "Rewrite these education entries for a resume. Return one entry per line as '- entry'.",
+    "projects": "Rewrite this project for a resume. Return the first line as the project name followed by "
+                "1-3 bullets as '- bullet' describing what was built and its impact.",
+    "certifications": "Clean up these certifications for a resume. Return one per line as '- certification'.",
+    "achievements": "Rewrite these achievements for a resume, quantified where possible. "
+                    "Return one per line as '- achievement'.",
+}
+
+
+def resume_units(classification):
+    """
+    Split a classified resume into enhancement units, in output order.
+    Returns a list of (section, text, key_text) triples, where key_text is
+    the content the unit's cache entry is keyed on.
+    """
+    units = []
+
+    # The summary is written from an outline of the whole resume
+    outline = [
+        *(f"{exp.get('role', '')} at {exp.get('organization', '')} ({exp.get('duration', '')})"
+          for exp in classification.get("experience", [])),
+        *(f"Project: {proj.get('name', '')}" for proj in classification.get("projects", [])),
+        *(f"Education: {edu}" for edu in classification.get("education", [])),
+    ]
+    skills = classification.get("skills", [])
+    if skills:
+        outline.append("Skills: " + ", ".join(skills))
+    if outline:
+        # Keyed on the entry headings only, so editing an entry's details
+        # does not regenerate the summary as well
+        headings = [
+            *(f"{exp.get('role', '')} at {exp.get('organization', '')}"
+              for exp in classification.get("experience", [])),
+            *(proj.get("name", "") for proj in classification.get("projects", [])),
+        ]
+        units.append(("about", "\n".join(outline), "\n".join(headings)))
+
+    # Every other unit is keyed on its own text
+    section_units = []
+    if skills:
+        section_units.append(("skills", ", ".join(skills)))
+
+    for exp in classification.get("experience", []):
+        section_units.append(("experience", f"{exp.get('role', '')} at {exp.get('organization', '')} "
+                                            f"({exp.get('duration', '')}): {exp.get('description', '')}"))
+
+    if classification.get("education"):
+        section_units.append(("education", bullets(classification["education"])))
+
+    for proj in classification.get("projects", []):
+        section_units.append(("projects", f"{proj.get('name', '')}: {proj.get('description', '')}"))
+
+    for name in ("certifications", "achievements"):
+        if classification.get(name):
+            section_units.append((name, bullets(classification[name])))
+
+    units.extend((section, text, text) for section, text in section_units)
+    return units
+
+
+class SectionCache:
+    """Enhanced section text stored one file per content hash."""
+
+    def __init__(self, root=DEFAULT_CACHE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def key(self, *parts):
+        digest = hashlib.sha256()
+        for part in (PROMPT_VERSION, *parts):
+            digest.update(str(part).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)["text"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+    def put(self, key, text):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"text": text, "createdAt": time.time()}, f)
+        os.replace(tmp_path, path)
+
+
+def unit_prompt(section, text, guidelines, user_instruction=""):
+    parts = [UNIT_INSTRUCTIONS[section], "Do NOT include any explanations, notes, or headers."]
+    if guidelines:
+        parts.append("=== Resume Guidelines ===\n" + bullets(guidelines))
+    parts.append("=== Input ===\n" + text)
+    if user_instruction:
+        parts.append(user_instruction.strip())
+    return "\n\n".join(parts)
+
+
+def enhance_sections(classification, query, guidelines=(), user_instruction="", cache=None,
+                     model="", concurrency=None):
+    """
+    Enhance a classified resume section by section.
+
+    query(prompt) performs one LLM call. Units whose content hash is in the
+    cache are reused; the rest run concurrently. Returns (text, stats),
+    where text is the reassembled resume with "**Section**" headers.
+    Guidelines are not part of the cache key, so a resume edit that shifts
+    the retrieved guidelines still reuses unchanged sections; the summary
+    is keyed on the entry headings only (see resume_units).
+    """
+    cache = cache or SectionCache()
+    units = resume_units(classification)
+    keys = [cache.key(model, user_instruction, section, key_text) for section, _, key_text in units]
+
+    results = [cache.get(key) for key in keys]
+    pending = [i for i, result in enumerate(results) if result is None]
+
+    started = time.time()
+    if pending:
+        def run(i):
+            section, text, _ = units[i]
+            return query(unit_prompt(section, text, guidelines, user_instruction))
+
+        with ThreadPoolExecutor(max_workers=concurrency or DEFAULT_CONCURRENCY) as executor:
+            # Each call runs in a copy of this context so the request
+            # deadline and LLM call log still apply in the pool threads
+            futures = {i: executor.submit(contextvars.copy_context().run, run, i) for i in pending}
+            for i, future in futures.items():
+                results[i] = future.result().strip()
+                cache.put(keys[i], results[i])
+
+    blocks = {}
+    for (section, _, _), result in zip(units, results):
+        blocks.setdefault(section, []).append(result)
+    text = "\n\n".join(f"**{section.title()}**\n" + "\n".join(blocks[section])
+                       for section in SECTION_ORDER if section in blocks)
+
+    stats = {
+        "units": len(units),
+        "cached": len(units) - len(pending),
+        "generated": len(pending),
+        "generateMs": round((time.time() - started) * 1000)
+    }
+    logger.info(f"Section enhancement: {stats['generated']} of {stats['units']} units regenerated "
+                f"in {stats['generateMs']}ms")
+    return text, stats
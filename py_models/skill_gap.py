@@ -0,0 +1,224 @@
+"""
+Skill Gap
+
+Local skill-gap analysis for the learning path. Required skills are read
+from matched job descriptions against a fixed skills taxonomy, compared
+with the resume's skills, and only the resulting gap list is sent to the
+LLM, instead of the whole resume and every job description.
+
+The taxonomy is embedded once with the shared MiniLM model and cached on
+disk (SKILL_TAXONOMY_DIR) under a hash of its contents, the model name and
+the embedding dimension, so switching models never reuses stale vectors.
+A job requires a skill when the skill (or an alias) appears in its
+description, or when one of its requirement sentences is close to the
+skill's embedding. A required skill is covered when the resume lists it
+or a skill whose embedding is close to it. Both comparisons are single
+matrix products.
+"""
+
+import hashlib
+import os
+import re
+import time
+
+import numpy as np
+
+from model_bundle import MODEL_NAME
+from prompt_budget import requirement_sentences
+
+TAXONOMY_DIR = os.environ.get("SKILL_TAXONOMY_DIR", "skill_taxonomy_cache")
+# Cosine similarity for a requirement sentence to mention a skill
+JOB_SKILL_THRESHOLD = float(os.environ.get("SKILL_GAP_JOB_THRESHOLD", 0.55))
+# Cosine similarity for a resume skill to cover a required skill
+RESUME_SKILL_THRESHOLD = float(os.environ.get("SKILL_GAP_RESUME_THRESHOLD", 0.75))
+SKILLS_PER_SENTENCE = 3
+
+# category -> {skill: aliases}
+TAXONOMY = {
+    "Languages": {
+        "Python": [], "Java": [], "JavaScript": ["js", "ecmascript"], "TypeScript": ["ts"],
+        "Go": ["golang"], "C++": ["cpp"], "C#": ["csharp"], "Rust": [], "Kotlin": [], "Swift": [],
+        "Scala": [], "Ruby": [], "PHP": [], "R": [], "SQL": [], "Bash": ["shell scripting"],
+    },
+    "Frontend": {
+        "React": ["react.js", "reactjs"], "Angular": ["angularjs"], "Vue.js": ["vue", "vuejs"],
+        "Next.js": ["nextjs"], "HTML": ["html5"], "CSS": ["css3", "sass", "scss"], "Redux": [],
+        "Tailwind CSS": ["tailwind"], "Responsive design": [], "Accessibility": ["a11y", "wcag"],
+    },
+    "Backend": {
+        "Node.js": ["node", "nodejs"], "Express": ["express.js", "expressjs"], "Django": [],
+        "Flask": [], "FastAPI": [], "Spring Boot": ["spring"], ".NET": ["asp.net", "dotnet"],
+        "Ruby on Rails": ["rails"], "REST APIs": ["rest", "restful", "rest api"], "GraphQL": [],
+        "gRPC": [], "Microservices": ["microservice architecture"], "Message queues": ["rabbitmq", "kafka"],
+    },
+    "Data": {
+        "PostgreSQL": ["postgres"], "MySQL": [], "MongoDB": ["mongo"], "Redis": [], "Elasticsearch": [],
+        "Data modeling": [], "ETL": ["data pipelines"], "Apache Spark": ["spark", "pyspark"],
+        "Airflow": ["apache airflow"], "Pandas": [], "NumPy": [], "Data visualization": ["tableau", "power bi"],
+        "Data warehousing": ["snowflake", "bigquery", "redshift"],
+    },
+    "Machine Learning": {
+        "Machine learning": ["ml"], "Deep learning": [], "PyTorch": [], "TensorFlow": ["keras"],
+        "scikit-learn": ["sklearn"], "Natural language processing": ["nlp"], "Computer vision": [],
+        "Large language models": ["llm", "llms", "generative ai", "genai"], "MLOps": [],
+        "Statistics": ["statistical analysis"], "Recommendation systems": [],
+    },
+    "Cloud & DevOps": {
+        "AWS": ["amazon web services"], "Azure": ["microsoft azure"], "Google Cloud": ["gcp"],
+        "Docker": ["containers"], "Kubernetes": ["k8s"], "Terraform": ["infrastructure as code"],
+        "CI/CD": ["continuous integration", "github actions", "jenkins"], "Linux": [],
+        "Monitoring": ["observability", "prometheus", "grafana"], "Serverless": ["aws lambda"],
+    },
+    "Engineering Practices": {
+        "Git": ["version control"], "Unit testing": ["testing", "tdd", "jest", "pytest"],
+        "System design": ["distributed systems", "scalability"], "Agile": ["scrum", "kanban"],
+        "Security": ["owasp", "authentication", "oauth"], "Performance optimization": [],
+        "Code review": [], "Data structures and algorithms": ["algorithms", "data structures"],
+    },
+    "Professional": {
+        "Communication": ["written communication", "verbal communication"], "Leadership": ["mentoring"],
+        "Project management": [], "Stakeholder management": [], "Problem solving": [],
+    },
+}
+
+# Names too common as ordinary words to be matched in free text
+AMBIGUOUS_NAMES = {"go", "r", "c", "rest", "node", "spring", "express", "testing", "containers",
+                   "algorithms", "rails", "mongo", "ts", "js"}
+
+WORD_PATTERN = re.compile(r"[a-z0-9+#.]+")
+
+
+def _normalize(text):
+    # Keep ".net" and "node.js", drop sentence-final periods
+    return " ".join(word.rstrip(".") or word for word in WORD_PATTERN.findall(str(text).lower()))
+
+
+class SkillTaxonomy:
+    """Canonical skills with their categories, aliases and normalised embeddings."""
+
+    def __init__(self, encode, taxonomy=TAXONOMY, cache_dir=TAXONOMY_DIR, model_name=MODEL_NAME, dimension=None):
+        self.skills = []
+        self.categories = []
+        self.names = {}
+        for category, skills in taxonomy.items():
+            for skill, aliases in skills.items():
+                row = len(self.skills)
+                self.skills.append(skill)
+                self.categories.append(category)
+                for name in [skill] + aliases:
+                    self.names.setdefault(_normalize(name), row)
+        self.lexical_names = {name: row for name, row in self.names.items() if name not in AMBIGUOUS_NAMES}
+        self.embeddings = self._embed(encode, cache_dir, model_name, dimension)
+
+    def _embed(self, encode, cache_dir, model_name, dimension):
+        path = None
+        if cache_dir:
+            if dimension is None:
+                # A one-skill probe gives the dimension of whatever model encode wraps
+                dimension = _unit_rows(encode(self.skills[:1])).shape[1]
+            key = "|".join([model_name or "", str(dimension)] + self.skills)
+            digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+            path = os.path.join(cache_dir, f"skill_taxonomy-{digest}.npy")
+        if path and os.path.exists(path):
+            return np.load(path)
+        embeddings = _unit_rows(encode(self.skills))
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, embeddings)
+            os.replace(tmp_path, path)
+        return embeddings
+
+    def mentioned(self, text):
+        """Rows of the skills named (by name or alias) in a text."""
+        padded = f" {_normalize(text)} "
+        return {row for name, row in self.lexical_names.items() if f" {name} " in padded}
+
+
+def _unit_rows(matrix):
+    matrix = np.atleast_2d(np.asarray(matrix, dtype="float32"))
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True).clip(min=1e-12)
+
+
+def required_skills(jobs, taxonomy, encode):
+    """
+    Count, per taxonomy row, how many jobs require the skill. Returns
+    (counts array, number of requirement sentences embedded).
+    """
+    counts = np.zeros(len(taxonomy.skills), dtype=np.int64)
+    per_job = [taxonomy.mentioned(f"{job.get('title', '')}. {job.get('description', '')}") for job in jobs]
+
+    # Requirement sentences of every job in one batch; a sentence shared by
+    # several postings is embedded once and counts for each of them
+    owners = {}
+    for index, job in enumerate(jobs):
+        for sentence in requirement_sentences(job.get("description", "")):
+            owners.setdefault(sentence, []).append(index)
+    sentences = list(owners)
+    if sentences:
+        similarity = _unit_rows(encode(sentences)) @ taxonomy.embeddings.T
+        top = np.argsort(-similarity, axis=1)[:, :SKILLS_PER_SENTENCE]
+        for sentence, rows, scores in zip(sentences, top, similarity):
+            for row in rows:
+                if scores[row] >= JOB_SKILL_THRESHOLD:
+                    for index in owners[sentence]:
+                        per_job[index].add(int(row))
+
+    for rows in per_job:
+        counts[list(rows)] += 1
+    return counts, len(sentences)
+
+
+def analyze_skill_gap(resume_skills, jobs, taxonomy, encode, max_missing=12):
+    """
+    Skills the matched jobs ask for that the resume doesn't cover, most
+    requested first. Returns {"missing", "matched", "stats"}.
+    """
+    start = time.perf_counter()
+    counts, sentence_count = required_skills(jobs, taxonomy, encode)
+    required = np.flatnonzero(counts)
+
+    resume_skills = [skill for skill in dict.fromkeys(resume_skills or []) if str(skill).strip()]
+    covered_by = {}
+    if resume_skills and len(required):
+        for skill in resume_skills:
+            row = taxonomy.names.get(_normalize(skill))
+            if row is not None:
+                covered_by[row] = (skill, 1.0)
+        similarity = _unit_rows(encode(resume_skills)) @ taxonomy.embeddings[required].T
+        best = similarity.argmax(axis=0)
+        for column, row in enumerate(required):
+            score = float(similarity[best[column], column])
+            if row not in covered_by and score >= RESUME_SKILL_THRESHOLD:
+                covered_by[int(row)] = (resume_skills[best[column]], score)
+
+    order = sorted(required, key=lambda row: (-counts[row], taxonomy.skills[row]))
+    missing, matched = [], []
+    for row in order:
+        entry = {"skill": taxonomy.skills[row], "category": taxonomy.categories[row], "jobs": int(counts[row])}
+        if row in covered_by:
+            entry["resumeSkill"], similarity_score = covered_by[row]
+            entry["similarity"] = round(similarity_score, 3)
+            matched.append(entry)
+        else:
+            missing.append(entry)
+
+    return {
+        "missing": missing[:max_missing],
+        "matched": matched,
+        "stats": {
+            "jobs": len(jobs),
+            "requiredSkills": len(required),
+            "sentencesEmbedded": sentence_count,
+            "resumeSkills": len(resume_skills),
+            "elapsedMs": round((time.perf_counter() - start) * 1000, 1)
+        }
+    }
+
+
+def format_gap(gap, job_count):
+    """The gap list as prompt lines: skill (category) - needed by n of N jobs."""
+    lines = [f"- {entry['skill']} ({entry['category']}) - asked for by {entry['jobs']} of {job_count} jobs"
+             for entry in gap["missing"]]
+    return "\n".join(lines) or "- No clear gaps: the resume covers the skills these jobs ask for."
@@ -0,0 +1,32 @@
+"""
+Tests for the skill-overlap re-ranking in candidate_ranking.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from candidate_ranking import posting_skills, skill_overlap_score
+
+POSTING = ("Backend Engineer. Requirements: 3+ years of Python and PostgreSQL. "
+           "You will go the extra mile for our customers.")
+
+
+def test_posting_skills_come_from_the_taxonomy():
+    assert posting_skills(POSTING) == {"Python", "PostgreSQL"}
+
+
+def test_ambiguous_skill_does_not_match_ordinary_words():
+    # "go the extra mile" must not count as the Go language
+    assert skill_overlap_score(["Python", "Go", "Excel"], POSTING) == 0.5
+
+
+def test_ambiguous_skill_matches_through_an_alias():
+    assert skill_overlap_score(["Go"], "Backend Engineer with Golang experience.") == 1.0
+
+
+def test_score_is_relative_to_the_posting_skills():
+    assert skill_overlap_score(["python.", "PostgreSQL"], POSTING) == 1.0
+    assert skill_overlap_score(["Python"] + [f"skill {i}" for i in range(20)], POSTING) == 0.5
+    assert skill_overlap_score([], POSTING) == 0.0
@@ -0,0 +1,452 @@
+"""
+Worker Pool
+
+Pre-forking supervisor for the enhancer wrapper. The supervisor imports the
+enhancer once (MiniLM weights, guideline index, job corpus) and then forks N
+workers that share those pages copy-on-write, so the pool scales across
+cores without N copies of the model.
+
+Protocol (newline-delimited JSON on stdin/stdout):
+    request   {"id": "1", "function": "match_jobs", "data": {...}}
+    response  {"id": "1", "result": {...}}  or  {"id": "1", "error": "..."}
+    health    {"id": "2", "function": "__health__"}
+    ready     {"event": "ready", ...} is written once all workers are up
+
+A request may carry "deadlineMs"; the worker runs it under that deadline
+and drops it unstarted if it expired while queued. Once max_pending
+requests are in flight, new ones are answered immediately with
+{"error": "Overloaded: ...", "overloaded": true}.
+
+Background tasks (e.g. the job refresher) are submitted to the same pool
+on a fixed interval as internal requests; they count towards max_pending,
+are skipped for a cycle when the pool is overloaded or the previous run is
+still going, and their results are logged instead of written to stdout.
+
+Requests go to the worker with the fewest in-flight requests. Each one is
+sent under an internal sequence number and its reply mapped back to the
+client's id, so requests without an id, or reusing one, are tracked
+separately. A worker is recycled after max_requests requests or once its
+private memory exceeds max_rss_mb; a replacement is forked before the old
+worker drains and exits.
+"""
+
+import gc
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import threading
+import time
+import traceback
+
+from deadline import Deadline, DeadlineExceeded, Overloaded, deadline_scope
+
+logger = logging.getLogger("worker_pool")
+
+HEALTH_FUNCTION = "__health__"
+BACKGROUND_PREFIX = "__background-"
+
+
+def current_rss_mb():
+    """
+    Private memory of this process in MB (Private_Clean + Private_Dirty).
+    Pages a worker still shares copy-on-write with the supervisor are not
+    counted, so the figure is what recycling the worker would free. Falls
+    back to the resident set size where smaps_rollup is unavailable.
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            private_kb = sum(int(line.split()[1]) for line in f
+                             if line.startswith(("Private_Clean:", "Private_Dirty:")))
+        return private_kb / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is reported in KB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _worker_main(conn, handler, max_requests, max_rss_mb, threads_per_worker):
+    """Serve requests from the supervisor until told to stop."""
+    try:
+        import torch
+        torch.set_num_threads(threads_per_worker)
+    except ImportError:
+        pass
+
+    served = 0
+    retiring = False
+    conn.send({"type": "ready", "pid": os.getpid(), "rss_mb": current_rss_mb()})
+
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+
+        request_id = message["id"]
+        deadline = Deadline(message.get("deadline"))
+        try:
+            with deadline_scope(deadline):
+                # Requests that waited out their budget in the queue are dropped unstarted
+                deadline.check("start of request")
+                reply = {"type": "result", "id": request_id, "result": handler(message["function"], message["data"])}
+        except DeadlineExceeded as e:
+            reply = {"type": "result", "id": request_id, "error": str(e), "deadlineExceeded": True}
+        except Exception as e:
+            reply = {"type": "result", "id": request_id, "error": str(e), "traceback": traceback.format_exc()}
+
+        served += 1
+        rss_mb = current_rss_mb()
+        if not retiring and (
+            (max_requests and served >= max_requests) or (max_rss_mb and rss_mb > max_rss_mb)
+        ):
+            # Keep serving anything already queued; the supervisor sends
+            # None once this worker has drained.
+            retiring = True
+            reply["retire"] = True
+        reply["rss_mb"] = rss_mb
+        conn.send(reply)
+
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.inflight = set()
+        self.served = 0
+        self.rss_mb = 0.0
+        self.state = "starting"
+        self.send_lock = threading.Lock()
+
+
+class WorkerPool:
+    """Fork-based worker pool with least-loaded dispatch and recycling."""
+
+    def __init__(self, handler, workers=None, max_requests=500, max_rss_mb=0, max_pending=None, on_result=None):
+        self.handler = handler
+        self.size = workers or os.cpu_count() or 1
+        # Admission limit: requests beyond this many in flight are shed
+        self.max_pending = max_pending if max_pending is not None else self.size * 4
+        self.shed = 0
+        self.max_requests = max_requests
+        self.max_rss_mb = max_rss_mb
+        self.threads_per_worker = max(1, (os.cpu_count() or 1) // self.size)
+        self.on_result = on_result or (lambda reply: None)
+        self.context = multiprocessing.get_context("fork")
+        self.workers = []
+        # Internal sequence number -> client request id, for requests in flight
+        self.requests = {}
+        self._sequence = itertools.count(1)
+        self.lock = threading.Lock()
+        self.ready_event = threading.Event()
+        self.started_at = time.time()
+        self.recycled = 0
+        self.closing = False
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self):
+        # Move everything allocated so far (model, indexes) out of the
+        # collector's reach so GC passes in the workers don't touch and
+        # un-share those pages.
+        gc.collect()
+        gc.freeze()
+        for _ in range(self.size):
+            self._spawn()
+        return self
+
+    def _spawn(self):
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(
+            target=_worker_main,
+            args=(child_conn, self.handler, self.max_requests, self.max_rss_mb, self.threads_per_worker),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+
+        worker = _Worker(process, parent_conn)
+        with self.lock:
+            self.workers.append(worker)
+        threading.Thread(target=self._read_worker, args=(worker,), daemon=True).start()
+        return worker
+
+    def close(self):
+        self.closing = True
+        with self.lock:
+            workers = list(self.workers)
+        for worker in workers:
+            self._stop(worker)
+        for worker in workers:
+            worker.process.join(timeout=5)
+
+    def _stop(self, worker):
+        with worker.send_lock:
+            try:
+                worker.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+    def submit(self, request_id, function_name, data, deadline=None):
+        """
+        Send a request to the least-loaded ready worker. Raises Overloaded
+        when max_pending requests are already in flight. deadline is an
+        absolute time.time() value or None.
+        """
+        with self.lock:
+            pending = sum(len(w.inflight) for w in self.workers)
+            if self.max_pending and pending >= self.max_pending:
+                self.shed += 1
+                raise Overloaded(f"Overloaded: {pending} requests in flight (limit {self.max_pending})")
+
+            candidates = [w for w in self.workers if w.state == "ready"]
+            if not candidates:
+                candidates = [w for w in self.workers if w.state == "starting"]
+            if not candidates:
+                raise RuntimeError("No workers available")
+            worker = min(candidates, key=lambda w: len(w.inflight))
+            sequence = next(self._sequence)
+            self.requests[sequence] = request_id
+            worker.inflight.add(sequence)
+
+        with worker.send_lock:
+            worker.conn.send({"id": sequence, "function": function_name, "data": data, "deadline": deadline})
+
+    def wait_idle(self, timeout=None):
+        """Block until no requests are in flight (or the timeout passes)."""
+        deadline = None if timeout is None else time.time() + timeout
+        while self.pending():
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def pending(self):
+        with self.lock:
+            return sum(len(w.inflight) for w in self.workers)
+
+    def health(self):
+        with self.lock:
+            workers = [{
+                "pid": w.process.pid,
+                "state": w.state,
+                "inflight": len(w.inflight),
+                "served": w.served,
+                "rssMb": round(w.rss_mb, 1)
+            } for w in self.workers]
+        ready = sum(1 for w in workers if w["state"] == "ready")
+        return {
+            "status": "ready" if ready else "starting",
+            "ready": ready,
+            "size": self.size,
+            "pending": sum(w["inflight"] for w in workers),
+            "maxPending": self.max_pending,
+            "shed": self.shed,
+            "recycled": self.recycled,
+            "uptimeSeconds": round(time.time() - self.started_at, 1),
+            "supervisorRssMb": round(current_rss_mb(), 1),
+            "workers": workers
+        }
+
+    # ------------------------------------------------------------------
+    # Worker results
+    # ------------------------------------------------------------------
+    def _read_worker(self, worker):
+        while True:
+            try:
+                message = worker.conn.recv()
+            except (EOFError, OSError):
+                break
+
+            if message["type"] == "ready":
+                worker.state = "ready"
+                worker.rss_mb = message["rss_mb"]
+                with self.lock:
+                    all_ready = sum(1 for w in self.workers if w.state == "ready") >= self.size
+                if all_ready:
+                    self.ready_event.set()
+                continue
+
+            with self.lock:
+                worker.inflight.discard(message["id"])
+                message["id"] = self.requests.pop(message["id"], None)
+                worker.served += 1
+                worker.rss_mb = message.pop("rss_mb", worker.rss_mb)
+                retire = message.pop("retire", False)
+                if retire:
+                    worker.state = "draining"
+                    self.recycled += 1
+                drained = worker.state == "draining" and not worker.inflight
+
+            message.pop("type", None)
+            self.on_result(message)
+
+            if retire:
+                logger.info(f"Recycling worker {worker.process.pid} after {worker.served} requests "
+                            f"({worker.rss_mb:.0f} MB RSS)")
+                if not self.closing:
+                    self._spawn()
+            if drained:
+                self._stop(worker)
+
+        self._worker_exited(worker)
+
+    def _worker_exited(self, worker):
+        worker.process.join(timeout=1)
+        with self.lock:
+            if worker in self.workers:
+                self.workers.remove(worker)
+            lost = [self.requests.pop(sequence, None) for sequence in worker.inflight]
+            worker.inflight.clear()
+            unexpected = worker.state != "draining" and not self.closing
+
+        for request_id in lost:
+            self.on_result({"id": request_id, "error": "Worker exited before completing the request"})
+
+        if unexpected:
+            logger.error(f"Worker {worker.process.pid} exited unexpectedly (code {worker.process.exitcode}); respawning")
+            self._spawn()
+
+
+class BackgroundTask:
+    """
+    A function submitted to the pool every interval seconds, first as soon
+    as the pool is ready. Each run gets deadline_ms (default: the interval),
+    so a slow run finishes before the next one is due.
+    """
+
+    def __init__(self, function_name, data=None, interval=300, deadline_ms=None):
+        self.function_name = function_name
+        self.data = data or {}
+        self.interval = interval
+        self.deadline_ms = deadline_ms if deadline_ms is not None else interval * 1000
+        self.runs = 0
+        self.skipped = 0
+        self.running = None
+        self.last_result = None
+
+    def start(self, pool, stop_event):
+        threading.Thread(target=self._loop, args=(pool, stop_event), daemon=True).start()
+
+    def _loop(self, pool, stop_event):
+        while not stop_event.is_set():
+            if self.running is not None:
+                self.skipped += 1
+                logger.info(f"Skipping {self.function_name}: previous run {self.running} still in flight")
+            elif pool.max_pending and pool.pending() >= pool.max_pending:
+                # User requests come first; don't count this as a shed request
+                self.skipped += 1
+                logger.info(f"Skipping {self.function_name}: pool is at its admission limit")
+            else:
+                request_id = f"{BACKGROUND_PREFIX}{self.function_name}-{self.runs + 1}"
+                try:
+                    self.running = request_id
+                    pool.submit(request_id, self.function_name, self.data,
+                                deadline=Deadline.from_ms(self.deadline_ms).expires_at)
+                    self.runs += 1
+                except Exception as e:
+                    # Lost a race for the last slot: try again next cycle
+                    self.running = None
+                    self.skipped += 1
+                    logger.info(f"Skipping {self.function_name}: {str(e)}")
+            stop_event.wait(self.interval)
+
+    def finished(self, reply):
+        self.running = None
+        self.last_result = reply
+        if "error" in reply:
+            logger.error(f"Background {self.function_name} failed: {reply['error']}")
+        else:
+            logger.info(f"Background {self.function_name} completed: {json.dumps(reply.get('result'))[:500]}")
+
+    def health(self):
+        return {"function": self.function_name, "interval": self.interval,
+                "runs": self.runs, "skipped": self.skipped, "running": self.running is not None}
+
+
+def serve(handler, workers=None, max_requests=500, max_rss_mb=0, max_pending=None,
+          input_stream=None, output_stream=None, background=None, ready_info=None):
+    """
+    Run the pool over newline-delimited JSON on stdin/stdout until stdin
+    closes. handler(function_name, data) runs inside the workers, under the
+    request's deadline ("deadlineMs", measured from when the supervisor
+    reads the request). background is a list of BackgroundTask; ready_info
+    is added to the ready event (e.g. how the model was loaded).
+    """
+    input_stream = input_stream or sys.stdin
+    output_stream = output_stream or sys.stdout
+    write_lock = threading.Lock()
+    background = background or []
+    stop_event = threading.Event()
+
+    def write(payload):
+        line = json.dumps(payload, separators=(",", ":"))
+        with write_lock:
+            output_stream.write(line + "\n")
+            output_stream.flush()
+
+    def on_result(reply):
+        request_id = reply.get("id")
+        if isinstance(request_id, str) and request_id.startswith(BACKGROUND_PREFIX):
+            for task in background:
+                if task.running == request_id:
+                    task.finished(reply)
+            return
+        write(reply)
+
+    def health():
+        status = pool.health()
+        if background:
+            status["background"] = [task.health() for task in background]
+        return status
+
+    pool = WorkerPool(handler, workers=workers, max_requests=max_requests,
+                      max_rss_mb=max_rss_mb, max_pending=max_pending, on_result=on_result).start()
+    pool.ready_event.wait()
+    write({"event": "ready", **health(), **(ready_info or {})})
+    for task in background:
+        task.start(pool, stop_event)
+
+    try:
+        for line in input_stream:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                request_id = request.get("id")
+                function_name = request["function"]
+            except (json.JSONDecodeError, KeyError, AttributeError) as e:
+                write({"id": None, "error": f"Invalid request: {str(e)}"})
+                continue
+
+            if function_name == HEALTH_FUNCTION:
+                write({"id": request_id, "result": health()})
+                continue
+
+            deadline = Deadline.from_ms(request.get("deadlineMs")).expires_at
+            try:
+                pool.submit(request_id, function_name, request.get("data", {}), deadline=deadline)
+            except Overloaded as e:
+                # Shed load immediately instead of letting the queue grow
+                write({"id": request_id, "error": str(e), "overloaded": True})
+            except Exception as e:
+                write({"id": request_id, "error": str(e)})
+        # stdin closed: let in-flight requests finish before shutting down
+        stop_event.set()
+        pool.wait_idle()
+    finally:
+        stop_event.set()
+        pool.close()